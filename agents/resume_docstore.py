@@ -0,0 +1,65 @@
+from langchain_community.docstore.base import Docstore, AddableMixin
+from langchain_core.documents import Document
+
+class PositionIds:
+    """index_to_docstore_id for an index whose row i is record i (no per-row dict)"""
+    
+    def __init__(self, size=0):
+        self.size = size
+    
+    def __len__(self):
+        return self.size
+    
+    def __contains__(self, i):
+        return 0 <= i < self.size
+    
+    def __getitem__(self, i):
+        if i not in self:
+            raise KeyError(i)
+        return str(i)
+    
+    def get(self, i, default=None):
+        return self[i] if i in self else default
+    
+    def update(self, mapping):
+        for i, doc_id in mapping.items():
+            if int(doc_id) != i:
+                raise ValueError(f"Row {i} must map to record {i}, got {doc_id}")
+            self.size = max(self.size, i + 1)
+    
+    def keys(self):
+        return range(self.size)
+    
+    def values(self):
+        return (str(i) for i in range(self.size))
+    
+    def items(self):
+        return ((i, str(i)) for i in range(self.size))
+    
+    def __iter__(self):
+        return iter(self.keys())
+
+class ResumeDocstore(Docstore, AddableMixin):
+    """Docstore that reads documents from the ResumeStore records instead of copying them
+    
+    Read-only: resumes are deleted through ResumeStore.delete(), which tombstones
+    their rows instead of removing them from the index.
+    """
+    
+    def __init__(self, resume_store):
+        self.resume_store = resume_store
+    
+    def search(self, search):
+        position = int(search)
+        if not 0 <= position < len(self.resume_store.resumes):
+            return f"ID {search} not found."
+        record = self.resume_store._record(position)
+        return Document(
+            id=search,
+            page_content=self.resume_store._create_search_text(record),
+            metadata=record
+        )
+    
+    def add(self, texts):
+        # Records are appended by ResumeStore itself; nothing to copy here
+        pass
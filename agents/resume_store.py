@@ -1,22 +1,301 @@
-from langchain_ollama import OllamaEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_core.documents import Document
+from tools.jsonl_records import JsonlRecords, atomic_save_npy, atomic_write_text
+from tools.compact_records import SkillVocabulary, ResumeCodec, ResumeHashes, SKILL_FIELDS
+from tools.skill_index import InvertedSkillIndex, reciprocal_rank_fusion, normalize_skill
+from tools.skill_graph import SkillGraph
+from tools.tracing import tracer, log
+from tools.embedding_backends import make_backend, OllamaBackend
+from tools import ann_index
 import pickle
 from pathlib import Path
+import numpy as np
+import threading
+import asyncio
+import time
 import hashlib
 import json
+import os
+
+# langchain, langchain_ollama and faiss are imported on first use to keep startup fast
+
+STORE_FORMAT_VERSION = 2
 
 class ResumeStore:
     """Store and search resumes using FAISS vector database"""
     
-    def __init__(self, model="llama2"):
-        self.embeddings = OllamaEmbeddings(model=model)
-        self.vectorstore = None
-        self.resumes = []
-        self.resume_hashes = set()  # Track unique resumes
-        self.store_path = Path("db/faiss_index.pkl")
-        self.metadata_path = Path("db/resume_metadata.pkl")
-        self.hashes_path = Path("db/resume_hashes.pkl")
+    def __init__(self, model="llama2", skill_encoder=None, embed_batch_size=64, index_type="flat",
+                 index_options=None, nprobe=16, ef_search=64, train_size=20000, compact_threshold=0.2,
+                 embedding_backend=None, path="db", graph_neighbors=32):
+        if index_type not in ann_index.INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}'")
+        self.model = model  # Ollama model of the default backend
+        self.embed_batch_size = embed_batch_size  # texts per embed_documents call in add_resumes
+        self._lock = threading.RLock()  # guards the index and lists against concurrent searches/writes
+        self.skill_encoder = skill_encoder  # Optional SkillEmbeddingCache for per-skill vectors
+        # Backend object or name; None adopts the backend a saved store was built with (Ollama for new stores)
+        self._backend = self._make_backend(embedding_backend) if embedding_backend is not None else None
+        self._vectorstore = None
+        self._index_pending = False  # index file known but not read yet
+        self._index_mapped = False  # index memory-maps its file (read-only until _own_index())
+        self.index_type = index_type  # ANN index built for new stores and by rebuild_index()
+        self.index_options = index_options or {}  # build_index() options: nlist, pq_m, hnsw_m, ...
+        self.nprobe = nprobe  # IVF lists scanned per query
+        self.ef_search = ef_search  # HNSW candidate list size per query
+        self.train_size = train_size  # vectors sampled to train IVF/PQ indexes
+        self.compact_threshold = compact_threshold  # tombstone ratio at which save() compacts
+        # Interned skills of every record, with one float16 vector per distinct skill
+        self.vocabulary = SkillVocabulary()
+        self.graph_neighbors = graph_neighbors  # related skills kept per skill in the skill graph
+        
+        # Native layout: FAISS index file (mmap-able) + JSON-lines records with an offset index
+        self.path = Path(path)  # directory holding every file of the store
+        self.manifest_path = self.path / "store.json"
+        self.index_path = None  # <path>/resumes.<generation>.faiss, named by the manifest
+        self.generation = 0  # bumped on every save
+        self.revision = 0  # bumped on every change to what searches can return; keys cached results
+        self.records_path = self.path / "resumes.jsonl"
+        self.offsets_path = self.path / "resumes.offsets.npy"
+        self.hash_index_path = self.path / "resume_hashes.npy"
+        self.ids_path = self.path / "resume_ids.npy"
+        self.tombstones_path = self.path / "tombstones.npy"
+        self.vocabulary_path = self.path / "skill_vocabulary.json"
+        self.vocabulary_vectors_path = self.path / "skill_vocabulary.npy"
+        self.postings_path = self.path / "skill_postings.npz"
+        self.skill_graph_path = self.path / "skill_graph.npz"
+        
+        # Pickle layout written by earlier versions (still loadable, migrated on save)
+        self.legacy_store_path = self.path / "faiss_index.pkl"
+        self.legacy_metadata_path = self.path / "resume_metadata.pkl"
+        self.legacy_hashes_path = self.path / "resume_hashes.pkl"
+        self.skill_vectors_path = self.path / "skill_vectors.npy"  # per-resume skill matrices
+        self.skill_index_path = self.path / "skill_vectors.json"
+        
+        self.resumes = self._open_records()
+        self._resume_hashes = ResumeHashes()  # Track unique resumes (None = not loaded yet)
+        self._skill_postings = InvertedSkillIndex()  # skill -> record positions (None = not loaded yet)
+        self._skill_graph = None  # nearest-neighbor graph of the indexed skills (None = not loaded yet)
+        
+        # Stable resume ids: record i has id resume_ids[i]; an update appends a new
+        # record with the same id and tombstones the old position
+        self._resume_ids = np.zeros(0, dtype=np.int64)  # None = not loaded yet
+        self.next_id = 0
+        self.tombstones = set()  # deleted record positions, filtered from searches until compact()
+        self._saved_tombstones = 0  # rows of the tombstones file committed by the manifest
+        self._exclusion = None  # cached FAISS search params skipping the tombstones
+    
+    @property
+    def embeddings(self):
+        """Embedding backend (its model or client is created on first use)"""
+        if self._backend is None:
+            self._backend = OllamaBackend(self.model)
+        return self._backend
+    
+    @embeddings.setter
+    def embeddings(self, backend):
+        self._backend = backend
+    
+    def _make_backend(self, backend, model=None):
+        """Backend object from a name, sharing the skill encoder's SentenceTransformer when it is the same model"""
+        if not isinstance(backend, str):
+            return backend
+        if backend == 'ollama':
+            return make_backend(backend, model or self.model)
+        backend = make_backend(backend, model)
+        encoder = self.skill_encoder
+        if encoder is not None and getattr(encoder, 'model_name', None) == backend.model_name:
+            backend = make_backend(backend.name, backend.model_name, model=lambda: encoder.model)
+        return backend
+    
+    def _check_backend(self, spec):
+        """Adopt the backend that built a saved store, or fail if a different one is configured"""
+        if self._backend is None:
+            self._backend = self._make_backend(spec['backend'], spec['model'])
+            return
+        configured = self._backend.spec()
+        if (configured['backend'], configured['model']) != (spec['backend'], spec['model']):
+            raise ValueError(
+                f"Store was embedded with {spec['backend']} ({spec['model']}) but "
+                f"{configured['backend']} ({configured['model']}) is configured; "
+                f"use that backend or re-embed the store (--reembed)"
+            )
+    
+    @property
+    def vectorstore(self):
+        """LangChain FAISS wrapper; the index file is only read on first access"""
+        if self._index_pending:
+            with self._lock:
+                if self._index_pending:
+                    index, mapped = self._read_index(self.index_path)
+                    ann_index.set_search_params(index, self.nprobe, self.ef_search)
+                    if index.ntotal != len(self.resumes):
+                        raise ValueError(
+                            f"Store is inconsistent: {index.ntotal} vectors but {len(self.resumes)} records"
+                        )
+                    self._vectorstore = self._new_vectorstore(index)
+                    self._index_pending = False
+                    self._index_mapped = mapped
+        return self._vectorstore
+    
+    @vectorstore.setter
+    def vectorstore(self, vectorstore):
+        self._vectorstore = vectorstore
+        self._index_pending = False
+        self._index_mapped = False
+    
+    def _own_index(self):
+        """Copy a memory-mapped index into memory before it is modified (FAISS aborts on adding to it)"""
+        if not self._index_mapped:
+            return
+        import faiss
+        # clone_index() would share the mapped storage; a serialized copy owns its arrays
+        index = faiss.deserialize_index(faiss.serialize_index(self.vectorstore.index))
+        ann_index.set_search_params(index, self.nprobe, self.ef_search)
+        self._vectorstore.index = index
+        self._index_mapped = False
+        self._exclusion = None
+    
+    @property
+    def resume_hashes(self):
+        """Hashes of stored resumes, read from disk on first use"""
+        if self._resume_hashes is None:
+            committed = self.resumes.committed
+            if self.hash_index_path.exists():
+                # Row i is the hash of record i; rows past the committed count are ignored
+                hashes = np.load(self.hash_index_path)[:committed]
+                if self.tombstones:
+                    hashes = np.delete(hashes, sorted(self.tombstones))
+                self._resume_hashes = ResumeHashes(hashes)
+            else:
+                self._resume_hashes = ResumeHashes(
+                    self._generate_hash(self.resumes[i]) for i in range(committed) if i not in self.tombstones
+                )
+        return self._resume_hashes
+    
+    @resume_hashes.setter
+    def resume_hashes(self, hashes):
+        self._resume_hashes = ResumeHashes(hashes)
+    
+    @property
+    def resume_ids(self):
+        """Stable id of every record position, read from disk on first use"""
+        if self._resume_ids is None:
+            committed = self.resumes.committed
+            if self.ids_path.exists():
+                self._resume_ids = np.array(np.load(self.ids_path, mmap_mode='r')[:committed], dtype=np.int64)
+            else:
+                # Stores written before ids existed: the id is the position
+                self._resume_ids = np.arange(committed, dtype=np.int64)
+        return self._resume_ids
+    
+    def _open_records(self, count=None):
+        """Records on disk; unsaved ones are held packed, with skills as vocabulary ids"""
+        return JsonlRecords(self.records_path, self.offsets_path, count=count, codec=ResumeCodec(self.vocabulary))
+    
+    def _position_of(self, resume_id):
+        """Record position currently holding a resume id"""
+        for position in np.flatnonzero(self.resume_ids == resume_id)[::-1]:
+            if int(position) not in self.tombstones:
+                return int(position)
+        raise KeyError(f"No resume with id {resume_id}")
+    
+    def live_ids(self, resume_ids):
+        """The given resume ids that belong to a stored resume that is not deleted"""
+        with self._lock:
+            wanted = np.fromiter(resume_ids, dtype=np.int64)
+            positions = np.flatnonzero(np.isin(self.resume_ids, wanted))
+            return {int(self.resume_ids[p]) for p in positions if int(p) not in self.tombstones}
+    
+    def reserve_ids(self, count):
+        """Fresh resume ids, for callers that pass them to add_resumes() to know each resume's id"""
+        with self._lock:
+            self.next_id += count
+            return list(range(self.next_id - count, self.next_id))
+    
+    def _record(self, position):
+        """Record at a position, with its resume id"""
+        return {**self.resumes[position], 'resume_id': int(self.resume_ids[position])}
+    
+    def iter_resumes(self):
+        """Live records (deleted ones skipped), with their resume ids"""
+        for position in range(len(self.resumes)):
+            if position not in self.tombstones:
+                yield self._record(position)
+    
+    @property
+    def skill_postings(self):
+        """Inverted skill index over record positions, read from disk on first use"""
+        if self._skill_postings is None:
+            with self._lock:
+                if self._skill_postings is None:
+                    self._skill_postings = self._load_skill_postings()
+        return self._skill_postings
+    
+    @property
+    def skill_graph(self):
+        """Top-k related skills of every indexed skill, read or built on first use; None without a skill encoder"""
+        if self.skill_encoder is None:
+            return None
+        if self._skill_graph is None:
+            with self._lock:
+                if self._skill_graph is None:
+                    self._skill_graph = self._load_skill_graph()
+        return self._skill_graph
+    
+    def _load_skill_graph(self):
+        """Read the saved graph and add the indexed skills it does not have yet"""
+        model = self.skill_encoder.model_name
+        graph = None
+        if self.skill_graph_path.exists():
+            try:
+                graph = SkillGraph.load(self.skill_graph_path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Could not read skill graph ({e}), rebuilding it")
+            if graph is not None and (graph.model != model or graph.k != self.graph_neighbors):
+                graph = None
+        if graph is None:
+            graph = SkillGraph(k=self.graph_neighbors, model=model)
+        self._extend_skill_graph(graph, self.skill_postings.postings)
+        return graph
+    
+    def _extend_skill_graph(self, graph, terms):
+        """Encode the terms the graph does not know and link them to their neighbors"""
+        missing = [term for term in terms if term not in graph]
+        if missing:
+            with tracer.span('skill_graph.add'):
+                graph.add(missing, self._encode_skills(missing))
+            log(f"🕸️ Added {len(missing)} skills to the skill graph ({len(graph)} total)", 'debug')
+    
+    def match_skills(self, text):
+        """Skills of the graph mentioned in free text (e.g. a job description), in order of appearance"""
+        graph = self.skill_graph
+        return graph.find_skills(text) if graph is not None else []
+    
+    def skill_neighbors(self, skills):
+        """{skill: {related skill: similarity}} for the skills the graph knows"""
+        graph = self.skill_graph
+        neighbors = {}
+        for skill in skills if graph is not None else ():
+            related = graph.neighbors_of(skill)
+            if related is not None:
+                neighbors[skill] = related
+        return neighbors
+    
+    def _load_skill_postings(self):
+        """Read the saved postings and index any records they do not cover yet"""
+        count = len(self.resumes)
+        postings = InvertedSkillIndex()
+        if self.postings_path.exists():
+            try:
+                postings = InvertedSkillIndex.load(self.postings_path, count=count)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Could not read skill index ({e}), rebuilding it")
+        for position in range(len(postings), count):
+            postings.add(position, self._indexed_skills(self.resumes[position]))
+        return postings
+    
+    @staticmethod
+    def _indexed_skills(resume_data):
+        """Skills that go into the inverted index"""
+        return resume_data.get('technical_skills', []) + resume_data.get('tools', [])
     
     def _generate_hash(self, resume_data):
         """Generate a unique hash for a resume based on key fields"""
@@ -35,35 +314,364 @@ class ResumeStore:
     
     def add_resume(self, resume_data):
         """Add a resume to the store (prevents duplicates)"""
-        # Generate hash for this resume
-        resume_hash = self._generate_hash(resume_data)
+        return self.add_resumes([resume_data]) == 1
+    
+    def add_resumes(self, resume_list, chunk_size=None, resume_ids=None):
+        """Add many resumes with batched embedding and a single index insert
         
-        # Check if already exists
-        if resume_hash in self.resume_hashes:
-            print(f"⚠️ Skipping duplicate resume: {resume_data.get('name', 'Unknown')}")
-            return False
+        Returns the number of resumes actually added (duplicates are skipped).
+        resume_ids come from update() or reserve_ids(); otherwise new resumes get fresh ids.
+        """
+        chunk_size = chunk_size or self.embed_batch_size
+        resume_ids = resume_ids or [None] * len(resume_list)
         
-        # Add to tracking set
-        self.resume_hashes.add(resume_hash)
-        self.resumes.append(resume_data)
+        # Dedup against the store and within the batch before any embedding work
+        new_resumes = []
+        new_hashes = []  # in batch order, parallel to new_resumes
+        batch_hashes = set()  # the same hashes for O(1) duplicate checks within the batch
+        new_ids = []
+        for resume_data, resume_id in zip(resume_list, resume_ids):
+            if 'resume_id' in resume_data:
+                # Records returned by search carry their id; it is not part of the stored data
+                resume_data = {key: value for key, value in resume_data.items() if key != 'resume_id'}
+            resume_hash = self._generate_hash(resume_data)
+            if resume_hash in self.resume_hashes or resume_hash in batch_hashes:
+                print(f"⚠️ Skipping duplicate resume: {resume_data.get('name', 'Unknown')}")
+                continue
+            new_resumes.append(resume_data)
+            new_hashes.append(resume_hash)
+            batch_hashes.add(resume_hash)
+            new_ids.append(resume_id)
         
-        # Create searchable text
-        search_text = self._create_search_text(resume_data)
+        if not new_resumes:
+            return 0
         
-        # Create document
-        doc = Document(
-            page_content=search_text,
-            metadata=resume_data
-        )
+        # Embed all search texts in chunked embed_documents calls
+        search_texts = [self._create_search_text(resume_data) for resume_data in new_resumes]
+        vectors = []
+        for i in range(0, len(search_texts), chunk_size):
+            with tracer.span('embed.documents'):
+                vectors.extend(self.embeddings.embed_documents(search_texts[i:i + chunk_size]))
+        
+        # Encode the batch's skills that are new to the vocabulary in one call
+        with tracer.span('embed.skills'):
+            skill_vectors = self._encode_new_skills(new_resumes) if self.skill_encoder is not None else {}
+        
+        with self._lock:
+            # A concurrent writer may have added the same resume while we were embedding
+            keep = [i for i, resume_hash in enumerate(new_hashes) if resume_hash not in self.resume_hashes]
+            if len(keep) < len(new_hashes):
+                new_resumes = [new_resumes[i] for i in keep]
+                new_hashes = [new_hashes[i] for i in keep]
+                new_ids = [new_ids[i] for i in keep]
+                search_texts = [search_texts[i] for i in keep]
+                vectors = [vectors[i] for i in keep]
+                if not new_resumes:
+                    return 0
+            
+            self._insert(new_resumes, new_hashes, new_ids, search_texts, vectors, skill_vectors)
         
-        # Add to vector store
+        tracer.increment('resumes.added', len(new_resumes))
+        return len(new_resumes)
+    
+    def add_embedded(self, resume_list, vectors, resume_ids, skill_vectors=None):
+        """Add resumes whose vectors are already computed (e.g. moved from another shard), without embedding
+        
+        skill_vectors maps a position in resume_list to its skill matrix; the
+        rows of skills new to this store's vocabulary are taken from there.
+        Resumes already in the store are skipped; returns the number added.
+        """
+        known = {}
+        for position, matrix in (skill_vectors or {}).items():
+            known.update(zip(resume_list[position].get('technical_skills', []), matrix))
+        with self._lock:
+            hashes = [self._generate_hash(resume_data) for resume_data in resume_list]
+            keep = []
+            seen = set()
+            for i, resume_hash in enumerate(hashes):
+                if resume_hash not in self.resume_hashes and resume_hash not in seen:
+                    keep.append(i)
+                    seen.add(resume_hash)
+            if not keep:
+                return 0
+            self._insert(
+                [resume_list[i] for i in keep], [hashes[i] for i in keep], [resume_ids[i] for i in keep],
+                [self._create_search_text(resume_list[i]) for i in keep], [vectors[i] for i in keep], known
+            )
+        return len(keep)
+    
+    def _insert(self, new_resumes, new_hashes, new_ids, search_texts, vectors, skill_vectors):
+        """Append embedded, deduplicated resumes to the index and records (call with the lock held)
+        
+        skill_vectors maps skills to vectors already encoded for them.
+        """
+        # Add to vector store in one operation (FAISS row i <-> record i)
         if self.vectorstore is None:
-            self.vectorstore = FAISS.from_documents([doc], self.embeddings)
-        else:
-            self.vectorstore.add_documents([doc])
+            self.vectorstore = self._new_vectorstore(self._create_index(vectors))
+        self._own_index()
+        first_id = len(self.resumes)
+        with tracer.span('faiss.add'):
+            self.vectorstore.add_embeddings(
+                list(zip(search_texts, vectors)),
+                metadatas=new_resumes,
+                ids=[str(first_id + i) for i in range(len(new_resumes))]
+            )
+        
+        # Only track resumes once they are safely in the index
+        for i, resume_id in enumerate(new_ids):
+            if resume_id is None:
+                new_ids[i] = self.next_id
+                self.next_id += 1
+        self.next_id = max([self.next_id] + [resume_id + 1 for resume_id in new_ids])
+        self._resume_ids = np.concatenate([self.resume_ids, np.asarray(new_ids, dtype=np.int64)])
+        for resume_hash, resume_data in zip(new_hashes, new_resumes):
+            self.resume_hashes.add(resume_hash)
+            self.skill_postings.add(len(self.resumes), self._indexed_skills(resume_data))
+            self.resumes.append(resume_data)
+            log(f"✅ Added resume: {resume_data.get('name', 'Unknown')}", 'debug')
+        self._encode_vocabulary(skill_vectors)
+        if self._skill_graph is not None:
+            terms = {normalize_skill(skill) for resume_data in new_resumes for skill in self._indexed_skills(resume_data)}
+            self._extend_skill_graph(self._skill_graph, terms)
+        
+        self._maybe_upgrade_index()
+        self.revision += 1
+    
+    def delete(self, resume_id):
+        """Delete a resume: it is tombstoned (hidden from searches at once) until compaction"""
+        with self._lock:
+            position = self._position_of(resume_id)
+            resume_data = self.resumes[position]
+            self.resume_hashes.discard(self._generate_hash(resume_data))
+            self._tombstone(position)
+        print(f"🗑️ Deleted resume: {resume_data.get('name', 'Unknown')}")
+    
+    def update(self, resume_id, resume_data):
+        """Replace a resume's data, keeping its id; only this resume is re-embedded"""
+        with self._lock:
+            position = self._position_of(resume_id)
+            old_hash = self._generate_hash(self.resumes[position])
+            
+            # The new version may legitimately hash like the old one
+            self.resume_hashes.discard(old_hash)
+            added = 0
+            try:
+                added = self.add_resumes([resume_data], resume_ids=[resume_id])
+            finally:
+                if not added:
+                    self.resume_hashes.add(old_hash)
+            if not added:
+                raise ValueError(f"Update of resume {resume_id} duplicates another stored resume")
+            self._tombstone(position)
+    
+    def remove(self, positions):
+        """Tombstone record positions without logging each one, e.g. after moving them to another shard"""
+        with self._lock:
+            for position in positions:
+                self.resume_hashes.discard(self._generate_hash(self.resumes[position]))
+                self._tombstone(position)
+    
+    def vectors_at(self, positions, chunk_size=10000):
+        """Stored document vectors of record positions (exact unless the index is product-quantized)"""
+        positions = np.asarray(positions, dtype=np.int64)
+        index = self.vectorstore.index
+        vectors = np.zeros((len(positions), index.d), dtype=np.float32)
+        for start in range(0, index.ntotal, chunk_size):
+            inside = np.flatnonzero((positions >= start) & (positions < start + chunk_size))
+            if len(inside):
+                chunk = ann_index.reconstruct_vectors(index, start, min(chunk_size, index.ntotal - start))
+                vectors[inside] = chunk[positions[inside] - start]
+        return vectors
+    
+    def _tombstone(self, position):
+        self.tombstones.add(position)
+        self._exclusion = None
+        self.revision += 1
+    
+    def tombstone_ratio(self):
+        """Fraction of stored records that are deleted"""
+        return len(self.tombstones) / len(self.resumes) if len(self.resumes) else 0.0
+    
+    def _create_index(self, vectors):
+        """Empty index of the configured type, trained on the first vectors when possible"""
+        metric = self.embeddings.metric
+        if len(vectors) < ann_index.training_size(self.index_type, len(vectors), **self.index_options):
+            # Too few vectors to train on yet: exact search until _maybe_upgrade_index switches over
+            return ann_index.build_index('flat', len(vectors[0]), metric=metric)
         
-        print(f"✅ Added resume: {resume_data.get('name', 'Unknown')}")
-        return True
+        index = ann_index.build_index(
+            self.index_type, len(vectors[0]), count=len(vectors), metric=metric, **self.index_options
+        )
+        ann_index.train_index(index, vectors, self.train_size)
+        ann_index.set_search_params(index, self.nprobe, self.ef_search)
+        return index
+    
+    def _maybe_upgrade_index(self):
+        """Switch a stand-in flat index to the configured type once there is enough data to train"""
+        index = self.vectorstore.index
+        if self.index_type == 'flat' or ann_index.index_type_of(index) != 'flat':
+            return
+        if index.ntotal >= ann_index.training_size(self.index_type, index.ntotal, **self.index_options):
+            self.rebuild_index()
+    
+    def rebuild_index(self, index_type=None, chunk_size=10000):
+        """Rebuild the vector index as another type from the vectors already stored
+        
+        Vectors are read back from the current index, so no re-embedding is needed;
+        they are approximate if the current index is product-quantized.
+        """
+        with self._lock:
+            if self.vectorstore is None:
+                print("⚠️ No vector store to rebuild")
+                return
+            
+            index_type = index_type or self.index_type
+            started = time.perf_counter()
+            index = self._copy_index(self.vectorstore.index, index_type, chunk_size=chunk_size)
+            self.index_type = index_type
+            self.vectorstore = self._new_vectorstore(index)
+            self._exclusion = None
+            self.revision += 1
+            print(f"🔧 Rebuilt {index.ntotal} vectors as {index_type} in {time.perf_counter() - started:.1f}s")
+    
+    def reembed(self, backend, chunk_size=None):
+        """Re-embed every record with another backend and rebuild the index (no LLM calls)"""
+        with self._lock:
+            backend = self._make_backend(backend)
+            chunk_size = chunk_size or self.embed_batch_size
+            started = time.perf_counter()
+            
+            # Deleted records are embedded too, so FAISS row i stays record i
+            vectors = []
+            for start in range(0, len(self.resumes), chunk_size):
+                texts = [self._create_search_text(resume) for resume in self.resumes[start:start + chunk_size]]
+                with tracer.span('embed.documents'):
+                    vectors.extend(backend.embed_documents(texts))
+            
+            self._backend = backend
+            self.revision += 1
+            if not vectors:
+                self.vectorstore = None
+                return
+            index = self._create_index(vectors)
+            index.add(np.asarray(vectors, dtype=np.float32))
+            self.vectorstore = self._new_vectorstore(index)
+            self._exclusion = None
+            self._maybe_upgrade_index()
+            print(f"🔁 Re-embedded {len(vectors)} resumes with {backend.name} ({index.d} dimensions) "
+                  f"in {time.perf_counter() - started:.1f}s")
+
+    def _copy_index(self, old_index, index_type, rows=None, chunk_size=10000, options=None):
+        """New index of index_type holding the vectors of old_index (only `rows`, in order, if given)"""
+        if ann_index.index_type_of(old_index) == 'ivf_pq':
+            print("⚠️ Rebuilding from product-quantized vectors, results will stay approximate")
+        
+        total = old_index.ntotal if rows is None else len(rows)
+        options = self.index_options if options is None else options
+        index = ann_index.build_index(
+            index_type, old_index.d, count=total, metric=ann_index.metric_of(old_index), **options
+        )
+        if not index.is_trained and total:
+            rng = np.random.default_rng(0)
+            sample_size = max(self.train_size, ann_index.min_training_size(index))
+            sample = np.sort(rng.choice(total, min(sample_size, total), replace=False))
+            if rows is not None:
+                sample = rows[sample]
+            ann_index.train_index(index, np.vstack([
+                ann_index.reconstruct_vectors(old_index, int(row), 1) for row in sample
+            ]), self.train_size)
+        
+        for start in range(0, old_index.ntotal, chunk_size):
+            count = min(chunk_size, old_index.ntotal - start)
+            vectors = ann_index.reconstruct_vectors(old_index, start, count)
+            if rows is not None:
+                keep = rows[(rows >= start) & (rows < start + count)] - start
+                vectors = vectors[keep]
+            if len(vectors):
+                index.add(vectors)
+        ann_index.set_search_params(index, self.nprobe, self.ef_search)
+        return index
+    
+    def evaluate_index_types(self, index_types=ann_index.INDEX_TYPES, queries=100, k=10):
+        """Recall@k and per-query latency of every index type, built from the stored vectors
+        
+        Queries are stored vectors with a little noise; ground truth is exact search.
+        """
+        with self._lock:
+            if self.vectorstore is None:
+                return []
+            vectors = ann_index.reconstruct_vectors(self.vectorstore.index)
+            metric = ann_index.metric_of(self.vectorstore.index)
+        
+        rng = np.random.default_rng(0)
+        rows = rng.choice(len(vectors), min(queries, len(vectors)), replace=False)
+        noise = rng.normal(scale=vectors.std() * 0.1, size=(len(rows), vectors.shape[1]))
+        query_vectors = (vectors[rows] + noise).astype(np.float32)
+        
+        report = []
+        for index_type in index_types:
+            index = ann_index.build_index(
+                index_type, vectors.shape[1], count=len(vectors), metric=metric, **self.index_options
+            )
+            try:
+                ann_index.train_index(index, vectors, self.train_size)
+            except RuntimeError as e:
+                print(f"⚠️ Skipping {index_type}: {e}")
+                continue
+            index.add(vectors)
+            report.extend(ann_index.evaluate_index(index, vectors, query_vectors, k=k))
+        return report
+    
+    def _new_vectorstore(self, index):
+        """Wrap a FAISS index with the record-backed docstore"""
+        from langchain_community.vectorstores import FAISS
+        from langchain_community.vectorstores.utils import DistanceStrategy
+        from agents.resume_docstore import ResumeDocstore, PositionIds
+        strategy = DistanceStrategy.MAX_INNER_PRODUCT if ann_index.metric_of(index) == 'ip' \
+            else DistanceStrategy.EUCLIDEAN_DISTANCE
+        return FAISS(self.embeddings.as_langchain(), index, ResumeDocstore(self), PositionIds(index.ntotal),
+                     distance_strategy=strategy)
+    
+    @staticmethod
+    def _skills_of(resume_data):
+        """Every skill string of a resume, in vocabulary order of its fields"""
+        for field in SKILL_FIELDS:
+            skills = resume_data.get(field, [])
+            if isinstance(skills, list):
+                yield from (skill for skill in skills if isinstance(skill, str))
+    
+    def _encode_new_skills(self, resume_list):
+        """Vectors of the skills in a batch that the vocabulary has no vector for yet"""
+        known = self.vocabulary.ids
+        skills = list(dict.fromkeys(
+            skill for resume_data in resume_list for skill in self._skills_of(resume_data)
+            if known.get(skill, len(known)) >= self.vocabulary.encoded
+        ))
+        return dict(zip(skills, self._encode_skills(skills))) if skills else {}
+    
+    def _encode_vocabulary(self, skill_vectors=None):
+        """Give every interned skill its vector, taking already encoded ones from skill_vectors"""
+        if self.skill_encoder is None:
+            return
+        skill_vectors = skill_vectors or {}
+        skills = self.vocabulary.unencoded()
+        missing = [skill for skill in skills if skill not in skill_vectors]
+        if missing:
+            skill_vectors = {**skill_vectors, **dict(zip(missing, self._encode_skills(missing)))}
+        self.vocabulary.add_vectors([skill_vectors[skill] for skill in skills])
+        self.vocabulary.model = self.skill_encoder.model_name
+    
+    def _encode_skills(self, skills):
+        """Encode skills into a compact L2-normalized float16 matrix"""
+        vectors = np.asarray(self.skill_encoder.encode(skills), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1.0, norms)).astype(np.float16)
+    
+    def get_skill_vectors(self, resume_data):
+        """Return the skill matrix of a resume from the vocabulary's vectors, or None if unavailable"""
+        skills = resume_data.get('technical_skills', [])
+        ids = self.vocabulary.lookup(skills) if isinstance(skills, list) and skills else None
+        return self.vocabulary.vectors(ids) if ids is not None else None
     
     def _create_search_text(self, resume_data):
         """Create searchable text from resume data"""
@@ -81,72 +689,506 @@ class ResumeStore:
         if self.vectorstore is None:
             return []
         
-        results = self.vectorstore.similarity_search(query, k=k)
-        return [doc.metadata for doc in results]
+        with tracer.span('embed.query'):
+            vector = self.embeddings.embed_query(query)
+        return self._search_by_vector(vector, k)
+    
+    async def asearch(self, query, k=3):
+        """Async search: query embedding via the async Ollama client, FAISS in an executor"""
+        if self.vectorstore is None:
+            return []
+        
+        with tracer.span('embed.query'):
+            vector = await self.embeddings.aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._search_by_vector, vector, k)
+    
+    def _search_by_vector(self, vector, k):
+        """FAISS lookup for an already embedded query"""
+        with self._lock:
+            return [self._record(position) for position in self._vector_ranking(vector, k)]
+    
+    def _vector_ranking(self, vector, k):
+        """Positions of the k nearest live vectors; tombstoned rows are skipped inside FAISS"""
+        return self._vector_rankings([vector], k)[0]
+    
+    def _vector_rankings(self, vectors, k):
+        """_vector_ranking for a matrix of query vectors in one FAISS search"""
+        _, rows = self._vector_search(vectors, k)
+        return [[int(row) for row in ranking if row >= 0] for ranking in rows]
+    
+    def _vector_search(self, vectors, k):
+        """(distances, rows) of the k nearest live vectors per query; missing hits have row -1"""
+        index = self.vectorstore.index
+        queries = np.asarray(vectors, dtype=np.float32)
+        k = min(k, index.ntotal)
+        if not k:
+            return np.zeros((len(queries), 0), dtype=np.float32), np.zeros((len(queries), 0), dtype=np.int64)
+        
+        with tracer.span('faiss.search'):
+            if not self.tombstones:
+                return index.search(queries, k)
+            if self._exclusion is None:
+                self._exclusion = ann_index.exclusion_params(index, self.tombstones)
+            return index.search(queries, k, params=self._exclusion[0])
+    
+    def scored_candidates(self, vectors, skill_lists=None, candidates=50):
+        """Per query, ([(distance, position)], [(bm25 score, position)]) of the best live records
+        
+        The raw scores let a sharded store merge candidates across shards.
+        """
+        with self._lock:
+            if self.vectorstore is None:
+                return [([], []) for _ in range(len(vectors))]
+            distances, rows = self._vector_search(vectors, candidates)
+            scored = []
+            for i in range(len(rows)):
+                vector_hits = [(float(d), int(row)) for d, row in zip(distances[i], rows[i]) if row >= 0]
+                lexical_hits = []
+                if skill_lists is not None:
+                    with tracer.span('lexical.search'):
+                        lexical = self.skill_postings.search(skill_lists[i], k=candidates + len(self.tombstones))
+                    lexical_hits = [(score, position) for position, score in lexical
+                                    if position not in self.tombstones][:candidates]
+                scored.append((vector_hits, lexical_hits))
+            return scored
+    
+    def hybrid_search(self, query, skills, k=3, candidates=50):
+        """Fuse vector search on the query with BM25 over exact skills (reciprocal-rank fusion)
+        
+        Resumes with an exact skill match are found even when they fall outside
+        the vector top-k.
+        """
+        if self.vectorstore is None:
+            return []
+        
+        with tracer.span('embed.query'):
+            vector = self.embeddings.embed_query(query)
+        return self._hybrid_by_vector(vector, skills, k, candidates)
+    
+    async def ahybrid_search(self, query, skills, k=3, candidates=50):
+        """Async version of hybrid_search"""
+        if self.vectorstore is None:
+            return []
+        
+        with tracer.span('embed.query'):
+            vector = await self.embeddings.aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._hybrid_by_vector, vector, skills, k, candidates)
+    
+    def _hybrid_by_vector(self, vector, skills, k, candidates):
+        """Rank positions by vector distance and by BM25, fuse, and return the top-k records"""
+        with self._lock:
+            vector_ranking = self._vector_ranking(vector, candidates)
+            return [self._record(position) for position in self._fuse(vector_ranking, skills, k, candidates)]
+    
+    def _fuse(self, vector_ranking, skills, k, candidates):
+        """Top-k positions of a vector ranking fused with BM25 over the skills (call with the lock held)"""
+        with tracer.span('lexical.search'):
+            lexical = self.skill_postings.search(skills, k=candidates + len(self.tombstones))
+        lexical_ranking = [position for position, _ in lexical if position not in self.tombstones]
+        return reciprocal_rank_fusion([vector_ranking, lexical_ranking[:candidates]])[:k]
+    
+    def hybrid_search_batch(self, queries, skill_lists, k=10, candidates=50, chunk_size=None):
+        """hybrid_search for many queries: batched embedding and one FAISS search per chunk
+        
+        Returns one list of records per query.
+        """
+        if self.vectorstore is None or not queries:
+            return [[] for _ in queries]
+        
+        chunk_size = chunk_size or self.embed_batch_size
+        vectors = []
+        for i in range(0, len(queries), chunk_size):
+            with tracer.span('embed.query'):
+                vectors.extend(self.embeddings.embed_queries(list(queries[i:i + chunk_size])))
+        
+        with self._lock:
+            rankings = self._vector_rankings(vectors, candidates)
+            return [
+                [self._record(position) for position in self._fuse(ranking, skills, k, candidates)]
+                for ranking, skills in zip(rankings, skill_lists)
+            ]
+    
+    def find_by_skills(self, skills, require_all=True):
+        """Records having all (or any) of the given skills, from the postings lists only"""
+        with self._lock:
+            positions = self.skill_postings.prefilter(skills, require_all=require_all)
+            return [self._record(int(position)) for position in positions if int(position) not in self.tombstones]
+    
+    def warm_up(self):
+        """Read the vector index and the skill graph now instead of on the first search"""
+        self.skill_graph
+        return self.vectorstore
     
     def save(self):
-        """Save FAISS index and metadata to disk"""
+        """Save FAISS index and metadata to disk (compacting once enough resumes are deleted)"""
+        with self._lock, tracer.span('store.save'):
+            if self.tombstones and self.tombstone_ratio() >= self.compact_threshold:
+                self._compact()
+            else:
+                self._save()
+    
+    def _save(self):
         if self.vectorstore is None:
             print("⚠️ No vector store to save")
             return
         
-        self.store_path.parent.mkdir(exist_ok=True)
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        generation = self.generation + 1
+        committed = self.resumes.committed
+        
+        # Append new records and their hashes (row i <-> record i); readers only
+        # trust the first `count` rows named by the manifest
+        new_hashes = [self._generate_hash(self.resumes[i]) for i in range(committed, len(self.resumes))]
+        self.resumes.flush()
+        if new_hashes:
+            hashes = np.load(self.hash_index_path)[:committed] if self.hash_index_path.exists() else []
+            atomic_save_npy(self.hash_index_path, np.concatenate([
+                np.asarray(hashes, dtype='S32'), np.array(new_hashes, dtype='S32')
+            ]))
+        atomic_save_npy(self.ids_path, self.resume_ids)
+        if self.tombstones or self.tombstones_path.exists():
+            # Appended in deletion order too, so a crash before the manifest leaves
+            # the committed deletes as they were
+            saved = np.zeros(0, dtype=np.int64)
+            if self.tombstones_path.exists():
+                saved = np.load(self.tombstones_path)[:self._saved_tombstones]
+            new_tombstones = sorted(self.tombstones.difference(saved.tolist()))
+            atomic_save_npy(self.tombstones_path, np.concatenate([
+                saved, np.array(new_tombstones, dtype=np.int64)
+            ]))
+        
+        # Save FAISS index in its native format under a new generation name
+        index_path = self._write_index(self.vectorstore.index, generation)
+        
+        # Save skill matrices and the inverted skill index
+        self._save_skill_vectors()
+        if self._skill_postings is not None or not self.postings_path.exists():
+            self.skill_postings.save(self.postings_path)
+        
+        # The manifest is written last and atomically switches to the new generation
+        self._write_manifest(
+            generation, index_path, self.vectorstore.index, len(self.resumes), len(self.tombstones)
+        )
+        if self._index_mapped:
+            # Map the new file (same index) instead, so the old one can be deleted
+            index, self._index_mapped = self._read_index(index_path)
+            ann_index.set_search_params(index, self.nprobe, self.ef_search)
+            self._vectorstore.index = index
+            self._exclusion = None
+        self._switch_generation(generation, index_path)
+        self._saved_tombstones = len(self.tombstones)
+        
+        log(f"💾 Saved {len(self.resumes)} resumes to FAISS index")
+    
+    def _write_index(self, index, generation):
+        """Write a FAISS index file for a generation (temp file + rename)"""
+        import faiss
+        index_path = self.manifest_path.with_name(f"resumes.{generation}.faiss")
+        tmp_index_path = index_path.with_name(index_path.name + '.tmp')
+        faiss.write_index(index, str(tmp_index_path))
+        os.replace(tmp_index_path, index_path)
+        return index_path
+    
+    def _write_manifest(self, generation, index_path, index, count, deleted, pending_renames=None):
+        """Atomically commit a generation; pending renames are replayed by load() after a crash"""
+        manifest = {
+            'format': STORE_FORMAT_VERSION,
+            'generation': generation,
+            'count': count,
+            'tombstones': deleted,
+            'next_id': self.next_id,
+            'index_file': index_path.name,
+            'index_type': ann_index.index_type_of(index),
+            'dimension': index.d,
+            'embedding': self.embeddings.spec()
+        }
+        if pending_renames:
+            manifest['pending_renames'] = [[str(src), str(dst)] for src, dst in pending_renames]
+        atomic_write_text(self.manifest_path, json.dumps(manifest))
+    
+    def _switch_generation(self, generation, index_path):
+        """Adopt a committed generation and delete the previous index file"""
+        old_index_path, self.index_path, self.generation = self.index_path, index_path, generation
+        if old_index_path is not None and old_index_path != index_path and old_index_path.exists():
+            old_index_path.unlink()
+    
+    def compact(self):
+        """Physically remove deleted resumes from the records, ids, hashes and indexes"""
+        with self._lock:
+            self._compact()
+    
+    def _compact(self):
+        if self.vectorstore is None or not self.tombstones:
+            self._save()
+            return
+        
+        started = time.perf_counter()
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        generation = self.generation + 1
+        live = np.array([p for p in range(len(self.resumes)) if p not in self.tombstones], dtype=np.int64)
+        removed = len(self.resumes) - len(live)
+        
+        # Write the compacted files beside the current ones; they replace them only
+        # after the manifest has committed to them (replayed by load() after a crash)
+        def staged(path):
+            return path.with_name(path.name + '.compact')
+        
+        postings = InvertedSkillIndex()
+        hashes = []
+        
+        def live_records():
+            for new_position, position in enumerate(live):
+                resume_data = self.resumes[int(position)]
+                postings.add(new_position, self._indexed_skills(resume_data))
+                hashes.append(self._generate_hash(resume_data))
+                yield resume_data
         
-        # Save FAISS index
-        self.vectorstore.save_local(str(self.store_path))
+        records = JsonlRecords(staged(self.records_path), staged(self.offsets_path))
+        records.rewrite(live_records())
+        records.close()
+        atomic_save_npy(staged(self.hash_index_path), np.array(hashes, dtype='S32'))
+        atomic_save_npy(staged(self.ids_path), self.resume_ids[live])
+        atomic_save_npy(staged(self.tombstones_path), np.zeros(0, dtype=np.int64))
+        postings.save(staged(self.postings_path))
+        self._save_skill_vectors()
         
-        # Save metadata
-        with open(self.metadata_path, 'wb') as f:
-            pickle.dump(self.resumes, f)
+        # Same type and structure as the current index, without the deleted rows
+        old_index = self.vectorstore.index
+        index = self._copy_index(
+            old_index, ann_index.index_type_of(old_index), rows=live,
+            options={**self.index_options, **ann_index.build_options_of(old_index)}
+        )
+        index_path = self._write_index(index, generation)
         
-        # Save hashes
-        with open(self.hashes_path, 'wb') as f:
-            pickle.dump(self.resume_hashes, f)
+        renames = [
+            (staged(path), path) for path in (
+                self.records_path, self.offsets_path, self.hash_index_path,
+                self.ids_path, self.tombstones_path, self.postings_path
+            )
+        ]
+        self._write_manifest(generation, index_path, index, len(live), 0, pending_renames=renames)
+        self._replay_renames(renames)
+        self._write_manifest(generation, index_path, index, len(live), 0)
+        self._switch_generation(generation, index_path)
         
-        print(f"💾 Saved {len(self.resumes)} resumes to FAISS index")
+        self.vectorstore = self._new_vectorstore(index)
+        self.resumes = self._open_records(count=len(live))
+        self._resume_ids = self._resume_ids[live]
+        self._resume_hashes = ResumeHashes(hashes)
+        self._skill_postings = postings
+        self.tombstones = set()
+        self._saved_tombstones = 0
+        self._exclusion = None
+        self.revision += 1
+        
+        print(f"🧹 Compacted store: removed {removed} deleted resumes in {time.perf_counter() - started:.1f}s")
+        log(f"💾 Saved {len(self.resumes)} resumes to FAISS index")
+    
+    @staticmethod
+    def _replay_renames(renames):
+        """Move staged files into place; already moved ones are skipped"""
+        for src, dst in renames:
+            if Path(src).exists():
+                os.replace(src, dst)
     
     def load(self):
         """Load FAISS index and metadata from disk"""
-        if self.store_path.exists():
-            # Load FAISS index
-            self.vectorstore = FAISS.load_local(
-                str(self.store_path), 
-                self.embeddings,
-                allow_dangerous_deserialization=True
-            )
-            
-            # Load metadata
-            if self.metadata_path.exists():
-                with open(self.metadata_path, 'rb') as f:
-                    self.resumes = pickle.load(f)
-            
-            # Load hashes
-            if self.hashes_path.exists():
-                with open(self.hashes_path, 'rb') as f:
-                    self.resume_hashes = pickle.load(f)
-            
-            print(f"📂 Loaded {len(self.resumes)} resumes from FAISS index")
+        if self.manifest_path.exists():
+            self._load_native()
+        elif self.legacy_store_path.exists():
+            self._load_legacy()
+    
+    def refresh(self):
+        """Reopen the store if another process saved a newer generation (unsaved changes are dropped)"""
+        with self._lock:
+            if not self.manifest_path.exists():
+                return False
+            if json.loads(self.manifest_path.read_text())['generation'] == self.generation:
+                return False
+            self._load_native()
+            return True
+    
+    def _load_native(self):
+        """Open the store; the FAISS index, records and hashes are all read lazily"""
+        manifest = json.loads(self.manifest_path.read_text())
+        if manifest.get('format') != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported store format: {manifest.get('format')}")
+        if manifest.get('pending_renames'):
+            # A compaction committed but did not finish moving its files into place
+            self._replay_renames(manifest.pop('pending_renames'))
+            atomic_write_text(self.manifest_path, json.dumps(manifest))
+            for stale in self.manifest_path.parent.glob("resumes.*.faiss"):
+                if stale.name != manifest['index_file']:
+                    stale.unlink()
+        
+        # Stores written before backends were recorded were all embedded by Ollama
+        self._check_backend(manifest.get('embedding') or OllamaBackend(self.model).spec())
+        
+        count = manifest['count']
+        self.generation = manifest['generation']
+        self.index_path = self.manifest_path.with_name(manifest['index_file'])
+        self._load_skill_vectors()
+        self.resumes = self._open_records(count=count)
+        self.next_id = manifest.get('next_id', count)
+        self.tombstones = set()
+        self._saved_tombstones = 0
+        if self.tombstones_path.exists():
+            # Rows past the manifest's count were written by a save that did not commit
+            saved = np.load(self.tombstones_path)
+            saved = saved[:manifest.get('tombstones', len(saved))]
+            self.tombstones = {int(p) for p in saved if p < count}
+            self._saved_tombstones = len(saved)
+        self._exclusion = None
+        self._resume_hashes = None
+        self._resume_ids = None
+        self._skill_postings = None
+        self._skill_graph = None
+        self._vectorstore = None
+        self._index_pending = True
+        self.revision += 1
+        if not self.vocabulary_path.exists() and count and self.skill_encoder is not None:
+            self._migrate_skill_vectors()
+        
+        log(f"📂 Loaded {len(self.resumes)} resumes from FAISS index")
+    
+    @staticmethod
+    def _read_index(path):
+        """Read a FAISS index with its vectors/codes memory-mapped (IO_FLAG_MMAP_IFC)
+
+        Returns (index, mapped). Builds without IO_FLAG_MMAP_IFC read the whole
+        file into memory; a mapped index is read-only, see _own_index().
+        """
+        import faiss
+        if hasattr(faiss, 'IO_FLAG_MMAP_IFC'):
+            try:
+                return faiss.read_index(str(path), faiss.IO_FLAG_MMAP_IFC), True
+            except RuntimeError:
+                pass
+        return faiss.read_index(str(path)), False
+    
+    def _load_legacy(self):
+        """Load the pickle layout of earlier versions; the next save() migrates it"""
+        from langchain_community.vectorstores import FAISS
+        self._check_backend(OllamaBackend(self.model).spec())
+        legacy = FAISS.load_local(
+            str(self.legacy_store_path),
+            self.embeddings.as_langchain(),
+            allow_dangerous_deserialization=True
+        )
+        
+        # Records in index order, so FAISS row i <-> record i
+        records = [
+            legacy.docstore.search(legacy.index_to_docstore_id[i]).metadata
+            for i in range(legacy.index.ntotal)
+        ]
+        self.vocabulary = SkillVocabulary()
+        self.resumes = self._open_records()
+        self.resumes.rewrite([])
+        self.resumes.extend(records)
+        
+        # Load hashes
+        if self.legacy_hashes_path.exists():
+            with open(self.legacy_hashes_path, 'rb') as f:
+                self.resume_hashes = pickle.load(f)
+        else:
+            self.resume_hashes = {self._generate_hash(resume) for resume in records}
+        self._skill_postings = None  # rebuilt from the records on first use
+        self._skill_graph = None
+        self._resume_ids = np.arange(len(records), dtype=np.int64)
+        self.next_id = len(records)
+        self.tombstones = set()
+        self._exclusion = None
+        
+        self.vectorstore = self._new_vectorstore(legacy.index)
+        self.revision += 1
+        self._migrate_skill_vectors()
+        
+        log(f"📂 Loaded {len(self.resumes)} resumes from legacy pickle store (migrated on next save)")
+    
+    def _save_skill_vectors(self):
+        """Write the skill vocabulary and its vectors; per-resume matrices of earlier versions are dropped"""
+        self.vocabulary.save(self.vocabulary_path, self.vocabulary_vectors_path)
+        if self._skill_graph is not None and self._skill_graph.dirty:
+            self._skill_graph.save(self.skill_graph_path)
+        for path in (self.skill_vectors_path, self.skill_index_path):
+            if path.exists():
+                path.unlink()
+    
+    def _load_skill_vectors(self):
+        """Read the skill vocabulary, memory-mapping its vectors"""
+        self.vocabulary = SkillVocabulary()
+        if self.vocabulary_path.exists():
+            self.vocabulary = SkillVocabulary.load(self.vocabulary_path, self.vocabulary_vectors_path)
+        encoder = self.skill_encoder
+        if encoder is not None and self.vocabulary.model not in (None, encoder.model_name):
+            print("⚠️ Skill vectors were built with a different model, re-encoding them on the next insert")
+            self.vocabulary.drop_vectors()
+    
+    def _migrate_skill_vectors(self):
+        """Build the vocabulary of a store saved before it existed, reusing its per-resume skill matrices"""
+        log("🔄 Building the skill vocabulary from the stored resumes")
+        matrices, offsets = None, {}
+        if self.skill_encoder is not None and self.skill_index_path.exists() and self.skill_vectors_path.exists():
+            index = json.loads(self.skill_index_path.read_text())
+            if index.get('model') == self.skill_encoder.model_name:
+                matrices, offsets = np.load(self.skill_vectors_path, mmap_mode='r'), index['offsets']
+        
+        known = {}
+        for position in range(len(self.resumes)):
+            resume_data = self.resumes[position]
+            for skill in self._skills_of(resume_data):
+                self.vocabulary.intern(skill)
+            span = offsets.get(self._generate_hash(resume_data)) if matrices is not None else None
+            skills = resume_data.get('technical_skills', [])
+            if span and span[1] == len(skills):
+                for skill, vector in zip(skills, matrices[span[0]:span[0] + span[1]]):
+                    known.setdefault(skill, vector)
+        self._encode_vocabulary(known)
     
     def clear(self):
         """Clear all stored resumes and start fresh"""
+        with self._lock:
+            self._clear()
+    
+    def _clear(self):
         self.vectorstore = None
-        self.resumes = []
-        self.resume_hashes = set()
+        self.resumes.remove_files()
+        self.vocabulary = SkillVocabulary()
+        self.resumes = self._open_records()
+        self.resume_hashes = ()
+        self._skill_postings = InvertedSkillIndex()
+        self._skill_graph = None
+        self._resume_ids = np.zeros(0, dtype=np.int64)
+        self.next_id = 0
+        self.tombstones = set()
+        self._saved_tombstones = 0
+        self._exclusion = None
+        self.revision += 1
         
         # Remove files if they exist
-        if self.store_path.exists():
+        if self.index_path is not None and self.index_path.exists():
+            self.index_path.unlink()
+        self.index_path = None
+        for path in (self.manifest_path, self.hash_index_path, self.ids_path, self.tombstones_path,
+                     self.vocabulary_path, self.vocabulary_vectors_path, self.skill_vectors_path,
+                     self.skill_index_path, self.postings_path, self.skill_graph_path,
+                     self.legacy_metadata_path, self.legacy_hashes_path):
+            if path.exists():
+                path.unlink()
+        if self.legacy_store_path.exists():
             import shutil
-            shutil.rmtree(self.store_path)
-        if self.metadata_path.exists():
-            self.metadata_path.unlink()
-        if self.hashes_path.exists():
-            self.hashes_path.unlink()
+            shutil.rmtree(self.legacy_store_path)
         
         print("🗑️ Cleared all resume data")
     
     def get_stats(self):
         """Get statistics about stored resumes"""
         return {
-            'total_resumes': len(self.resumes),
-            'unique_hashes': len(self.resume_hashes)
+            'total_resumes': len(self.resumes) - len(self.tombstones),
+            'unique_hashes': len(self.resume_hashes),
+            'distinct_skills': len(self.vocabulary),
+            'skill_graph_terms': len(self._skill_graph) if self._skill_graph is not None else None,
+            'deleted_pending_compaction': len(self.tombstones)
         }
\ No newline at end of file
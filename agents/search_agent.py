@@ -1,51 +1,416 @@
-from langchain_ollama import OllamaLLM
-from sentence_transformers import SentenceTransformer
+from tools.embedding_cache import SkillEmbeddingCache
+from tools.llm_cache import LazyLLM
+from tools.search_cache import SearchResultCache
+from tools.skill_index import normalize_skill
+from tools.tracing import tracer, log, log_enabled
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import numpy as np
+import asyncio
+import json
+import re
+
+def _normalize_rows(vectors):
+    """L2-normalize embedding rows in float64 (stored float16 rows are upcast)"""
+    vectors = np.asarray(vectors, dtype=np.float64)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+class SkillSimilarityMatrix:
+    """Required x candidate skill cosine similarities as one matrix multiply"""
+    
+    def __init__(self, required_skills, required_vectors, candidate_skills, candidate_vectors):
+        self.required_index = self._build_index(required_skills)
+        self.candidate_index = self._build_index(candidate_skills)
+        if len(required_skills) and len(candidate_skills):
+            self.matrix = required_vectors @ _normalize_rows(candidate_vectors).T
+        else:
+            self.matrix = np.zeros((len(required_skills), len(candidate_skills)))
+    
+    @classmethod
+    def encode(cls, embedding_model, required_skills, candidate_skills):
+        """Build the matrix from a single batched encode of both skill lists"""
+        texts = list(required_skills) + list(candidate_skills)
+        if not required_skills or not candidate_skills:
+            return cls(required_skills, None, candidate_skills, None)
+        
+        vectors = _normalize_rows(embedding_model.encode(texts))
+        split = len(required_skills)
+        return cls(required_skills, vectors[:split], candidate_skills, vectors[split:])
+    
+    @classmethod
+    def from_block(cls, required_skills, candidate_skills, matrix):
+        """Wrap a precomputed required x candidate slice of a larger similarity block"""
+        similarity = cls.__new__(cls)
+        similarity.required_index = cls._build_index(required_skills)
+        similarity.candidate_index = cls._build_index(candidate_skills)
+        similarity.matrix = matrix
+        return similarity
+    
+    @staticmethod
+    def _build_index(skills):
+        """Map raw, lower-cased and stripped spellings of each skill to its row"""
+        index = {}
+        for i, skill in enumerate(skills):
+            for text in (skill, skill.lower(), skill.lower().strip()):
+                index.setdefault(text, i)
+        return index
+    
+    def scores(self, required_text, candidate_texts):
+        """Similarity of one required skill against a list of candidate skills"""
+        columns = [self.candidate_index[t] for t in candidate_texts]
+        return self.matrix[self.required_index[required_text], columns]
+
+QUERY_SKILL_MODES = ('graph', 'llm', 'offline')
 
 class SearchAgent:
     """Agent that interprets search queries and finds candidates"""
     
-    def __init__(self, resume_store, model="llama2", semantic_threshold=0.50):
-        self.llm = OllamaLLM(model=model)
+    def __init__(self, resume_store, model="llama2", semantic_threshold=0.50, embedding_model=None,
+                 llm_cache=None, llm=None, result_cache=None, query_skills="graph", related_skills=5,
+                 related_threshold=0.50):
+        if query_skills not in QUERY_SKILL_MODES:
+            raise ValueError(f"Unknown query skill mode '{query_skills}'")
+        # The client may be shared with other agents and is only built on first use
+        self.llm = llm if llm is not None else LazyLLM(model, llm_cache)
         self.resume_store = resume_store
         self.name = "SearchAgent"
         self.semantic_threshold = semantic_threshold
         
-        # Initialize embedding model for semantic similarity
-        print("🔄 Loading semantic similarity model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("✅ Semantic model loaded")
+        # Embedding model for semantic similarity (cached per skill string, loaded on first miss)
+        self.embedding_model = embedding_model or SkillEmbeddingCache('all-MiniLM-L6-v2')
+        
+        # Repeated queries skip the LLM, retrieval and ranking until the store changes
+        self.result_cache = result_cache if result_cache is not None else SearchResultCache()
+        
+        # How query skills are expanded: from the store's skill graph, with the LLM's related skills
+        # only for skills the graph does not know ("graph"), by the LLM only ("llm"), or without
+        # any LLM call, taking required skills from the query text as well ("offline")
+        self.query_skills = query_skills
+        self.related_skills = related_skills  # graph neighbors added per required skill
+        self.related_threshold = related_threshold  # minimum similarity of those neighbors
     
     def search(self, query):
         """Search for candidates based on natural language query"""
-        
-        # Extract required skills from query
-        required_skills = self._extract_required_skills(query)
-        print(f"🔍 Required skills extracted: {required_skills}")
-        
-        # Dynamically expand skills with LLM-generated relationships
-        expanded_skills = self._expand_skills_dynamically(required_skills)
-        if expanded_skills != required_skills:
-            print(f"🔗 Expanded to include related skills: {expanded_skills}")
+        tracer.increment('search.queries')
+        with tracer.span('search.total'):
+            # Read the revision first, so results raced by a store change are filed under the old one
+            revision = self.resume_store.revision
+            results = self._cached_results(query, revision)
+            if results is None:
+                results = self._search(query)
+                self.result_cache.put_results(query, revision, results)
+            return results
+    
+    def _cached_results(self, query, revision):
+        results = self.result_cache.get_results(query, revision)
+        if results is not None:
+            tracer.increment('search.cache_hits')
+            log("⚡ Results from search cache", 'debug')
+        return results
+    
+    def _search(self, query):
+        # Start vector retrieval on the raw query while the LLM interprets it
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            speculative = pool.submit(self.resume_store.search, query, k=5)
+            
+            # Required and related skills from a single LLM round-trip
+            required_skills, expanded_skills = self._understand_query(query)
+            raw_results = speculative.result()
         
         # Create enhanced query for vector search
-        enhanced_query = " ".join(expanded_skills)
+        enhanced_query = self._enhanced_query(required_skills, expanded_skills)
         
-        # Search in vector store (get more results for better ranking)
-        results = self.resume_store.search(enhanced_query, k=5)
+        # Hybrid retrieval: vector search fused with exact matches on the required skills
+        results = self.resume_store.hybrid_search(enhanced_query, required_skills, k=5) if enhanced_query else []
+        results = self._merge_results(results, raw_results)
         
         # Rank and explain results with percentage matching
-        ranked_results = self._rank_results(query, results, required_skills)
+        with tracer.span('rank.total'):
+            ranked_results = self._rank_results(query, results, required_skills)
         
         # Return top 3
         return ranked_results[:3]
     
+    async def asearch(self, query):
+        """Async version of search; many searches can share one model and index"""
+        tracer.increment('search.queries')
+        with tracer.span('search.total'):
+            revision = self.resume_store.revision
+            results = self._cached_results(query, revision)
+            if results is None:
+                results = await self._asearch(query)
+                self.result_cache.put_results(query, revision, results)
+            return results
+    
+    async def _asearch(self, query):
+        loop = asyncio.get_running_loop()
+        
+        # Start vector retrieval on the raw query while the LLM interprets it
+        speculative = asyncio.ensure_future(self.resume_store.asearch(query, k=5))
+        try:
+            required_skills, expanded_skills = await self._aunderstand_query(query)
+        finally:
+            raw_results = await speculative
+        
+        enhanced_query = self._enhanced_query(required_skills, expanded_skills)
+        results = await self.resume_store.ahybrid_search(enhanced_query, required_skills, k=5) \
+            if enhanced_query else []
+        results = self._merge_results(results, raw_results)
+        
+        # Ranking is CPU-bound (skill encoding + matrix work), keep it off the event loop
+        with tracer.span('rank.total'):
+            ranked_results = await loop.run_in_executor(
+                None, self._rank_results, query, results, required_skills
+            )
+        return ranked_results[:3]
+    
+    def match_batch(self, queries, top_n=10, candidates=20, batch_size=64, llm_workers=4):
+        """Match many job descriptions against the store, yielding (query, top_n results) in order
+        
+        Queries are taken batch_size at a time: their skills are extracted
+        concurrently, their embeddings and FAISS search are batched, and the
+        skill similarities of the whole batch come from one matrix multiply.
+        Memory is bounded by the batch, not by the number of queries.
+        """
+        queries = iter(queries)
+        with ThreadPoolExecutor(max_workers=llm_workers) as pool:
+            while True:
+                batch = list(islice(queries, batch_size))
+                if not batch:
+                    return
+                tracer.increment('match.queries', len(batch))
+                with tracer.span('match.batch'):
+                    matches = self._match_batch(batch, top_n, candidates, pool)
+                yield from zip(batch, matches)
+    
+    def _match_batch(self, batch, top_n, candidates, pool):
+        skills = list(pool.map(self._understand_query, batch))
+        
+        # Queries without any skills get no results, as in search()
+        wanted = [i for i, (_, expanded_skills) in enumerate(skills) if expanded_skills]
+        results = [[] for _ in batch]
+        retrieved = self.resume_store.hybrid_search_batch(
+            [" ".join(skills[i][1]) for i in wanted], [skills[i][0] for i in wanted],
+            k=max(candidates, top_n), candidates=max(50, candidates, top_n)
+        )
+        for i, records in zip(wanted, retrieved):
+            results[i] = records
+        
+        with tracer.span('rank.similarity_matrix'):
+            similarities = self._build_similarity_block([required for required, _ in skills], results)
+        
+        matches = []
+        for (required_skills, _), records, similarity in zip(skills, results, similarities):
+            with tracer.span('rank.total'):
+                ranked = self._rank_results(None, records, required_skills, similarity)
+            matches.append(ranked[:top_n])
+        return matches
+    
+    def _build_similarity_block(self, required_lists, result_lists):
+        """Similarity matrices for many queries' candidates from one requisition x candidate multiply
+        
+        Each distinct required skill and each distinct candidate is encoded (or
+        read from the stored skill vectors) once for the whole batch.
+        """
+        required_skills = list(dict.fromkeys(skill for skills in required_lists for skill in skills))
+        
+        # Distinct candidates in the batch, each owning a range of rows in the candidate matrix
+        spans = {}
+        stored = []
+        missing = []
+        offset = 0
+        for results in result_lists:
+            for resume in results:
+                resume_hash = self.resume_store._generate_hash(resume)
+                if resume_hash in spans:
+                    continue
+                candidate_skills = resume.get('technical_skills', [])
+                spans[resume_hash] = (offset, offset + len(candidate_skills))
+                offset += len(candidate_skills)
+                vectors = self.resume_store.get_skill_vectors(resume)
+                if vectors is None and candidate_skills:
+                    missing.append(len(stored))
+                stored.append(vectors if vectors is not None else candidate_skills)
+        
+        # Required skills plus skills of candidates without stored vectors, in one encode
+        texts = list(required_skills)
+        for i in missing:
+            texts.extend(stored[i])
+        encoded = _normalize_rows(self.embedding_model.encode(texts)) if texts else None
+        position = len(required_skills)
+        for i in missing:
+            count = len(stored[i])
+            stored[i] = encoded[position:position + count]
+            position += count
+        
+        rows = [_normalize_rows(vectors) for vectors in stored if len(vectors)]
+        if required_skills and rows:
+            block = encoded[:len(required_skills)] @ np.concatenate(rows).T
+        else:
+            block = np.zeros((len(required_skills), offset))
+        required_rows = {skill: row for row, skill in enumerate(required_skills)}
+        
+        similarities = []
+        for required, results in zip(required_lists, result_lists):
+            query_rows = block[[required_rows[skill] for skill in required]]
+            matrices = []
+            for resume in results:
+                start, end = spans[self.resume_store._generate_hash(resume)]
+                matrices.append(SkillSimilarityMatrix.from_block(
+                    required, resume.get('technical_skills', []), query_rows[:, start:end]
+                ))
+            similarities.append(matrices)
+        return similarities
+    
+    def _enhanced_query(self, required_skills, expanded_skills):
+        """Log the interpreted skills and build the vector search query"""
+        log(f"🔍 Required skills extracted: {required_skills}")
+        if expanded_skills != required_skills:
+            log(f"🔗 Expanded to include related skills: {expanded_skills}")
+        return " ".join(expanded_skills)
+    
+    def _offline_skills(self, query):
+        """Skills the store's skill graph finds in the query text, expanded with their neighbors (no LLM)"""
+        with tracer.span('search.graph_skills'):
+            required_skills = self.resume_store.match_skills(query)
+            return required_skills, self._graph_expansion(required_skills)
+    
+    def _graph_expansion(self, required_skills, extra_skills=()):
+        """Required skills, the closest graph neighbors of those the graph knows, then extra_skills"""
+        expanded = list(required_skills)
+        for related in self.resume_store.skill_neighbors(required_skills).values():
+            expanded.extend(islice((skill for skill, score in related.items() if score >= self.related_threshold),
+                                   self.related_skills))
+        expanded.extend(extra_skills)
+        return list(dict.fromkeys(expanded))
+    
+    def _expand_from_graph(self, skills):
+        """Replace the LLM's related skills with graph neighbors where the graph knows the required skills
+        
+        The LLM's related skills are kept while any required skill is new to the
+        store, since the graph cannot expand it.
+        """
+        required_skills, expanded_skills = skills
+        if self.query_skills == 'llm' or not required_skills:
+            return skills
+        with tracer.span('search.graph_skills'):
+            known = self.resume_store.skill_neighbors(required_skills)
+            if not known:
+                return skills
+            tracer.increment('search.graph_expansions')
+            unseen = len(known) < len(required_skills)
+            return required_skills, self._graph_expansion(required_skills, expanded_skills if unseen else ())
+    
+    def _understand_query(self, query):
+        """Extract required skills with one structured LLM call and expand them from the skill graph"""
+        if self.query_skills == 'offline':
+            return self._offline_skills(query)
+        cached = self.result_cache.get_skills(query)
+        if cached is not None:
+            return self._expand_from_graph(cached)
+        try:
+            with tracer.span('search.understand_query'):
+                response = self.llm.invoke(self._query_understanding_prompt(query), format="json")
+                skills = self._parse_query_understanding(response)
+            self.result_cache.put_skills(query, *skills)
+            return self._expand_from_graph(skills)
+        except Exception as e:
+            # Fall back to the two-call path with its line heuristics
+            print(f"⚠️ Structured query parsing failed ({e}), using fallback")
+            with tracer.span('search.extract_skills'):
+                required_skills = self._extract_required_skills(query)
+            with tracer.span('search.expand_skills'):
+                return required_skills, self._expand_skills_dynamically(required_skills)
+    
+    async def _aunderstand_query(self, query):
+        """Async version of _understand_query"""
+        if self.query_skills == 'offline':
+            return self._offline_skills(query)
+        cached = self.result_cache.get_skills(query)
+        if cached is not None:
+            return self._expand_from_graph(cached)
+        try:
+            with tracer.span('search.understand_query'):
+                response = await self.llm.ainvoke(self._query_understanding_prompt(query), format="json")
+                skills = self._parse_query_understanding(response)
+            self.result_cache.put_skills(query, *skills)
+            return self._expand_from_graph(skills)
+        except Exception as e:
+            print(f"⚠️ Structured query parsing failed ({e}), using fallback")
+            loop = asyncio.get_running_loop()
+            with tracer.span('search.extract_skills'):
+                required_skills = await loop.run_in_executor(None, self._extract_required_skills, query)
+            with tracer.span('search.expand_skills'):
+                expanded_skills = await loop.run_in_executor(None, self._expand_skills_dynamically, required_skills)
+            return required_skills, expanded_skills
+    
+    def _query_understanding_prompt(self, query):
+        """Prompt asking for required and related skills as JSON"""
+        return f"""
+Analyze this candidate search query: "{query}"
+
+1. List the technical skills the query asks for.
+2. List related/complementary technologies that are commonly used together with them.
+
+Return ONLY a JSON object with this structure:
+{{
+    "required_skills": ["skill1", "skill2"],
+    "related_skills": ["skill3", "skill4"]
+}}
+
+Example: for "React developer" return
+{{"required_skills": ["react"], "related_skills": ["javascript", "html", "css", "jsx", "redux"]}}
+
+JSON:
+"""
+    
+    def _parse_query_understanding(self, response):
+        """Parse the structured reply into (required skills, expanded skills)"""
+        json_match = re.search(r'\{.*\}', response, re.DOTALL)
+        data = json.loads(json_match.group())
+        
+        required_skills = self._clean_skill_list(data.get('required_skills', []))
+        if not required_skills:
+            raise ValueError("no required skills in response")
+        related_skills = self._clean_skill_list(data.get('related_skills', []))
+        
+        # Combine with original skills
+        expanded_skills = list(dict.fromkeys(required_skills + related_skills))
+        return required_skills, expanded_skills
+    
+    def _clean_skill_list(self, skills):
+        """Normalize a list of skills returned by the LLM"""
+        if isinstance(skills, str):
+            skills = skills.split(',')
+        cleaned = [str(skill).strip().lower() for skill in skills]
+        return list(dict.fromkeys(s for s in cleaned if s and len(s) > 1))
+    
+    def _merge_results(self, primary, secondary):
+        """Merge two retrieval result lists, keeping order and dropping duplicates"""
+        merged = []
+        seen = set()
+        for resume in primary + secondary:
+            resume_hash = self.resume_store._generate_hash(resume)
+            if resume_hash not in seen:
+                seen.add(resume_hash)
+                merged.append(resume)
+        return merged
+    
     def _expand_skills_dynamically(self, required_skills):
-        """Dynamically expand required skills using LLM"""
+        """Expand required skills from the skill graph, asking the LLM only about skills it does not know"""
         if not required_skills:
             return required_skills
         
-        skills_str = ", ".join(required_skills)
+        unseen = required_skills
+        if self.query_skills != 'llm':
+            known = self.resume_store.skill_neighbors(required_skills)
+            unseen = [skill for skill in required_skills if skill not in known]
+            if not unseen or self.query_skills == 'offline':
+                return self._graph_expansion(required_skills)
+            required_skills = self._graph_expansion(required_skills)
+        
+        skills_str = ", ".join(unseen)
         
         prompt = f"""For these technical skills: {skills_str}
 
@@ -106,65 +471,84 @@ Output:"""
         skills = [skill.strip().lower() for skill in response.split(',')]
         return [s for s in skills if s and len(s) > 1 and not s.startswith(('sure', 'here', 'based'))]
     
-    def _rank_results(self, original_query, results, required_skills):
+    def _rank_results(self, original_query, results, required_skills, similarities=None):
         """Rank and explain why candidates match with percentage matching"""
         ranked = []
-        
-        for resume in results:
+        # Per-candidate details are debug output; skip formatting them unless shown
+        verbose = log_enabled('debug')
+        if similarities is None:
+            with tracer.span('rank.similarity_matrix'):
+                similarities = self._build_similarity_matrices(required_skills, results)
+        neighbors = self.resume_store.skill_neighbors(required_skills) if self.query_skills != 'llm' else {}
+        
+        for resume, similarity in zip(results, similarities):
             candidate_skills = resume.get('technical_skills', [])
             
-            print(f"\n📋 Analyzing: {resume.get('name', 'Unknown')}")
-            print(f"   Candidate skills: {candidate_skills}")
+            if verbose:
+                print(f"\n📋 Analyzing: {resume.get('name', 'Unknown')}")
+                print(f"   Candidate skills: {candidate_skills}")
             
             # Use hybrid matching: direct + semantic similarity + relationship bonus
-            direct_matches = self._find_direct_matches(required_skills, candidate_skills)
-            print(f"   Direct matches: {direct_matches}")
+            with tracer.span('rank.direct'):
+                direct_matches = self._find_direct_matches(required_skills, candidate_skills)
+            if verbose:
+                print(f"   Direct matches: {direct_matches}")
             
             # Check for relationship-based matches using embeddings
-            relationship_matches = self._find_relationship_matches_dynamic(
-                required_skills, candidate_skills, direct_matches
-            )
-            print(f"   Relationship matches: {relationship_matches}")
+            with tracer.span('rank.relationship'):
+                relationship_matches = self._find_relationship_matches_dynamic(
+                    required_skills, candidate_skills, direct_matches, similarity, neighbors
+                )
+            if verbose:
+                print(f"   Relationship matches: {relationship_matches}")
             
             # For unmatched skills, use embedding similarity
             already_matched = set(direct_matches + list(relationship_matches.keys()))
             remaining_required = [s for s in required_skills if s not in already_matched]
-            print(f"   Remaining to match: {remaining_required}")
+            if verbose:
+                print(f"   Remaining to match: {remaining_required}")
             
             semantic_matches = []
             semantic_explanations = {}
             
             if remaining_required:
-                for req_skill in remaining_required:
-                    match_result = self._find_semantic_match_embedding(req_skill, candidate_skills)
-                    print(f"   Semantic check '{req_skill}': {match_result}")
-                    if match_result['is_match']:
-                        semantic_matches.append(req_skill)
-                        semantic_explanations[req_skill] = match_result['explanation']
+                with tracer.span('rank.semantic'):
+                    for req_skill in remaining_required:
+                        match_result = self._find_semantic_match_embedding(
+                            req_skill, candidate_skills, similarity=similarity
+                        )
+                        if verbose:
+                            print(f"   Semantic check '{req_skill}': {match_result}")
+                        if match_result['is_match']:
+                            semantic_matches.append(req_skill)
+                            semantic_explanations[req_skill] = match_result['explanation']
             
             all_matches = direct_matches + list(relationship_matches.keys()) + semantic_matches
             exact_count = len(direct_matches)
             relationship_count = len(relationship_matches)
             
-            print(f"   ✅ Total matches: {all_matches}")
+            if verbose:
+                print(f"   ✅ Total matches: {all_matches}")
             
-            numerical_match = self._calculate_numerical_match(
-                required_skills, 
-                candidate_skills, 
-                all_matches,
-                exact_count,
-                relationship_count
-            )
+            with tracer.span('rank.score'):
+                numerical_match = self._calculate_numerical_match(
+                    required_skills, 
+                    candidate_skills, 
+                    all_matches,
+                    exact_count,
+                    relationship_count
+                )
             
-            final_explanation = self._create_honest_explanation(
-                direct_matches,
-                relationship_matches,
-                semantic_matches,
-                semantic_explanations,
-                required_skills,
-                candidate_skills,
-                numerical_match
-            )
+            with tracer.span('rank.explain'):
+                final_explanation = self._create_honest_explanation(
+                    direct_matches,
+                    relationship_matches,
+                    semantic_matches,
+                    semantic_explanations,
+                    required_skills,
+                    candidate_skills,
+                    numerical_match
+                )
             
             ranked.append({
                 'resume': resume,
@@ -179,8 +563,35 @@ Output:"""
                 'match_reason': final_explanation
             })
         
+        tracer.increment('rank.candidates', len(ranked))
         return sorted(ranked, key=lambda x: x['score'], reverse=True)
     
+    def _build_similarity_matrices(self, required_skills, results):
+        """One similarity matrix per candidate, reusing skill vectors stored at ingest"""
+        stored = [self.resume_store.get_skill_vectors(resume) for resume in results]
+        
+        # Query skills plus skills of any candidate without stored vectors, in one batch
+        texts = list(required_skills)
+        for resume, vectors in zip(results, stored):
+            if vectors is None:
+                texts.extend(resume.get('technical_skills', []))
+        
+        encoded = _normalize_rows(self.embedding_model.encode(texts)) if texts else None
+        required_vectors = encoded[:len(required_skills)] if required_skills else None
+        offset = len(required_skills)
+        
+        similarities = []
+        for resume, vectors in zip(results, stored):
+            candidate_skills = resume.get('technical_skills', [])
+            if vectors is None and candidate_skills:
+                vectors = encoded[offset:offset + len(candidate_skills)]
+                offset += len(candidate_skills)
+            similarities.append(SkillSimilarityMatrix(
+                required_skills, required_vectors, candidate_skills, vectors
+            ))
+        
+        return similarities
+    
     def _find_direct_matches(self, required_skills, candidate_skills):
         """Find direct string matches (case-insensitive) - STRICT"""
         candidate_skills_lower = [skill.lower().strip() for skill in candidate_skills]
@@ -204,48 +615,52 @@ Output:"""
         
         return direct_matches
     
-    def _find_relationship_matches_dynamic(self, required_skills, candidate_skills, direct_matches):
-        """Find matches based on semantic relationships using embeddings"""
+    def _find_relationship_matches_dynamic(self, required_skills, candidate_skills, direct_matches,
+                                           similarity=None, neighbors=None):
+        """Find matches based on semantic relationships using embeddings
+        
+        neighbors holds skill graph neighbors of required skills; a skill whose
+        list reaches below the threshold is matched from it without the matrix.
+        """
         relationship_matches = {}
         candidate_skills_lower = [skill.lower().strip() for skill in candidate_skills]
         
         # Higher threshold for relationship matching (0.60-0.75 range)
         relationship_threshold = 0.60
         
-        for req_skill in required_skills:
-            # Skip if already directly matched
-            if req_skill in direct_matches:
-                continue
-            
-            req_lower = req_skill.lower()
-            
-            # Encode required skill
-            req_embedding = self.embedding_model.encode([req_lower])[0]
+        remaining = [s for s in required_skills if s not in direct_matches]
+        if not remaining or not candidate_skills:
+            return relationship_matches
+        
+        neighbors = neighbors or {}
+        from_graph = {
+            skill: neighbors[skill] for skill in remaining
+            if neighbors.get(skill) and min(neighbors[skill].values()) < relationship_threshold
+        }
+        if similarity is None and len(from_graph) < len(remaining):
+            similarity = SkillSimilarityMatrix.encode(self.embedding_model, remaining, candidate_skills)
+        
+        for req_skill in remaining:
+            if req_skill in from_graph:
+                related = from_graph[req_skill]
+                scores = [related.get(normalize_skill(skill), -1.0) for skill in candidate_skills]
+            else:
+                scores = similarity.scores(req_skill.lower(), candidate_skills_lower)
             
-            # Check similarity with all candidate skills
-            for cand_skill in candidate_skills:
-                cand_lower = cand_skill.lower().strip()
-                
-                # Encode candidate skill
-                cand_embedding = self.embedding_model.encode([cand_lower])[0]
-                
-                # Calculate cosine similarity
-                similarity = np.dot(req_embedding, cand_embedding) / (
-                    np.linalg.norm(req_embedding) * np.linalg.norm(cand_embedding)
-                )
-                
-                # If similarity is in the "related" range (not exact, but related)
-                if relationship_threshold <= similarity < 0.85:
+            # First candidate skill in the "related" range (not exact, but related)
+            for cand_skill, score in zip(candidate_skills, scores):
+                if relationship_threshold <= score < 0.85:
                     relationship_matches[req_skill] = {
                         'matched_skill': cand_skill,
-                        'similarity': round(float(similarity), 3),
-                        'explanation': f"{cand_skill} ({round(float(similarity) * 100, 1)}% related)"
+                        'similarity': round(float(score), 3),
+                        'explanation': f"{cand_skill} ({round(float(score) * 100, 1)}% related)"
                     }
                     break
         
         return relationship_matches
     
-    def _find_semantic_match_embedding(self, required_skill, candidate_skills, threshold=None):
+    def _find_semantic_match_embedding(self, required_skill, candidate_skills, threshold=None,
+                                       similarity=None):
         """Use embeddings to find semantic matches - NO HALLUCINATION!"""
         
         if threshold is None:
@@ -259,23 +674,13 @@ Output:"""
                 'explanation': "No candidate skills"
             }
         
-        # Encode required skill
-        req_embedding = self.embedding_model.encode([required_skill])[0]
-        
-        # Encode all candidate skills
-        cand_embeddings = self.embedding_model.encode(candidate_skills)
-        
-        # Calculate cosine similarity
-        similarities = []
-        for i, cand_emb in enumerate(cand_embeddings):
-            similarity = np.dot(req_embedding, cand_emb) / (
-                np.linalg.norm(req_embedding) * np.linalg.norm(cand_emb)
-            )
-            similarities.append((candidate_skills[i], similarity))
+        if similarity is None:
+            similarity = SkillSimilarityMatrix.encode(self.embedding_model, [required_skill], candidate_skills)
         
-        # Find best match
-        best_match = max(similarities, key=lambda x: x[1])
-        best_skill, best_score = best_match
+        # Find best match (first one wins on ties)
+        scores = similarity.scores(required_skill, candidate_skills)
+        best_index = int(np.argmax(scores))
+        best_skill, best_score = candidate_skills[best_index], scores[best_index]
         
         # Only accept if similarity is above threshold
         if best_score >= threshold:
@@ -0,0 +1,522 @@
+from agents.resume_store import ResumeStore
+from tools.skill_index import reciprocal_rank_fusion
+from tools.jsonl_records import atomic_write_text
+from tools.tracing import tracer, log, set_log_level
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+import multiprocessing
+import numpy as np
+import threading
+import asyncio
+import shutil
+import heapq
+import json
+import time
+
+SHARDS_FORMAT_VERSION = 1
+
+def jump_hash(key, buckets):
+    """Jump consistent hash of a 64-bit key: going from n to n+1 buckets moves only 1/(n+1) of the keys"""
+    bucket, j = -1, 0
+    while j < buckets:
+        bucket = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+def _shard_worker(connection, paths, options):
+    """Worker process loop: answer candidate searches over the last saved generation of its shards"""
+    set_log_level('warning')
+    stores = {number: ResumeStore(path=path, **options) for number, path in paths.items()}
+    for store in stores.values():
+        store.load()
+    while True:
+        request = connection.recv()
+        if request is None:
+            return
+        generations, vectors, skill_lists, candidates = request
+        try:
+            scored = {}
+            for number, store in stores.items():
+                if generations[number] != store.generation:
+                    store.refresh()
+                scored[number] = store.scored_candidates(vectors, skill_lists, candidates)
+            connection.send(('ok', scored))
+        except Exception as e:
+            connection.send(('error', f"{type(e).__name__}: {e}"))
+
+class ShardRecords:
+    """Read-only view of the records of every shard, shard after shard"""
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def __len__(self):
+        return sum(len(part) for part in self.parts)
+
+    def __iter__(self):
+        for part in self.parts:
+            yield from part
+
+class ShardedResumeStore:
+    """Resumes partitioned by hash over several ResumeStore shards, each with its own directory
+
+    A search embeds the query once, collects scored candidates from every
+    shard and merges them with a heap. Vector results match one big store (up
+    to ties); BM25 scores use each shard's own term statistics.
+    With workers > 0 the shards are searched by worker processes over their
+    last saved generation (save() makes new resumes searchable); otherwise by
+    threads over the shards of this process. rebalance() changes the number of
+    shards by moving stored records and vectors, without embedding or LLM calls.
+    """
+
+    def __init__(self, path="db/shards", shards=4, workers=0, **store_options):
+        self.path = Path(path)
+        self.manifest_path = self.path / "shards.json"
+        self.workers = workers  # shard worker processes (0 = search in threads)
+        self.store_options = store_options  # ResumeStore options of every shard
+        self.next_id = 0  # resume ids are unique across shards
+        self._lock = threading.RLock()
+        self._revision = 0  # only ever increases, so no two store states share a value
+        self._shard_revisions = ()  # shard revisions when _revision was last bumped
+        self._revision_lock = threading.Lock()
+        self._pool = []  # (process, connection) of the worker processes
+        self._pool_lock = threading.Lock()  # one scatter-gather on the pipes at a time
+        self._threads = None
+        if self.manifest_path.exists():
+            shards = json.loads(self.manifest_path.read_text())['shards']
+        self.shards = [self._open_shard(number) for number in range(shards)]
+        self._saved = [0] * len(self.shards)  # shard revisions at the last save
+        if self.shards[0]._backend is not None:
+            self._share_backend()
+
+    def _open_shard(self, number):
+        return ResumeStore(path=self.path / f"shard-{number:03d}", **self.store_options)
+
+    def _share_backend(self):
+        """One embedding backend (and model) for all shards"""
+        backend = self.shards[0].embeddings
+        for shard in self.shards[1:]:
+            shard._backend = backend
+
+    @property
+    def embeddings(self):
+        return self.shards[0].embeddings
+
+    @embeddings.setter
+    def embeddings(self, backend):
+        for shard in self.shards:
+            shard.embeddings = backend
+
+    @property
+    def revision(self):
+        """Increases whenever any shard changes and never returns to an earlier value; keys cached search results
+
+        A sum of shard revisions would drop when rebalance() removes shards and
+        could then match a revision that results were cached under before.
+        """
+        with self._revision_lock:
+            revisions = tuple(shard.revision for shard in self.shards)
+            if revisions != self._shard_revisions:
+                self._shard_revisions = revisions
+                self._revision += 1
+            return self._revision
+
+    @property
+    def resumes(self):
+        return ShardRecords([shard.resumes for shard in self.shards])
+
+    def _generate_hash(self, resume_data):
+        return self.shards[0]._generate_hash(resume_data)
+
+    def _shard_number(self, resume_data, shards=None):
+        """Shard of a resume, by its content hash"""
+        return jump_hash(int(self._generate_hash(resume_data)[:16], 16), shards or len(self.shards))
+
+    def _locate(self, resume_id):
+        """Shard currently holding a resume id"""
+        for number, shard in enumerate(self.shards):
+            try:
+                shard._position_of(resume_id)
+                return number
+            except KeyError:
+                continue
+        raise KeyError(f"No resume with id {resume_id}")
+
+    def live_ids(self, resume_ids):
+        resume_ids = list(resume_ids)
+        return set().union(*(shard.live_ids(resume_ids) for shard in self.shards))
+
+    def reserve_ids(self, count):
+        with self._lock:
+            self.next_id += count
+            return list(range(self.next_id - count, self.next_id))
+
+    def _thread_pool(self):
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="shard")
+        return self._threads
+
+    def add_resume(self, resume_data):
+        """Add a resume to its shard (prevents duplicates)"""
+        return self.add_resumes([resume_data]) == 1
+
+    def add_resumes(self, resume_list, chunk_size=None, resume_ids=None):
+        """Add many resumes, each shard embedding and inserting its part in parallel
+
+        Returns the number of resumes actually added (duplicates are skipped).
+        """
+        resume_ids = resume_ids or [None] * len(resume_list)
+        groups = {}
+        with self._lock:
+            for resume_data, resume_id in zip(resume_list, resume_ids):
+                if resume_id is None:
+                    resume_id = self.next_id
+                    self.next_id += 1
+                resumes, ids = groups.setdefault(self._shard_number(resume_data), ([], []))
+                resumes.append(resume_data)
+                ids.append(resume_id)
+
+        futures = [
+            self._thread_pool().submit(self.shards[number].add_resumes, resumes, chunk_size, ids)
+            for number, (resumes, ids) in groups.items()
+        ]
+        return sum(future.result() for future in futures)
+
+    def delete(self, resume_id):
+        """Delete a resume from whichever shard holds it"""
+        with self._lock:
+            self.shards[self._locate(resume_id)].delete(resume_id)
+
+    def update(self, resume_id, resume_data):
+        """Replace a resume's data, keeping its id; it moves shard if its hash now belongs elsewhere"""
+        with self._lock:
+            source = self._locate(resume_id)
+            target = self._shard_number(resume_data)
+            if target == source:
+                self.shards[source].update(resume_id, resume_data)
+                return
+            if not self.shards[target].add_resumes([resume_data], resume_ids=[resume_id]):
+                raise ValueError(f"Update of resume {resume_id} duplicates another stored resume")
+            self.shards[source].remove([self.shards[source]._position_of(resume_id)])
+
+    def get_skill_vectors(self, resume_data):
+        return self.shards[self._shard_number(resume_data)].get_skill_vectors(resume_data)
+
+    def match_skills(self, text):
+        """Skills any shard's graph finds in free text"""
+        return list(dict.fromkeys(skill for shard in self.shards for skill in shard.match_skills(text)))
+
+    def skill_neighbors(self, skills):
+        """Related skills merged over the shard graphs; the k best of the union are exact"""
+        merged = {}
+        for shard in self.shards:
+            for skill, related in shard.skill_neighbors(skills).items():
+                scores = merged.setdefault(skill, {})
+                for term, score in related.items():
+                    scores[term] = max(score, scores.get(term, score))
+        k = self.shards[0].graph_neighbors
+        return {skill: dict(sorted(scores.items(), key=lambda item: -item[1])[:k]) for skill, scores in merged.items()}
+
+    def iter_resumes(self):
+        for shard in self.shards:
+            yield from shard.iter_resumes()
+
+    def find_by_skills(self, skills, require_all=True):
+        return [resume for shard in self.shards for resume in shard.find_by_skills(skills, require_all)]
+
+    def search(self, query, k=3):
+        """Search for resumes matching the query across all shards"""
+        with tracer.span('embed.query'):
+            vector = self.embeddings.embed_query(query)
+        return self._gather([vector], None, k, k)[0]
+
+    async def asearch(self, query, k=3):
+        """Async search: the query is embedded on the event loop, shards are searched in an executor"""
+        with tracer.span('embed.query'):
+            vector = await self.embeddings.aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return (await loop.run_in_executor(None, self._gather, [vector], None, k, k))[0]
+
+    def hybrid_search(self, query, skills, k=3, candidates=50):
+        """Vector and BM25 candidates of every shard, merged and fused (see ResumeStore.hybrid_search)"""
+        with tracer.span('embed.query'):
+            vector = self.embeddings.embed_query(query)
+        return self._gather([vector], [skills], k, candidates)[0]
+
+    async def ahybrid_search(self, query, skills, k=3, candidates=50):
+        """Async version of hybrid_search"""
+        with tracer.span('embed.query'):
+            vector = await self.embeddings.aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return (await loop.run_in_executor(None, self._gather, [vector], [skills], k, candidates))[0]
+
+    def hybrid_search_batch(self, queries, skill_lists, k=10, candidates=50, chunk_size=None):
+        """hybrid_search for many queries with batched embedding and one scatter-gather"""
+        if not queries:
+            return []
+        chunk_size = chunk_size or self.shards[0].embed_batch_size
+        vectors = []
+        for i in range(0, len(queries), chunk_size):
+            with tracer.span('embed.query'):
+                vectors.extend(self.embeddings.embed_queries(list(queries[i:i + chunk_size])))
+        return self._gather(vectors, skill_lists, k, candidates)
+
+    def _gather(self, vectors, skill_lists, k, candidates):
+        """Scatter query vectors to the shards and heap-merge their candidates into top-k records per query"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with tracer.span('shards.scatter'):
+            scored = self._scatter(vectors, skill_lists, candidates)
+
+        # Smaller is better for L2 distances, larger for inner products and BM25
+        sign = -1.0 if self.embeddings.metric == 'ip' else 1.0
+        results = []
+        with self._lock, tracer.span('shards.merge'):
+            for i in range(len(vectors)):
+                vector_hits = [
+                    [(sign * distance, number, position) for distance, position in scored[number][i][0]
+                     if self._is_live(number, position)]
+                    for number in scored
+                ]
+                ranking = [(number, position) for _, number, position in islice(heapq.merge(*vector_hits), candidates)]
+                if skill_lists is not None:
+                    lexical_hits = [
+                        [(-score, number, position) for score, position in scored[number][i][1]
+                         if self._is_live(number, position)]
+                        for number in scored
+                    ]
+                    lexical = [(number, position) for _, number, position in islice(heapq.merge(*lexical_hits), candidates)]
+                    ranking = reciprocal_rank_fusion([ranking, lexical])
+                results.append([self.shards[number]._record(position) for number, position in ranking[:k]])
+        return results
+
+    def _is_live(self, number, position):
+        """False for records deleted here but not yet saved (or not known here yet)"""
+        shard = self.shards[number]
+        return position < len(shard.resumes) and position not in shard.tombstones
+
+    def _scatter(self, vectors, skill_lists, candidates):
+        """{shard number: ResumeStore.scored_candidates result} from every shard"""
+        if not self.workers:
+            futures = [
+                self._thread_pool().submit(shard.scored_candidates, vectors, skill_lists, candidates)
+                for shard in self.shards
+            ]
+            return {number: future.result() for number, future in enumerate(futures)}
+
+        generations = {number: shard.generation for number, shard in enumerate(self.shards)}
+        with self._pool_lock:
+            workers = self._start_workers()
+            try:
+                for _, connection in workers:
+                    connection.send((generations, vectors, skill_lists, candidates))
+                replies = [connection.recv() for _, connection in workers]
+            except BaseException:
+                # A worker died or we were interrupted mid-reply: the pipes are out of step
+                self._stop_workers()
+                raise
+        scored = {}
+        for status, result in replies:
+            if status == 'error':
+                raise RuntimeError(result)
+            scored.update(result)
+        return scored
+
+    def _start_workers(self):
+        """Worker processes, each owning every workers-th shard (call with the pool lock held)"""
+        if not self._pool:
+            # Spawned (not forked) workers: the parent runs threads and native thread pools
+            context = multiprocessing.get_context('spawn')
+            count = min(self.workers, len(self.shards))
+            options = {key: self.store_options[key] for key in ('nprobe', 'ef_search') if key in self.store_options}
+            for worker in range(count):
+                paths = {
+                    number: str(shard.path) for number, shard in enumerate(self.shards) if number % count == worker
+                }
+                parent, child = context.Pipe()
+                process = context.Process(target=_shard_worker, args=(child, paths, options), daemon=True)
+                process.start()
+                child.close()
+                self._pool.append((process, parent))
+        return self._pool
+
+    def _stop_workers(self):
+        workers, self._pool = self._pool, []
+        for process, connection in workers:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            connection.close()
+
+    def warm_up(self):
+        """Start the shard workers, or read every shard's index"""
+        if self.workers:
+            with self._pool_lock:
+                self._start_workers()
+        else:
+            for shard in self.shards:
+                shard.warm_up()
+
+    def close(self):
+        """Stop the worker processes and threads"""
+        with self._pool_lock:
+            self._stop_workers()
+        if self._threads is not None:
+            self._threads.shutdown()
+            self._threads = None
+
+    def rebalance(self, shards, chunk_size=10000):
+        """Repartition into `shards` shards, moving only the resumes whose shard changes, and save
+
+        Records, stored vectors and skill matrices are copied, so nothing is
+        re-embedded and no LLM is called. With jump hashing, adding a shard moves
+        about 1/shards of the resumes. Shards dropped by shrinking are deleted.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            self.close()
+            old_count = len(self.shards)
+            self.shards += [self._open_shard(number) for number in range(old_count, shards)]
+            self._saved += [0] * max(0, shards - old_count)
+            self._share_backend()
+
+            moved = 0
+            for number, shard in enumerate(self.shards[:old_count]):
+                moved += self._move(shard, shards, keep=number, chunk_size=chunk_size)
+
+            dropped = self.shards[shards:]
+            self.shards = self.shards[:shards]
+            self._saved = self._saved[:shards]
+            with self._revision_lock:
+                self._revision += 1
+            self.save()
+            for shard in dropped:
+                shard.resumes.close()
+                shutil.rmtree(shard.path, ignore_errors=True)
+        print(f"⚖️ Rebalanced {old_count} -> {shards} shards: moved {moved} resumes "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    def import_store(self, store, chunk_size=10000):
+        """Copy every resume of an unsharded ResumeStore into the shards (no re-embedding) and save"""
+        with self._lock:
+            moved = self._move(store, len(self.shards), remove=False, chunk_size=chunk_size)
+            self.next_id = max(self.next_id, store.next_id)
+            self.save()
+        print(f"📦 Imported {moved} resumes into {len(self.shards)} shards")
+
+    def _move(self, source, shards, keep=None, remove=True, chunk_size=10000):
+        """Copy live records of source whose shard is not `keep` to their shard, then tombstone them in source"""
+        if source.vectorstore is None:
+            return 0
+        moved = []
+        for start in range(0, len(source.resumes), chunk_size):
+            groups = {}
+            for position in range(start, min(start + chunk_size, len(source.resumes))):
+                if position in source.tombstones:
+                    continue
+                target = self._shard_number(source.resumes[position], shards)
+                if target != keep:
+                    groups.setdefault(target, []).append(position)
+
+            for target, positions in groups.items():
+                records = [source.resumes[position] for position in positions]
+                skill_vectors = {}
+                for i, resume_data in enumerate(records):
+                    vectors = source.get_skill_vectors(resume_data)
+                    if vectors is not None:
+                        skill_vectors[i] = np.array(vectors)
+                self.shards[target].add_embedded(
+                    records, source.vectors_at(positions),
+                    [int(resume_id) for resume_id in source.resume_ids[positions]], skill_vectors
+                )
+                moved.extend(positions)
+
+        if remove and moved:
+            source.remove(moved)
+        return len(moved)
+
+    def save(self):
+        """Save the shards changed since the last save, then the shard manifest"""
+        with self._lock, tracer.span('store.save'):
+            for number, shard in enumerate(self.shards):
+                if shard.revision != self._saved[number] and shard.vectorstore is not None:
+                    shard.save()
+                    self._saved[number] = shard.revision
+            self.path.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(self.manifest_path, json.dumps({
+                'format': SHARDS_FORMAT_VERSION,
+                'shards': len(self.shards),
+                'next_id': self.next_id
+            }))
+        log(f"💾 Saved {len(self.shards)} shards")
+
+    def load(self):
+        """Open every shard (each reads its index lazily)"""
+        with self._lock:
+            if not self.manifest_path.exists():
+                return
+            manifest = json.loads(self.manifest_path.read_text())
+            if manifest.get('format') != SHARDS_FORMAT_VERSION:
+                raise ValueError(f"Unsupported shard format: {manifest.get('format')}")
+            self.shards[0].load()
+            self._share_backend()
+            for shard in self.shards[1:]:
+                shard.load()
+            self.next_id = max([manifest['next_id']] + [shard.next_id for shard in self.shards])
+            self._saved = [shard.revision for shard in self.shards]
+
+    def refresh(self):
+        """Reopen shards that another process saved since (unsaved changes are dropped)"""
+        with self._lock:
+            refreshed = [shard.refresh() for shard in self.shards]
+            if not any(refreshed):
+                return False
+            for number, shard in enumerate(self.shards):
+                if refreshed[number]:
+                    self._saved[number] = shard.revision
+            if self.manifest_path.exists():
+                self.next_id = max(self.next_id, json.loads(self.manifest_path.read_text())['next_id'])
+            return True
+
+    def clear(self):
+        """Clear all shards and start fresh"""
+        with self._lock:
+            for shard in self.shards:
+                shard.clear()
+            if self.manifest_path.exists():
+                self.manifest_path.unlink()
+            self.next_id = 0
+            self._saved = [shard.revision for shard in self.shards]
+
+    def rebuild_index(self, index_type=None, chunk_size=10000):
+        """Rebuild every shard's index as another type"""
+        with self._lock:
+            for shard in self.shards:
+                shard.rebuild_index(index_type, chunk_size)
+
+    def reembed(self, backend, chunk_size=None):
+        """Re-embed every shard with another backend (no LLM calls)"""
+        with self._lock:
+            self.shards[0].reembed(backend, chunk_size)
+            for shard in self.shards[1:]:
+                shard.reembed(self.shards[0].embeddings, chunk_size)
+
+    def evaluate_index_types(self, *args, **kwargs):
+        """Index type report on the first shard (a hash-partitioned sample of the store)"""
+        return self.shards[0].evaluate_index_types(*args, **kwargs)
+
+    def get_stats(self):
+        """Statistics summed over shards, with each shard's resume count"""
+        stats = [shard.get_stats() for shard in self.shards]
+        return {
+            'total_resumes': sum(s['total_resumes'] for s in stats),
+            'unique_hashes': sum(s['unique_hashes'] for s in stats),
+            'deleted_pending_compaction': sum(s['deleted_pending_compaction'] for s in stats),
+            'shards': [s['total_resumes'] for s in stats]
+        }
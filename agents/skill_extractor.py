@@ -1,22 +1,33 @@
-from langchain_ollama import OllamaLLM
+from tools.llm_cache import LazyLLM
 import json
 import re
 
 class SkillExtractorAgent:
     """Agent that extracts skills from resume text"""
     
-    def __init__(self, model="llama2"):
-        self.llm = OllamaLLM(model=model)
+    def __init__(self, model="llama2", llm_cache=None, llm=None, max_chars=2000):
+        # The client may be shared with other agents and is only built on first use
+        self.llm = llm if llm is not None else LazyLLM(model, llm_cache)
         self.name = "SkillExtractor"
+        self.max_chars = max_chars  # resume text sent to the LLM; parsing can stop here
     
     def extract_skills(self, resume_text):
         """Extract skills from resume text using LLM"""
-        
-        prompt = f"""
+        response = self.llm.invoke(self._build_prompt(resume_text))
+        return self._parse_response(response, resume_text)
+    
+    async def aextract_skills(self, resume_text):
+        """Async version of extract_skills using the async Ollama client"""
+        response = await self.llm.ainvoke(self._build_prompt(resume_text))
+        return self._parse_response(response, resume_text)
+    
+    def _build_prompt(self, resume_text):
+        """Build the extraction prompt"""
+        return f"""
 You are a skill extraction expert. Extract ALL technical skills, soft skills, and tools from this resume.
 
 Resume:
-{resume_text[:2000]}  
+{resume_text[:self.max_chars]}  
 
 Return ONLY a JSON object with this structure:
 {{
@@ -30,9 +41,9 @@ Return ONLY a JSON object with this structure:
 
 JSON:
 """
-        
-        response = self.llm.invoke(prompt)
-        
+    
+    def _parse_response(self, response, resume_text):
+        """Parse the LLM response into a skills dict"""
         # Try to extract JSON from response
         try:
             # Find JSON in response
@@ -0,0 +1,178 @@
+"""Deterministic offline stand-ins for Ollama and SentenceTransformer
+
+install() registers fake `langchain_ollama` and `sentence_transformers` modules.
+The application imports both lazily, so install() must run before the first
+ingest or search (ideally before importing main). Responses depend only on the
+prompt or text, so runs are repeatable; optional sleeps simulate model latency.
+"""
+from benchmarks.synthetic import ResumeTemplates
+import numpy as np
+import asyncio
+import hashlib
+import types
+import json
+import time
+import sys
+import re
+
+def _hashed_vector(features, dimension, probes=8):
+    """Feature-hashing embedding: each feature adds signed ones at `probes` positions"""
+    vector = np.zeros(dimension, dtype=np.float32)
+    for feature in features:
+        digest = hashlib.md5(feature.encode('utf-8')).digest()
+        positions = np.frombuffer(digest, dtype=np.uint16)[:probes] % dimension
+        signs = np.where(np.frombuffer(digest, dtype=np.uint8)[:probes] & 1, 1.0, -1.0)
+        np.add.at(vector, positions, signs)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class FakeOllamaLLM:
+    """Answers the system's prompts (skill extraction, query understanding) from a skill vocabulary"""
+
+    def __init__(self, model="llama2", latency=0.0, templates=None, **kwargs):
+        self.model = model
+        self.latency = latency
+        self.calls = 0
+        templates = templates or ResumeTemplates()
+        self.tools = {tool.lower() for tool in templates.tools}
+        self.soft_skills = templates.soft_skills
+        vocabulary = set(templates.technical_skills + templates.tail_skills + templates.tools)
+        # Longest first so "react sdk" wins over "react"
+        self._skill_pattern = re.compile(
+            r'(?<![\w.])(' + '|'.join(re.escape(s) for s in sorted(vocabulary, key=len, reverse=True)) + r')(?![\w])',
+            re.IGNORECASE
+        )
+        self.related = {}
+        for group in templates.skill_groups:
+            for skill in group:
+                self.related.setdefault(skill.lower(), []).extend(s.lower() for s in group if s != skill)
+
+    def _skills(self, text):
+        return list(dict.fromkeys(match.lower() for match in self._skill_pattern.findall(text)))
+
+    def _related(self, skills):
+        related = []
+        for skill in skills:
+            related.extend(self.related.get(skill.split()[0], [])[:4])
+        return [skill for skill in dict.fromkeys(related) if skill not in skills]
+
+    def _respond(self, prompt):
+        self.calls += 1
+        if "skill extraction expert" in prompt:
+            resume = prompt.split("Resume:", 1)[1].split("Return ONLY", 1)[0]
+            lines = [line.strip() for line in resume.strip().splitlines() if line.strip()]
+            email = re.search(r'[\w.+-]+@[\w-]+\.[\w.]+', resume)
+            years = re.search(r'(\d+)\+? years', resume)
+            skills = self._skills(resume)
+            return json.dumps({
+                'name': lines[0] if lines else "Unknown",
+                'email': email.group() if email else "",
+                'technical_skills': [s for s in skills if s not in self.tools],
+                'soft_skills': [s for s in self.soft_skills if s.lower() in resume.lower()],
+                'tools': [s for s in skills if s in self.tools],
+                'experience_years': f"{years.group(1)} years" if years else "Unknown"
+            })
+
+        query = re.search(r'"([^"]*)"', prompt)
+        query = query.group(1) if query else prompt
+        if "Analyze this candidate search query" in prompt:
+            required = self._skills(query) or [w.lower() for w in query.split() if len(w) > 2][:2]
+            return json.dumps({'required_skills': required, 'related_skills': self._related(required)})
+        if "Extract the technical skills from this query" in prompt:
+            return ", ".join(self._skills(query))
+        if "For these technical skills:" in prompt:
+            skills = [s.strip().lower() for s in prompt.split(":", 1)[1].split("\n", 1)[0].split(",")]
+            return ", ".join(skills + self._related(skills))
+        return "{}"
+
+    def invoke(self, prompt, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(prompt)
+
+    async def ainvoke(self, prompt, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(prompt)
+
+def _embeddings_class():
+    # LangChain's Embeddings base is only imported once an embedding client is built
+    from langchain_core.embeddings import Embeddings
+
+    class FakeOllamaEmbeddings(Embeddings):
+        """Bag-of-words feature hashing in llama2's embedding dimension"""
+
+        def __init__(self, model="llama2", dimension=4096, latency=0.0, per_text_latency=0.0, **kwargs):
+            self.model = model
+            self.dimension = dimension
+            self.latency = latency
+            self.per_text_latency = per_text_latency
+            self.calls = 0
+
+        def _embed(self, text):
+            return _hashed_vector(re.findall(r'\w+', text.lower()), self.dimension).tolist()
+
+        def _wait(self, count):
+            self.calls += 1
+            delay = self.latency + self.per_text_latency * count
+            if delay:
+                time.sleep(delay)
+
+        def embed_documents(self, texts):
+            self._wait(len(texts))
+            return [self._embed(text) for text in texts]
+
+        def embed_query(self, text):
+            self._wait(1)
+            return self._embed(text)
+
+        async def aembed_query(self, text):
+            delay = self.latency + self.per_text_latency
+            if delay:
+                await asyncio.sleep(delay)
+            self.calls += 1
+            return self._embed(text)
+
+    return FakeOllamaEmbeddings
+
+class HashingSentenceTransformer:
+    """Character-trigram hashing encoder with MiniLM's 384 dimensions; similar spellings stay close"""
+
+    def __init__(self, model_name_or_path="all-MiniLM-L6-v2", dimension=384, **kwargs):
+        self.model_name = model_name_or_path
+        self.dimension = dimension
+        self.calls = 0
+
+    def encode(self, sentences, **kwargs):
+        self.calls += 1
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        vectors = []
+        for sentence in sentences:
+            text = f" {' '.join(str(sentence).lower().split())} "
+            vectors.append(_hashed_vector([text[i:i + 3] for i in range(len(text) - 2)], self.dimension, probes=2))
+        return np.array(vectors, dtype=np.float32).reshape(len(vectors), self.dimension)
+
+def install(llm_latency=0.0, embed_latency=0.0, per_text_latency=0.0, dimension=4096, templates=None):
+    """Register the fake modules; returns them so callers can read call counters"""
+    shared = {'templates': templates}
+
+    def make_llm(model="llama2", **kwargs):
+        if shared['templates'] is None:
+            shared['templates'] = ResumeTemplates()
+        return FakeOllamaLLM(model, latency=llm_latency, templates=shared['templates'])
+
+    def make_embeddings(model="llama2", **kwargs):
+        return _embeddings_class()(
+            model, dimension=dimension, latency=embed_latency, per_text_latency=per_text_latency
+        )
+
+    ollama = types.ModuleType("langchain_ollama")
+    ollama.OllamaLLM = make_llm
+    ollama.OllamaEmbeddings = make_embeddings
+    sentence_transformers = types.ModuleType("sentence_transformers")
+    sentence_transformers.SentenceTransformer = HashingSentenceTransformer
+
+    sys.modules["langchain_ollama"] = ollama
+    sys.modules["sentence_transformers"] = sentence_transformers
+    return ollama, sentence_transformers
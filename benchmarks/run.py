@@ -0,0 +1,150 @@
+"""Offline benchmark suite: ingest throughput, search latency by stage, startup, peak RSS, heap per resume
+
+Everything runs against fake Ollama/SentenceTransformer stand-ins in a temporary
+directory, one child process per scenario:
+    python -m benchmarks.run --resumes 10000 --output bench.json
+    python -m benchmarks.run --scenarios search --resumes 100000 --dimension 768 --llm-latency 0.2
+    python -m benchmarks.run --compare base.json bench.json
+"""
+from pathlib import Path
+import subprocess
+import platform
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import sys
+import os
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_scenario(name, params):
+    """Run one scenario in this process (called in the child); returns its result dict"""
+    from benchmarks import fakes
+    fakes.install(
+        llm_latency=params['llm_latency'], embed_latency=params['embed_latency'],
+        per_text_latency=params['per_text_latency'], dimension=params['dimension']
+    )
+    from benchmarks.scenarios import SCENARIOS, peak_rss_mb
+    result = SCENARIOS[name](**params)
+    result.setdefault('peak_rss_mb', peak_rss_mb())  # startup reports its own fresh process
+    return result
+
+def run(scenarios, params, keep_workdir=False):
+    """Run each scenario in a fresh child process and working directory"""
+    results = {}
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get('PYTHONPATH')])))
+    for name in scenarios:
+        workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+        print(f"⏱️ Running {name} in {workdir}", file=sys.stderr)
+        try:
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.run", "--child", name, "--params", json.dumps(params)],
+                cwd=workdir, env=env, capture_output=True, text=True
+            )
+            if child.returncode != 0:
+                results[name] = {'error': child.stderr.strip().splitlines()[-1:]}
+            else:
+                # The result is the child's last line; anything before it is stray output
+                results[name] = json.loads(child.stdout.strip().splitlines()[-1])
+        finally:
+            if not keep_workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'commit': _commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'params': params
+        },
+        'scenarios': results
+    }
+
+def _flatten(data, prefix=""):
+    """{'a': {'b': 1}} -> {'a.b': 1} for numeric leaves"""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def compare(base, new):
+    """Relative change of every numeric metric between two result files"""
+    base_metrics = _flatten(base.get('scenarios', {}))
+    new_metrics = _flatten(new.get('scenarios', {}))
+    lines = [f"{'metric':<55} {'base':>12} {'new':>12} {'change':>9}"]
+    for name in sorted(set(base_metrics) & set(new_metrics)):
+        old, current = base_metrics[name], new_metrics[name]
+        change = f"{(current - old) / old * 100:+.1f}%" if old else "-"
+        lines.append(f"{name:<55} {old:>12} {current:>12} {change:>9}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks with fake LLM and embedding models")
+    parser.add_argument("--scenarios", nargs="+", default=["ingest", "search", "startup"],
+                        choices=["ingest", "search", "startup", "memory"])
+    parser.add_argument("--resumes", type=int, default=10000, help="synthetic resumes in the store")
+    parser.add_argument("--files", type=int, default=200, help="resume files for the full ingest pipeline")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dimension", type=int, default=4096, help="fake Ollama embedding dimension")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per fake LLM call")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="seconds per fake embedding call")
+    parser.add_argument("--per-text-latency", type=float, default=0.0,
+                        help="extra seconds per text embedded")
+    parser.add_argument("--embedding-backend", default="ollama", choices=["ollama", "sentence_transformers"],
+                        help="document embeddings of the store")
+    parser.add_argument("--shards", type=int, default=0, help="search a store partitioned over this many shards")
+    parser.add_argument("--shard-workers", type=int, default=0, help="processes searching the shards")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--keep-workdir", action="store_true", help="keep the temporary db/ of each scenario")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--params", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        base, new = (json.loads(Path(path).read_text()) for path in args.compare)
+        print(compare(base, new))
+        return
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, json.loads(args.params))))
+        return
+
+    params = {
+        'resumes': args.resumes,
+        'files': args.files,
+        'queries': args.queries,
+        'seed': args.seed,
+        'dimension': args.dimension,
+        'llm_latency': args.llm_latency,
+        'embed_latency': args.embed_latency,
+        'per_text_latency': args.per_text_latency,
+        'embedding_backend': args.embedding_backend,
+        'shards': args.shards,
+        'shard_workers': args.shard_workers
+    }
+    results = run(args.scenarios, params, keep_workdir=args.keep_workdir)
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Benchmark scenarios; each runs in the current directory against a fresh db/
+
+Call benchmarks.fakes.install() first (benchmarks.run does this in a child process
+per scenario so peak RSS is measured per scenario).
+"""
+from benchmarks.synthetic import SyntheticResumes
+from tools.search_cache import SearchResultCache
+from pathlib import Path
+import contextlib
+import subprocess
+import functools
+import resource
+import tracemalloc
+import threading
+import json
+import time
+import sys
+import os
+import gc
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+def percentiles(samples):
+    """p50/p95/p99/mean/max in milliseconds of a list of seconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        'count': len(ordered),
+        'p50_ms': round(pick(50) * 1000, 3),
+        'p95_ms': round(pick(95) * 1000, 3),
+        'p99_ms': round(pick(99) * 1000, 3),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3)
+    }
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+class StageTimer:
+    """Wraps methods on live objects and records how long each call takes, per stage"""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, owner, attribute, stage):
+        method = getattr(owner, attribute)
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - started)
+
+        setattr(owner, attribute, timed)
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def report(self):
+        return {stage: percentiles(samples) for stage, samples in self.samples.items()}
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the system's per-resume prints"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def _system(**kwargs):
+    import main
+    with quiet():
+        return main.ResumeAgentSystem(**kwargs)
+
+def bulk_load(store, corpus, count, chunk_size=1000):
+    """Add count synthetic records through add_resumes (no LLM); returns seconds spent"""
+    started = time.perf_counter()
+    with quiet():
+        for start in range(0, count, chunk_size):
+            store.add_resumes(list(corpus.records(min(chunk_size, count - start), start)))
+    return time.perf_counter() - started
+
+def ingest(resumes=10000, files=200, seed=0, parse_workers=2, llm_workers=2, batch_size=16,
+           embedding_backend="ollama", **_):
+    """Ingest throughput: full file pipeline (parse + LLM + embed) and bulk record adds"""
+    corpus = SyntheticResumes(seed)
+    result = {}
+
+    if files:
+        paths = corpus.write_files("resumes", files)
+        system = _system(embedding_backend=embedding_backend)
+        started = time.perf_counter()
+        with quiet():
+            errors = system.ingest_folder("resumes", parse_workers=parse_workers,
+                                          llm_workers=llm_workers, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        result['file_pipeline'] = {
+            'files': len(paths),
+            'errors': len(errors or {}),
+            'seconds': round(elapsed, 3),
+            'files_per_second': round(len(paths) / elapsed, 2)
+        }
+        with quiet():
+            system.resume_store.clear()
+            system.manifest.clear()
+
+    if resumes:
+        system = _system(embedding_backend=embedding_backend)
+        elapsed = bulk_load(system.resume_store, corpus, resumes)
+        started = time.perf_counter()
+        with quiet():
+            system.resume_store.save()
+        result['bulk_add'] = {
+            'resumes': resumes,
+            'seconds': round(elapsed, 3),
+            'resumes_per_second': round(resumes / elapsed, 1),
+            'save_seconds': round(time.perf_counter() - started, 3)
+        }
+    return result
+
+def search(resumes=10000, queries=100, seed=0, embedding_backend="ollama", shards=0, shard_workers=0, **_):
+    """Search latency per query and per stage over a store of synthetic resumes (optionally sharded)"""
+    corpus = SyntheticResumes(seed)
+    # Without the result cache, so repeated queries still measure every stage
+    system = _system(embedding_backend=embedding_backend, search_cache_mb=0,
+                     shards=shards, shard_workers=shard_workers)
+    load_seconds = bulk_load(system.resume_store, corpus, resumes)
+    if shard_workers:
+        # Shard workers search the saved generation
+        with quiet():
+            system.resume_store.save()
+        system.resume_store.warm_up()  # start the workers outside the timed queries
+
+    store, agent = system.resume_store, system.search_agent
+    timer = StageTimer()
+    timer.wrap(agent, '_understand_query', 'understand_query')
+    timer.wrap(store.embeddings, 'embed_query', 'embed_query')
+    if shards:
+        timer.wrap(store, '_scatter', 'shard_scatter')
+    else:
+        timer.wrap(store, '_vector_ranking', 'vector_search')
+        timer.wrap(store.skill_postings, 'search', 'lexical_search')
+    timer.wrap(agent, '_build_similarity_matrices', 'skill_similarity')
+    timer.wrap(agent, '_rank_results', 'rank')
+
+    totals = []
+    for query in corpus.queries(queries):
+        started = time.perf_counter()
+        with quiet():
+            agent.search(query)
+        totals.append(time.perf_counter() - started)
+    stages = timer.report()
+
+    # The same queries again, answered from a warm result cache
+    agent.result_cache = SearchResultCache()
+    cached = []
+    with quiet():
+        for query in corpus.queries(queries):
+            agent.search(query)
+        for query in corpus.queries(queries):
+            started = time.perf_counter()
+            agent.search(query)
+            cached.append(time.perf_counter() - started)
+
+    return {
+        'resumes': resumes,
+        'queries': queries,
+        'load_seconds': round(load_seconds, 3),
+        'total': percentiles(totals),
+        'cached': percentiles(cached),
+        'stages': stages
+    }
+
+def startup(resumes=10000, seed=0, dimension=4096, query="python developer", embedding_backend="ollama", **_):
+    """Time-to-menu and time-to-first-search of a fresh process against a saved store"""
+    corpus = SyntheticResumes(seed)
+    system = _system(embedding_backend=embedding_backend)
+    bulk_load(system.resume_store, corpus, resumes)
+    with quiet():
+        system.resume_store.save()
+
+    # A new interpreter, so imports and lazy loading are measured cold
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get('PYTHONPATH')])))
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--fake", "--dimension", str(dimension), "--query", query],
+        capture_output=True, text=True, check=True, env=env
+    ).stdout
+    result = json.loads(output[output.index('{'):])
+    result['resumes'] = resumes
+    return result
+
+def _heap_bytes():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+def memory(resumes=10000, seed=0, embedding_backend="ollama", **_):
+    """Python heap held per resume by the store: unsaved, after save, and after a fresh load
+
+    Vectors live in FAISS (outside the Python heap) and are not counted.
+    """
+    corpus = SyntheticResumes(seed)
+    system = _system(embedding_backend=embedding_backend)
+    system.resume_store.add_resume(corpus.record(resumes))  # builds the index and loads the models
+    result = {'resumes': resumes}
+
+    tracemalloc.start()
+    base = _heap_bytes()
+    bulk_load(system.resume_store, corpus, resumes)
+    result['unsaved'] = _heap_bytes() - base
+    with quiet():
+        system.resume_store.save()
+    result['saved'] = _heap_bytes() - base
+    tracemalloc.stop()
+
+    # What a new process holds once hashes, ids, postings and skill matrices are read
+    system = _system(embedding_backend=embedding_backend)
+    store = system.resume_store
+    tracemalloc.start()
+    base = _heap_bytes()
+    with quiet():
+        store.load()
+    store.resume_hashes, store.resume_ids, store.skill_postings
+    store.get_skill_vectors(store.resumes[0])
+    result['loaded'] = _heap_bytes() - base
+    tracemalloc.stop()
+
+    for stage in ('unsaved', 'saved', 'loaded'):
+        held = result.pop(stage)
+        result[stage] = {
+            'bytes_per_resume': round(held / resumes, 1),
+            'mb_per_100k': round(held / resumes * 100000 / (1024 * 1024), 1)
+        }
+    return result
+
+SCENARIOS = {
+    'ingest': ingest,
+    'search': search,
+    'startup': startup,
+    'memory': memory
+}
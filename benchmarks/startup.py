@@ -0,0 +1,75 @@
+"""Startup benchmark: time-to-menu and time-to-first-search
+
+Run from the repository root against an existing db/:
+    python -m benchmarks.startup --query "senior python developer"
+    python -m benchmarks.startup --query "senior python developer" --warm-up --think-time 3
+
+--fake uses the offline stand-ins from benchmarks.fakes instead of Ollama.
+"""
+import time
+STARTED = time.perf_counter()
+
+from pathlib import Path
+import contextlib
+import resource
+import argparse
+import json
+import sys
+import io
+
+def run(query, warm_up=False, think_time=0.0, quiet=True):
+    """Measure cold start of ResumeAgentSystem; returns a dict of seconds"""
+    output = io.StringIO() if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        import main
+        imported = time.perf_counter()
+
+        system = main.ResumeAgentSystem()
+        system.resume_store.load()
+        if warm_up:
+            system.warm_up()
+        menu_ready = time.perf_counter()
+
+        # Simulate the user reading the menu and typing a query
+        time.sleep(think_time)
+        search_started = time.perf_counter()
+        system.search_candidates(query)
+        search_done = time.perf_counter()
+
+    return {
+        'query': query,
+        'warm_up': warm_up,
+        'think_time': think_time,
+        'import_seconds': round(imported - STARTED, 4),
+        'time_to_menu_seconds': round(menu_ready - STARTED, 4),
+        'first_search_seconds': round(search_done - search_started, 4),
+        'time_to_first_search_seconds': round(search_done - STARTED - think_time, 4),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss /
+                             (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-menu and time-to-first-search")
+    parser.add_argument("--query", default="python developer")
+    parser.add_argument("--warm-up", action="store_true", help="start the background warm-up thread")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="seconds to wait between the menu and the first search")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the system's own output")
+    parser.add_argument("--fake", action="store_true", help="use offline fake LLM and embedding models")
+    parser.add_argument("--dimension", type=int, default=4096,
+                        help="fake embedding dimension (must match the store)")
+    args = parser.parse_args()
+
+    if args.fake:
+        from benchmarks import fakes
+        fakes.install(dimension=args.dimension)
+
+    result = run(args.query, warm_up=args.warm_up, think_time=args.think_time, quiet=not args.verbose)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Deterministic synthetic resumes built from the templates in data/*.txt
+
+Resume i is always the same for a given seed, so runs at any scale (10k-1M)
+are reproducible without storing the corpus.
+"""
+from pathlib import Path
+import random
+import re
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+FIRST_NAMES = [
+    "Alex", "Priya", "Wei", "Maria", "Omar", "Sofia", "Liam", "Aisha", "Noah", "Elena",
+    "Ravi", "Chen", "Lucas", "Fatima", "Ivan", "Grace", "Kenji", "Amara", "Diego", "Hannah"
+]
+LAST_NAMES = [
+    "Garcia", "Patel", "Wang", "Kim", "Nguyen", "Rossi", "Muller", "Okafor", "Silva", "Cohen",
+    "Sato", "Kowalski", "Haddad", "Novak", "Larsen", "Mehta", "Fischer", "Dubois", "Ali", "Brown"
+]
+COMPANIES = ["Acme Corp", "DataWorks", "CloudNine", "BlueSoft", "NextGen Labs", "ByteForge"]
+QUALIFIERS = [
+    "sdk", "api", "testing", "security", "migration", "performance", "analytics",
+    "automation", "streaming", "administration"
+]
+
+class ResumeTemplates:
+    """Skill groups, tools, soft skills, titles and bullets parsed from template resumes"""
+
+    def __init__(self, templates_dir=DATA_DIR):
+        self.first_names = list(FIRST_NAMES)
+        self.last_names = list(LAST_NAMES)
+        self.skill_groups = []  # skills that appear together on one template line
+        self.tools = []
+        self.soft_skills = []
+        self.titles = []
+        self.bullets = []
+
+        for path in sorted(Path(templates_dir).glob("*.txt")):
+            self._parse(path.read_text(encoding='utf-8', errors='ignore'))
+
+        self.skill_groups = self.skill_groups or [["Python", "SQL"], ["JavaScript", "React"]]
+        self.tools = sorted(set(self.tools)) or ["Git"]
+        self.soft_skills = sorted(set(self.soft_skills)) or ["Communication"]
+        self.titles = sorted(set(self.titles)) or ["Software Engineer"]
+        self.bullets = sorted(set(self.bullets)) or ["Built web applications"]
+
+        self.technical_skills = sorted({skill for group in self.skill_groups for skill in group})
+        # Long tail of rarer skills so postings lists have realistic skew at scale
+        self.tail_skills = [f"{skill} {qualifier}" for skill in self.technical_skills for qualifier in QUALIFIERS]
+
+    def _parse(self, text):
+        lines = [line.strip() for line in text.splitlines()]
+        names = [line for line in lines if line][:1]
+        if names and len(names[0].split()) >= 2:
+            first, last = names[0].split()[0], names[0].split()[-1]
+            self.first_names.append(first)
+            self.last_names.append(last)
+
+        section = ""
+        for line in lines:
+            if not line:
+                continue
+            if line.rstrip(':').isupper() and len(line) > 3:
+                section = line.rstrip(':')
+                continue
+
+            item = line.lstrip('- ').strip()
+            if "SOFT" in section:
+                self.soft_skills.append(item)
+            elif "SKILL" in section:
+                category, _, skills = item.rpartition(':')
+                skills = [skill.strip() for skill in skills.split(',') if skill.strip()]
+                if category.strip().lower() == 'tools':
+                    self.tools.extend(skills)
+                elif skills:
+                    self.skill_groups.append(skills)
+            elif "EXPERIENCE" in section:
+                if line.startswith('-'):
+                    self.bullets.append(item)
+                elif '(' in line:
+                    title = re.split(r' at | - ', line)[0].strip()
+                    if title:
+                        self.titles.append(title)
+
+class SyntheticResumes:
+    """Generate resume texts (for the full LLM ingest path) and extracted records (for bulk adds)"""
+
+    def __init__(self, seed=0, templates_dir=DATA_DIR):
+        self.seed = seed
+        self.templates = ResumeTemplates(templates_dir)
+
+    def _rng(self, i):
+        return random.Random(self.seed * 1_000_003 + i)
+
+    def record(self, i):
+        """Resume i as the skill extractor would return it"""
+        rng = self._rng(i)
+        t = self.templates
+        first, last = rng.choice(t.first_names), rng.choice(t.last_names)
+
+        technical = []
+        for group in rng.sample(t.skill_groups, min(len(t.skill_groups), rng.randint(2, 4))):
+            technical.extend(rng.sample(group, min(len(group), rng.randint(2, 4))))
+        for _ in range(rng.randint(0, 3)):
+            # Zipf-like: a few tail skills are common, most are rare
+            technical.append(t.tail_skills[int(rng.paretovariate(1.1) * 7) % len(t.tail_skills)])
+
+        return {
+            'name': f"{first} {last}",
+            'email': f"{first}.{last}.{i}@example.com".lower(),
+            'technical_skills': list(dict.fromkeys(technical)),
+            'soft_skills': rng.sample(t.soft_skills, min(len(t.soft_skills), rng.randint(1, 3))),
+            'tools': rng.sample(t.tools, min(len(t.tools), rng.randint(1, 3))),
+            'experience_years': f"{rng.randint(1, 20)} years"
+        }
+
+    def text(self, i):
+        """Resume i rendered as a plain-text resume in the style of the templates"""
+        record = self.record(i)
+        rng = self._rng(i)
+        title = rng.choice(self.templates.titles)
+        years = int(record['experience_years'].split()[0])
+        bullets = rng.sample(self.templates.bullets, min(len(self.templates.bullets), 3))
+        lines = [
+            record['name'],
+            f"Email: {record['email']}",
+            "",
+            "SUMMARY",
+            f"{title} with {years} years of experience in {', '.join(record['technical_skills'][:3])}.",
+            "",
+            "SKILLS",
+            f"- Technical: {', '.join(record['technical_skills'])}",
+            f"- Tools: {', '.join(record['tools'])}",
+            "",
+            "SOFT SKILLS",
+            *[f"- {skill}" for skill in record['soft_skills']],
+            "",
+            "EXPERIENCE",
+            f"{title} at {rng.choice(COMPANIES)} ({2024 - years}-Present)",
+            *[f"- {bullet}" for bullet in bullets]
+        ]
+        return "\n".join(lines)
+
+    def records(self, count, start=0):
+        """Records start .. start + count - 1, generated lazily"""
+        for i in range(start, start + count):
+            yield self.record(i)
+
+    def write_files(self, folder, count, start=0):
+        """Write resume texts as .txt files and return their paths"""
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for i in range(start, start + count):
+            path = folder / f"resume_{i:07d}.txt"
+            path.write_text(self.text(i), encoding='utf-8')
+            paths.append(path)
+        return paths
+
+    def queries(self, count):
+        """Natural-language search queries over the same vocabulary"""
+        rng = random.Random(self.seed - 1)
+        t = self.templates
+        patterns = [
+            "{title} with {a} and {b}",
+            "{a} developer",
+            "senior {a} engineer with {years}+ years",
+            "candidate who knows {a}, {b} and {tool}"
+        ]
+        queries = []
+        for _ in range(count):
+            group = rng.choice(t.skill_groups)
+            a = rng.choice(group)
+            b = rng.choice(t.technical_skills)
+            queries.append(rng.choice(patterns).format(
+                title=rng.choice(t.titles), a=a, b=b, tool=rng.choice(t.tools), years=rng.randint(2, 10)
+            ))
+        return queries
@@ -1,61 +1,361 @@
 import os
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
-from tools.resume_parser import ResumeParser
+from tools.resume_parser import ParserPool
 from agents.skill_extractor import SkillExtractorAgent
 from agents.resume_store import ResumeStore
-from agents.search_agent import SearchAgent
+from agents.sharded_store import ShardedResumeStore
+from agents.search_agent import SearchAgent, QUERY_SKILL_MODES
+from tools.embedding_cache import SkillEmbeddingCache
+from tools.ingest_pipeline import IngestPipeline
+from tools.ingest_manifest import IngestManifest
+from tools.ingest_job import IngestJob
+from tools.file_lock import FileLock
+from tools.llm_cache import LLMResponseCache, LazyLLM
+from tools.search_cache import SearchResultCache
+from tools.requisitions import read_requisitions, MatchWriter
+from tools.ann_index import INDEX_TYPES, format_report
+from tools.embedding_backends import BACKENDS, MicroBatchedBackend
+from tools.micro_batcher import MicroBatcher
+from tools.http_server import ResumeServer
+from tools.tracing import tracer, log, set_log_level, LOG_LEVELS
+from collections import deque
 from pathlib import Path
+import subprocess
+import threading
+import argparse
+import asyncio
+import time
+import sys
 
 class ResumeAgentSystem:
     """Main system orchestrating all agents"""
     
-    def __init__(self):
-        print("🚀 Initializing Resume Agent System...")
-        self.parser = ResumeParser()
-        self.skill_extractor = SkillExtractorAgent()
-        self.resume_store = ResumeStore()
-        self.search_agent = SearchAgent(self.resume_store)
-        print("✅ System ready!\n")
+    def __init__(self, full_ingest=False, index_type="flat", metrics_json=None, metrics_prom=None,
+                 parse_timeout=30.0, embedding_backend=None, search_cache_mb=64, shards=0, shard_workers=0,
+                 query_skills="graph"):
+        # Everything here is cheap: the LLM client, the SentenceTransformer and the
+        # FAISS index (and their heavy imports) are only built on first use
+        log("🚀 Initializing Resume Agent System...")
+        self.full_ingest = full_ingest  # ignore the ingest manifest and re-process every file
+        self.metrics_json = metrics_json  # span/counter snapshots written by export_metrics()
+        self.metrics_prom = metrics_prom
+        self.manifest = IngestManifest()
+        self.store_lock = FileLock("db/store.lock")  # serializes checkpoints of concurrent ingest jobs
+        self.parser = ParserPool(timeout=parse_timeout)  # large PDF/DOCX files parse in killable workers
+        self.llm_cache = LLMResponseCache()  # shared by extraction and query understanding
+        self.llm = LazyLLM(llm_cache=self.llm_cache)  # one client for both agents
+        self.skill_extractor = SkillExtractorAgent(llm=self.llm)
+        self.skill_embeddings = SkillEmbeddingCache()  # shared by ingest and search
+        store_options = dict(
+            skill_encoder=self.skill_embeddings, index_type=index_type, embedding_backend=embedding_backend
+        )
+        if shards:
+            # Partitioned over db/shards/shard-NNN; an existing sharded store keeps its shard count
+            self.resume_store = ShardedResumeStore(shards=shards, workers=shard_workers, **store_options)
+        else:
+            self.resume_store = ResumeStore(**store_options)
+        self.search_cache = SearchResultCache(max_bytes=int(search_cache_mb * 1024 * 1024))
+        self.search_agent = SearchAgent(
+            self.resume_store, embedding_model=self.skill_embeddings, llm=self.llm,
+            result_cache=self.search_cache, query_skills=query_skills
+        )
+        self.batchers = {}  # name -> MicroBatcher, set up by enable_micro_batching()
+        log("✅ System ready!\n")
     
-    def ingest_resume(self, file_path):
-        """Ingest a single resume"""
-        print(f"\n📄 Processing: {file_path}")
+    def warm_up(self, background=True):
+        """Build the lazily loaded components ahead of the first search"""
+        def load():
+            started = time.perf_counter()
+            try:
+                self.llm.client
+                self.resume_store.embeddings.load()
+                self.resume_store.warm_up()
+                self.skill_embeddings.model
+            except Exception as e:
+                print(f"⚠️ Warm-up failed: {e}")
+                return
+            self.warm_up_seconds = time.perf_counter() - started
+        
+        if not background:
+            load()
+            return None
+        thread = threading.Thread(target=load, name="warm-up", daemon=True)
+        thread.start()
+        return thread
+    
+    def ingest_resume(self, file_path, full=None):
+        """Ingest a single resume (skipped if unchanged since the last ingest)"""
+        if self._is_unchanged(file_path, full):
+            log(f"⏭️ Skipping unchanged file: {file_path}", 'debug')
+            return None
         
         # 1. Parse resume
-        text = self.parser.parse(file_path)
-        print(f"✅ Extracted {len(text)} characters")
+        text = self._parse_resume(file_path)
         
         # 2. Extract skills
-        print("🤖 Extracting skills...")
-        skills_data = self.skill_extractor.extract_skills(text)
-        skills_data['file_path'] = str(file_path)
+        skills_data = self._extract_resume(file_path, text)
         
         # 3. Store in vector DB
-        self.resume_store.add_resume(skills_data)
+        self._write_resumes([skills_data])
+        
+        return skills_data
+    
+    async def aingest_resume(self, file_path, full=None):
+        """Async version of ingest_resume; parsing and store writes run in an executor"""
+        loop = asyncio.get_running_loop()
+        if await loop.run_in_executor(None, self._is_unchanged, file_path, full):
+            log(f"⏭️ Skipping unchanged file: {file_path}", 'debug')
+            return None
+        
+        text = await loop.run_in_executor(None, self._parse_resume, file_path)
+        
+        log(f"🤖 Extracting skills from {Path(file_path).name}...", 'debug')
+        with tracer.span('ingest.extract'):
+            skills_data = await self.skill_extractor.aextract_skills(text)
+        skills_data['file_path'] = str(file_path)
         
+        await loop.run_in_executor(None, self._write_resumes, [skills_data])
+        return skills_data
+    
+    def _is_unchanged(self, file_path, full=None):
+        """Check the ingest manifest before doing any parsing or LLM work"""
+        return file_path in self._unchanged_files([file_path], full)
+    
+    def _unchanged_files(self, files, full=None):
+        """Files ingested before whose contents did not change and whose resume was not deleted since"""
+        if full is None:
+            full = self.full_ingest
+        # A manifest without a store (e.g. db files removed) cannot be trusted
+        if full or not self.resume_store.resumes:
+            return set()
+        unchanged = {file: self.manifest.resume_id(file) for file in files if self.manifest.is_unchanged(file)}
+        live = self.resume_store.live_ids(resume_id for resume_id in unchanged.values() if resume_id is not None)
+        # Entries without an id (older manifests, duplicates of another file's resume) only vouch for the file
+        return {file for file, resume_id in unchanged.items() if resume_id is None or resume_id in live}
+    
+    def _parse_resume(self, file_path):
+        """Parse stage of ingestion"""
+        log(f"\n📄 Processing: {file_path}", 'debug')
+        with tracer.span('ingest.parse'):
+            # Only the part of the resume the extractor reads is parsed
+            text = self.parser.parse(file_path, max_chars=self.skill_extractor.max_chars)
+        log(f"✅ Extracted {len(text)} characters", 'debug')
+        return text
+    
+    def _extract_resume(self, file_path, text):
+        """LLM extraction stage of ingestion"""
+        log(f"🤖 Extracting skills from {Path(file_path).name}...", 'debug')
+        with tracer.span('ingest.extract'):
+            skills_data = self.skill_extractor.extract_skills(text)
+        skills_data['file_path'] = str(file_path)
         return skills_data
     
-    def ingest_folder(self, folder_path):
-        """Ingest all resumes from a folder"""
+    def ingest_folder(self, folder_path, parse_workers=2, llm_workers=2, batch_size=16, full=None):
+        """Ingest new or modified resumes from a folder through the staged pipeline"""
+        resume_files = self._resume_files(folder_path)
+        
+        log(f"\n📁 Found {len(resume_files)} resumes")
+        
+        unchanged = self._unchanged_files(resume_files, full)
+        changed_files = [file for file in resume_files if file not in unchanged]
+        if len(changed_files) < len(resume_files):
+            log(f"⏭️ Skipping {len(resume_files) - len(changed_files)} unchanged files")
+        resume_files = changed_files
+        
+        pipeline = IngestPipeline(
+            parse=self._parse_resume,
+            extract=self._extract_resume,
+            write_batch=self._write_resumes,
+            parse_workers=parse_workers,
+            llm_workers=llm_workers,
+            batch_size=batch_size
+        )
+        errors = pipeline.run(resume_files)
+        
+        if errors:
+            print(f"⚠️ {len(errors)} of {len(resume_files)} files failed")
+        
+        self.save()
+        return errors
+    
+    def _resume_files(self, folder_path):
+        """Resume files of a folder"""
         folder = Path(folder_path)
-        resume_files = list(folder.glob("*.pdf")) + list(folder.glob("*.docx")) + list(folder.glob("*.txt"))
+        return list(folder.glob("*.pdf")) + list(folder.glob("*.docx")) + list(folder.glob("*.txt"))
+    
+    def ingest_job(self, folder_path, parse_workers=2, llm_workers=2, batch_size=16, claim_size=32,
+                   checkpoint_every=100, checkpoint_seconds=60.0, full=None):
+        """Ingest a folder as a resumable job with periodic checkpoints
+        
+        Extracted resumes are journaled in db/jobs/ as soon as the LLM returns and
+        committed to the store every checkpoint_every resumes or checkpoint_seconds.
+        Rerunning after a crash or Ctrl-C resumes the job; several processes
+        running this on the same folder share the work.
+        """
+        job = IngestJob(folder_path)
+        resume_files = self._resume_files(folder_path)
+        unchanged = self._unchanged_files(resume_files, full)
+        if job.open(sorted(file for file in resume_files if file not in unchanged)):
+            log(f"\n📁 Started ingest job with {len(job.files)} new or modified resumes")
+        else:
+            log(f"\n♻️ Resuming ingest job: {job.counts()}")
+        
+        last_checkpoint = {'time': time.monotonic(), 'resumes': 0}
+        
+        def checkpoint():
+            with self.store_lock:
+                extracted = job.take_extracted()  # includes other workers' uncommitted resumes
+                if not extracted:
+                    return
+                # Another worker may have committed since we last looked
+                if self.resume_store.refresh():
+                    self.manifest.load()
+                self._store_resumes(list(extracted.values()))
+                self.save()
+                job.mark_done(list(extracted))
+            last_checkpoint.update(time=time.monotonic(), resumes=0)
+            log(f"📌 Checkpoint: {job.counts()}")
+        
+        def write_batch(batch):
+            job.mark_extracted(batch)
+            last_checkpoint['resumes'] += len(batch)
+            if last_checkpoint['resumes'] >= checkpoint_every or \
+                    time.monotonic() - last_checkpoint['time'] >= checkpoint_seconds:
+                checkpoint()
         
-        print(f"\n📁 Found {len(resume_files)} resumes")
+        try:
+            while True:
+                files = job.claim(claim_size)
+                if not files:
+                    break
+                pipeline = IngestPipeline(
+                    parse=self._parse_resume,
+                    extract=self._extract_resume,
+                    write_batch=write_batch,
+                    parse_workers=parse_workers,
+                    llm_workers=llm_workers,
+                    batch_size=batch_size
+                )
+                job.mark_failed(pipeline.run(files))
+        finally:
+            # Also on Ctrl-C: commit what was extracted and give back unfinished files
+            job.release()
+            checkpoint()
         
-        for file in resume_files:
+        counts = job.counts()
+        log(f"✅ Ingest job: {counts}")
+        if counts.get('failed'):
+            print(f"⚠️ {counts['failed']} files failed")
+        return job
+    
+    def _write_resumes(self, batch):
+        """Writer stage of ingestion (single thread)"""
+        with tracer.span('ingest.write_batch'):
+            self._store_resumes(batch)
+    
+    def _store_resumes(self, batch):
+        """Add extracted resumes and record their files in the manifest
+        
+        A modified file replaces the resume stored for its previous version
+        (same resume id) instead of adding a second one.
+        """
+        previous = {}  # resume id stored for a file's previous version -> position in batch
+        for i, skills_data in enumerate(batch):
+            resume_id = self.manifest.resume_id(skills_data['file_path'])
+            if resume_id is not None:
+                previous[resume_id] = i
+        live = self.resume_store.live_ids(previous) if previous else set()
+        replaced = {i: resume_id for resume_id, i in previous.items() if resume_id in live}
+        
+        new = [i for i in range(len(batch)) if i not in replaced]
+        ids = dict(zip(new, self.resume_store.reserve_ids(len(new))))
+        if new:
+            self.resume_store.add_resumes([batch[i] for i in new], resume_ids=[ids[i] for i in new])
+        for i, resume_id in replaced.items():
             try:
-                self.ingest_resume(file)
-            except Exception as e:
-                print(f"❌ Error processing {file}: {e}")
+                self.resume_store.update(resume_id, batch[i])
+            except ValueError:
+                # The new version duplicates another stored resume, which stays the only copy
+                self.resume_store.delete(resume_id)
+            ids[i] = resume_id
+        
+        # Duplicates of other resumes were not stored under their id
+        stored = self.resume_store.live_ids(ids.values())
+        for i, skills_data in enumerate(batch):
+            self.manifest.record(skills_data['file_path'], ids[i] if ids[i] in stored else None)
+    
+    def reshard(self, shards):
+        """Bring a loaded sharded store to `shards` shards, importing the unsharded store the first time"""
+        store = self.resume_store
+        if len(store.shards) != shards:
+            store.rebalance(shards)
+        elif not len(store.resumes) and Path("db/store.json").exists():
+            single = ResumeStore(skill_encoder=self.skill_embeddings)
+            single.load()
+            store.import_store(single)
+    
+    def enable_micro_batching(self, max_batch_size=64, max_wait_ms=2.0):
+        """Merge encodes from concurrent searches into shared batches; call after the store is loaded"""
+        skills = MicroBatcher(lambda texts: self.skill_embeddings.model.encode(texts), max_batch_size,
+                              max_wait_ms, name="skill-encoder")
+        self.skill_embeddings.batcher = skills
         
+        backend = self.resume_store.embeddings
+        queries = MicroBatcher(backend.embed_queries, max_batch_size, max_wait_ms, name="query-embeddings")
+        self.resume_store.embeddings = MicroBatchedBackend(backend, queries)
+        self.batchers = {'skill_encoder': skills, 'query_embeddings': queries}
+    
+    def save(self):
+        """Persist the store, then the manifest that vouches for it"""
         self.resume_store.save()
+        self.manifest.save()
     
     def search_candidates(self, query):
         """Search for candidates"""
-        print(f"\n🔍 Searching for: {query}")
+        log(f"\n🔍 Searching for: {query}")
         results = self.search_agent.search(query)
+        self._print_results(results)
+        return results
+    
+    def match_requisitions(self, input_path, output_path, top_n=10, batch_size=64):
+        """Match every job description in a file against the store, streaming the top_n per requisition"""
+        pending = deque()  # ids of requisitions handed to the matcher, in order
         
+        def descriptions():
+            for requisition_id, description in read_requisitions(input_path):
+                pending.append(requisition_id)
+                yield description
+        
+        started = time.perf_counter()
+        with MatchWriter(output_path) as writer:
+            matches = self.search_agent.match_batch(descriptions(), top_n=top_n, batch_size=batch_size)
+            for description, results in matches:
+                writer.write(pending.popleft(), description, results)
+                if writer.requisitions % batch_size == 0:
+                    log(f"📝 Matched {writer.requisitions} requisitions")
+        log(f"✅ Matched {writer.requisitions} requisitions in {time.perf_counter() - started:.1f}s, "
+            f"{writer.rows} rows written to {output_path}")
+        return writer.requisitions
+    
+    async def asearch_candidates(self, query):
+        """Async version of search_candidates"""
+        log(f"\n🔍 Searching for: {query}")
+        results = await self.search_agent.asearch(query)
+        self._print_results(results)
+        return results
+    
+    def export_metrics(self):
+        """Write the tracer's snapshot as JSON and/or Prometheus text, if paths were given"""
+        if not tracer.enabled:
+            return
+        if self.metrics_json:
+            tracer.write_json(self.metrics_json)
+        if self.metrics_prom:
+            tracer.write_prometheus(self.metrics_prom)
+    
+    def _print_results(self, results):
+        """Print ranked candidates"""
         print(f"\n📊 Found {len(results)} candidates:\n")
         
         for i, result in enumerate(results, 1):
@@ -64,8 +364,6 @@ class ResumeAgentSystem:
             print(f"   Skills: {', '.join(resume.get('technical_skills', [])[:5])}")
             print(f"   Match: {result['match_reason']}")
             print()
-        
-        return results
     
     def interactive_mode(self):
         """Interactive search mode"""
@@ -79,10 +377,11 @@ class ResumeAgentSystem:
             print("  1. Search for candidates")
             print("  2. Ingest resume or folder")
             print("  3. List all resumes")
-            print("  4. Quit")
+            print("  4. Delete resume")
+            print("  5. Quit")
             print("-"*60)
             
-            choice = input("\n💬 Enter your choice (1-4): ").strip()
+            choice = input("\n💬 Enter your choice (1-5): ").strip()
             
             if choice == '1':
                 query = input("🔍 Enter search query: ").strip()
@@ -97,29 +396,166 @@ class ResumeAgentSystem:
                     if Path(path).is_dir():
                         self.ingest_folder(path)
                     elif Path(path).is_file():
-                        self.ingest_resume(path)
+                        if self.ingest_resume(path) is not None:
+                            self.save()
                     else:
                         print("❌ Invalid path. Please provide a valid file or folder path")
                 else:
                     print("❌ Path cannot be empty")
             
             elif choice == '3':
-                print(f"\n📋 Total resumes: {len(self.resume_store.resumes)}")
-                for i, resume in enumerate(self.resume_store.resumes, 1):
-                    print(f"{i}. {resume.get('name', 'Unknown')} - {len(resume.get('technical_skills', []))} skills")
+                print(f"\n📋 Total resumes: {self.resume_store.get_stats()['total_resumes']}")
+                for resume in self.resume_store.iter_resumes():
+                    print(f"{resume['resume_id']}. {resume.get('name', 'Unknown')} - {len(resume.get('technical_skills', []))} skills")
             
             elif choice == '4':
+                resume_id = input("🗑️ Enter resume id (see List all resumes): ").strip()
+                try:
+                    self.resume_store.delete(int(resume_id))
+                    self.resume_store.save()
+                except (ValueError, KeyError):
+                    print(f"❌ No resume with id {resume_id}")
+            
+            elif choice == '5':
+                self.parser.close()
+                self.export_metrics()
+                if tracer.enabled:
+                    print(f"\n⏱️ Stage latencies:\n{tracer.summary()}")
+                    print(f"🗃️ Search cache: {self.search_cache.get_stats()}")
                 print("👋 Goodbye!")
                 break
             
             else:
-                print("❌ Invalid choice. Please enter a number between 1 and 4")
+                print("❌ Invalid choice. Please enter a number between 1 and 5")
+            
+            # Refresh the metrics files after every command so scrapers see current values
+            self.export_metrics()
 
 def main():
-    system = ResumeAgentSystem()
+    parser = argparse.ArgumentParser(description="Resume Agent System")
+    parser.add_argument("--full", action="store_true",
+                        help="re-process every file, ignoring the ingest manifest")
+    parser.add_argument("--warm-up", action="store_true",
+                        help="load models and the index in the background while the menu is shown")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat",
+                        help="vector index type for new stores and --rebuild-index")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="rebuild the saved index (or migrate db/faiss_index.pkl) as --index-type and exit")
+    parser.add_argument("--index-report", action="store_true",
+                        help="print recall and latency of every index type on the saved vectors and exit")
+    parser.add_argument("--parse-timeout", type=float, default=30.0,
+                        help="seconds before parsing a large PDF/DOCX file is abandoned")
+    parser.add_argument("--embedding-backend", choices=list(BACKENDS),
+                        help="document embeddings for new stores (default: what the saved store used, else ollama)")
+    parser.add_argument("--reembed", action="store_true",
+                        help="re-embed the saved store with --embedding-backend and exit")
+    parser.add_argument("--ingest-job", metavar="FOLDER",
+                        help="ingest a folder as a resumable, checkpointed job and exit")
+    parser.add_argument("--job-workers", type=int, default=1,
+                        help="processes draining the --ingest-job queue")
+    parser.add_argument("--checkpoint-every", type=int, default=100,
+                        help="commit the store after this many extracted resumes")
+    parser.add_argument("--checkpoint-seconds", type=float, default=60.0,
+                        help="commit the store at least this often")
+    parser.add_argument("--match-jobs", metavar="FILE",
+                        help="match the job descriptions in FILE (.jsonl, .csv or blank-line separated text) and exit")
+    parser.add_argument("--match-output", default="matches.csv",
+                        help="where --match-jobs writes the top candidates (.csv or .jsonl)")
+    parser.add_argument("--top-n", type=int, default=10, help="candidates written per requisition")
+    parser.add_argument("--match-batch-size", type=int, default=64,
+                        help="requisitions embedded, searched and scored together")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="partition the store over this many shards in db/shards (rebalances an existing one)")
+    parser.add_argument("--shard-workers", type=int, default=0,
+                        help="processes searching the shards (default: threads in this process)")
+    parser.add_argument("--serve", action="store_true",
+                        help="run a local HTTP/JSON server (POST /search, POST /ingest, GET /stats) instead of the menu")
+    parser.add_argument("--host", default="127.0.0.1", help="address the server binds to")
+    parser.add_argument("--port", type=int, default=8000, help="port the server listens on")
+    parser.add_argument("--encode-batch-size", type=int, default=64,
+                        help="most texts merged into one encode while serving")
+    parser.add_argument("--encode-wait-ms", type=float, default=2.0,
+                        help="how long a served encode waits for others to join its batch")
+    parser.add_argument("--query-skills", choices=QUERY_SKILL_MODES, default="graph",
+                        help="expand the LLM's query skills from the store's skill graph, with the LLM only, "
+                             "or offline: skills found in the query text by the graph, no LLM call")
+    parser.add_argument("--search-cache-mb", type=float, default=64,
+                        help="memory for cached search results and query skills (0 disables the cache)")
+    parser.add_argument("--log-level", choices=list(LOG_LEVELS), default="debug",
+                        help="'info' hides per-resume and per-candidate details, 'warning' also hides progress messages")
+    parser.add_argument("--trace", action="store_true",
+                        help="time ingest and search stages (implied by --metrics-json/--metrics-prom)")
+    parser.add_argument("--metrics-json", help="write stage latencies and counters to this JSON file")
+    parser.add_argument("--metrics-prom", help="write stage latencies and counters in Prometheus text format")
+    args = parser.parse_args()
+    
+    set_log_level(args.log_level)
+    tracer.enabled = bool(args.trace or args.metrics_json or args.metrics_prom)
     
-    # Load existing data
+    system = ResumeAgentSystem(
+        full_ingest=args.full, index_type=args.index_type,
+        metrics_json=args.metrics_json, metrics_prom=args.metrics_prom,
+        parse_timeout=args.parse_timeout,
+        embedding_backend=None if args.reembed else args.embedding_backend,
+        search_cache_mb=args.search_cache_mb, shards=args.shards, shard_workers=args.shard_workers,
+        query_skills=args.query_skills
+    )
+    
+    # Load existing data (records and index are opened lazily)
     system.resume_store.load()
+    if args.shards:
+        system.reshard(args.shards)
+    
+    if args.reembed:
+        if not args.embedding_backend:
+            parser.error("--reembed needs --embedding-backend")
+        system.resume_store.reembed(args.embedding_backend)
+        system.resume_store.save()
+        return
+    
+    if args.ingest_job:
+        # Extra processes running the same job; they coordinate through db/jobs/ and file locks
+        command = [sys.executable, os.path.abspath(__file__), "--ingest-job", args.ingest_job,
+                   "--checkpoint-every", str(args.checkpoint_every),
+                   "--checkpoint-seconds", str(args.checkpoint_seconds),
+                   "--parse-timeout", str(args.parse_timeout), "--index-type", args.index_type,
+                   "--log-level", "warning", "--shards", str(args.shards)] + (["--full"] if args.full else []) + \
+                  (["--embedding-backend", args.embedding_backend] if args.embedding_backend else [])
+        helpers = [subprocess.Popen(command) for _ in range(args.job_workers - 1)]
+        try:
+            system.ingest_job(args.ingest_job, checkpoint_every=args.checkpoint_every,
+                              checkpoint_seconds=args.checkpoint_seconds)
+        finally:
+            for helper in helpers:
+                helper.wait()
+        system.export_metrics()
+        return
+    
+    if args.match_jobs:
+        system.match_requisitions(args.match_jobs, args.match_output, top_n=args.top_n,
+                                  batch_size=args.match_batch_size)
+        system.export_metrics()
+        return
+    
+    if args.index_report:
+        print(format_report(system.resume_store.evaluate_index_types()))
+        return
+    if args.rebuild_index:
+        system.resume_store.rebuild_index(args.index_type)
+        system.resume_store.save()
+        system.export_metrics()
+        return
+    
+    if args.serve:
+        system.enable_micro_batching(args.encode_batch_size, args.encode_wait_ms)
+        system.warm_up(background=False)
+        ResumeServer(system, host=args.host, port=args.port).serve_forever()
+        system.parser.close()
+        system.export_metrics()
+        return
+    
+    if args.warm_up:
+        system.warm_up()
     
     # Start interactive mode
     system.interactive_mode()
@@ -0,0 +1,53 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Offline stand-ins for Ollama and SentenceTransformer, registered before anything imports them
+from benchmarks import fakes
+fakes.install(dimension=64)
+
+from tools.tracing import set_log_level
+import pytest
+
+set_log_level('warning')
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory, since stores, caches and manifests live under ./db"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def make_store(workdir):
+    """Build ResumeStores on ./db with a skill encoder, as the app does"""
+    from agents.resume_store import ResumeStore
+    from tools.embedding_cache import SkillEmbeddingCache
+
+    def make(**options):
+        options.setdefault('skill_encoder', SkillEmbeddingCache())
+        return ResumeStore(**options)
+    return make
+
+@pytest.fixture
+def corpus():
+    from benchmarks.synthetic import SyntheticResumes
+    return SyntheticResumes(0)
+
+@pytest.fixture
+def query_backend():
+    """Wrap a backend so query vectors differ from document vectors, as with instruction-tuned models"""
+
+    class QueryBackend:
+        def __init__(self, backend):
+            self.backend = backend
+
+        def embed_query(self, text):
+            return [-x for x in self.backend.embed_query(text)]
+
+        def embed_queries(self, texts):
+            return [self.embed_query(text) for text in texts]
+
+        def __getattr__(self, name):
+            return getattr(self.backend, name)
+    return QueryBackend
@@ -0,0 +1,14 @@
+import numpy as np
+
+from tools.embedding_backends import OllamaBackend
+
+def test_ollama_embeds_a_batch_of_queries_in_one_call(monkeypatch):
+    backend = OllamaBackend()
+    client = backend.load()
+    expected = [client.embed_query(text) for text in ('python developer', 'java engineer')]
+    calls = []
+    embed_documents = type(client).embed_documents
+    monkeypatch.setattr(type(client), 'embed_documents',
+                        lambda self, texts: calls.append(texts) or embed_documents(self, texts))
+    assert np.allclose(backend.embed_queries(('python developer', 'java engineer')), expected)
+    assert calls == [['python developer', 'java engineer']]
@@ -0,0 +1,44 @@
+from benchmarks.fakes import HashingSentenceTransformer
+from tools.embedding_cache import SkillEmbeddingCache
+import multiprocessing
+import numpy as np
+import pytest
+
+def _cache(path):
+    return SkillEmbeddingCache(cache_dir=str(path), model=HashingSentenceTransformer())
+
+def _expected(skills):
+    return HashingSentenceTransformer().encode(skills)
+
+def test_two_caches_on_one_directory_keep_their_rows(tmp_path):
+    first, second = _cache(tmp_path), _cache(tmp_path)
+    first.encode(["python", "java"])
+    second.encode(["docker", "kubernetes"])
+    first.encode(["aws"])
+
+    skills = ["python", "java", "docker", "kubernetes", "aws"]
+    reloaded = _cache(tmp_path)
+    assert reloaded.get_stats()['disk_items'] == len(skills)
+    assert np.allclose(reloaded.encode(skills), _expected(skills))
+    assert reloaded.misses == 0
+
+def _append_skills(path, prefix):
+    cache = _cache(path)
+    for start in range(0, 300, 10):
+        cache.encode([f"{prefix} skill {i}" for i in range(start, start + 10)])
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_processes_appending_to_one_cache(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_append_skills, args=(tmp_path, prefix)) for prefix in ("a", "b")]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    skills = [f"{prefix} skill {i}" for prefix in ("a", "b") for i in range(300)]
+    reloaded = _cache(tmp_path)
+    assert reloaded.get_stats()['disk_items'] == len(skills)
+    assert np.allclose(reloaded.encode(skills), _expected(skills))
+    assert reloaded.misses == 0
@@ -0,0 +1,63 @@
+import main
+
+def _write(folder, name, skills):
+    path = folder / f"{name}.txt"
+    path.write_text(f"{name}\n{name}@example.com\nSkills: {', '.join(skills)}\n")
+    return path
+
+def _live(system):
+    return list(system.resume_store.iter_resumes())
+
+def test_modified_file_replaces_its_resume(workdir):
+    folder = workdir / "resumes"
+    folder.mkdir()
+    path = _write(folder, "ada", ["Python", "Docker"])
+    _write(folder, "bob", ["Java"])
+    system = main.ResumeAgentSystem()
+    assert not system.ingest_folder(str(folder))
+    before = {r['file_path']: r for r in _live(system)}
+    assert len(before) == 2
+
+    _write(folder, "ada", ["Kubernetes"])
+    assert not system.ingest_folder(str(folder))
+    after = {r['file_path']: r for r in _live(system)}
+    assert len(after) == 2
+    assert after[str(path)]['resume_id'] == before[str(path)]['resume_id']
+    assert after[str(path)]['technical_skills'] == ["kubernetes"]
+
+    # Also after a restart, and for single-file ingest
+    system = main.ResumeAgentSystem()
+    system.resume_store.load()
+    _write(folder, "ada", ["SQL"])
+    system.ingest_resume(path)
+    records = [r for r in _live(system) if r['file_path'] == str(path)]
+    assert len(records) == 1 and records[0]['technical_skills'] == ["sql"]
+
+def test_ingest_job_replaces_modified_files(workdir):
+    folder = workdir / "resumes"
+    folder.mkdir()
+    path = _write(folder, "ada", ["Python"])
+    system = main.ResumeAgentSystem()
+    system.ingest_job(str(folder))
+    _write(folder, "ada", ["Docker"])
+    system.ingest_job(str(folder))
+    records = _live(system)
+    assert len(records) == 1 and records[0]['technical_skills'] == ["docker"]
+    assert system.manifest.resume_id(path) == records[0]['resume_id']
+
+def test_deleted_resume_is_ingested_again(workdir):
+    folder = workdir / "resumes"
+    folder.mkdir()
+    path = _write(folder, "ada", ["Python"])
+    _write(folder, "bob", ["Java"])
+    system = main.ResumeAgentSystem()
+    system.ingest_folder(str(folder))
+    system.resume_store.delete(system.manifest.resume_id(path))
+    system.save()
+
+    system = main.ResumeAgentSystem()
+    system.resume_store.load()
+    assert system._is_unchanged(folder / "bob.txt")
+    assert not system._is_unchanged(path)
+    system.ingest_folder(str(folder))
+    assert sorted(r['file_path'] for r in _live(system)) == sorted(str(file) for file in folder.iterdir())
@@ -0,0 +1,56 @@
+from tools.ingest_pipeline import IngestPipeline
+import threading
+import pytest
+
+def _pipeline(write_batch, **options):
+    return IngestPipeline(
+        parse=lambda file: f"text of {file}",
+        extract=lambda file, text: {'file_path': file},
+        write_batch=write_batch, **options
+    )
+
+def test_failed_batch_is_reported_per_file():
+    written = []
+
+    def write_batch(batch):
+        if any(resume['file_path'] == "f5" for resume in batch):
+            raise ConnectionError("embedding server down")
+        written.extend(resume['file_path'] for resume in batch)
+
+    files = [f"f{i}" for i in range(10)]
+    errors = _pipeline(write_batch, batch_size=4).run(files)
+
+    assert sorted(errors) == ["f4", "f5", "f6", "f7"]
+    assert all(isinstance(error, ConnectionError) for error in errors.values())
+    assert written == ["f0", "f1", "f2", "f3", "f8", "f9"]
+
+class _Abort(BaseException):
+    pass
+
+def test_stages_exit_when_the_writer_aborts():
+    before = threading.active_count()
+
+    def write_batch(batch):
+        raise _Abort()
+
+    pipeline = _pipeline(write_batch, batch_size=1, queue_size=1, parse_workers=2, llm_workers=2)
+    with pytest.raises(_Abort):
+        pipeline.run([f"f{i}" for i in range(200)])
+    assert threading.active_count() == before
+
+def test_ingest_folder_saves_and_reports_write_errors(workdir, monkeypatch):
+    import main
+    folder = workdir / "resumes"
+    folder.mkdir()
+    for i in range(3):
+        (folder / f"r{i}.txt").write_text(f"Person {i}\nperson{i}@example.com\nSkills: Python, Docker\n")
+
+    system = main.ResumeAgentSystem()
+    monkeypatch.setattr(system.resume_store, 'add_resumes', lambda *args, **kwargs: 1 / 0)
+    saved = []
+    monkeypatch.setattr(system, 'save', lambda: saved.append(True))
+
+    errors = system.ingest_folder(str(folder))
+    assert sorted(errors) == sorted(str(file) for file in folder.iterdir())
+    assert saved
+    assert not any(system.manifest.is_unchanged(file) for file in folder.iterdir())
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+def test_duplicates_within_one_batch_are_added_once(make_store, corpus):
+    store = make_store()
+    records = list(corpus.records(50))
+    assert store.add_resumes(records + records[:20] + [dict(records[7])]) == 50
+    assert store.get_stats()['total_resumes'] == 50
+    assert store.add_resumes(records) == 0
+
+def test_add_embedded_skips_duplicates_within_the_batch(make_store, corpus):
+    store = make_store()
+    records = list(corpus.records(10))
+    vectors = store.embeddings.embed_documents([store._create_search_text(r) for r in records])
+    added = store.add_embedded(records + records[:3], vectors + vectors[:3], list(range(13)))
+    assert added == 10
+    assert len(store.resumes) == 10
+    assert np.array_equal(store.resume_ids, np.arange(10))
+
+def test_ivf_upgrade_waits_for_enough_vectors_and_trains_on_them(make_store, corpus, monkeypatch, capfd):
+    from tools import ann_index
+    builds = []
+    build_index = ann_index.build_index
+    monkeypatch.setattr(ann_index, 'build_index', lambda *a, **k: builds.append(a[0]) or build_index(*a, **k))
+    store = make_store(index_type='ivf_flat', index_options={'nlist': 4}, train_size=10)
+    store.add_resumes(list(corpus.records(100)))
+    assert ann_index.index_type_of(store.vectorstore.index) == 'flat'
+    assert 'ivf_flat' not in builds
+    store.add_resumes(list(corpus.records(100, start=100)))
+    assert ann_index.index_type_of(store.vectorstore.index) == 'ivf_flat'
+    assert store.vectorstore.index.ntotal == 200
+    assert 'please provide at least' not in capfd.readouterr().err
+    assert len(store.search('python developer', k=5)) == 5
+
+def test_batched_search_embeds_queries_like_single_search(make_store, corpus, query_backend):
+    store = make_store()
+    store.add_resumes(list(corpus.records(100)))
+    store.embeddings = query_backend(store.embeddings)
+    queries = ['python developer', 'java backend engineer', 'data scientist with SQL']
+    skills = [['Python'], ['Java'], ['SQL']]
+    batched = store.hybrid_search_batch(queries, skills, k=5, chunk_size=2)
+    single = [store.hybrid_search(query, s, k=5) for query, s in zip(queries, skills)]
+    assert [[r['resume_id'] for r in rs] for rs in batched] == [[r['resume_id'] for r in rs] for rs in single]
+
+def _crash(*args, **kwargs):
+    raise OSError("simulated crash")
+
+def _ids(records):
+    return sorted(r['resume_id'] for r in records)
+
+def test_reload_after_crash_mid_save_sees_the_previous_generation(make_store, corpus):
+    store = make_store()
+    store.add_resumes(list(corpus.records(50)))
+    store.delete(0)
+    store.save()
+    committed = _ids(store.iter_resumes())
+    hits = _ids(store.hybrid_search('python developer', ['Python'], k=10))
+
+    store.add_resumes(list(corpus.records(30, start=50)))
+    store.delete(hits[0])
+    store.delete(1)
+    store._write_manifest = _crash  # everything but the manifest gets written
+    with pytest.raises(OSError):
+        store.save()
+
+    reloaded = make_store()
+    reloaded.load()
+    assert _ids(reloaded.iter_resumes()) == committed
+    assert reloaded.tombstones == {0}
+    assert _ids(reloaded.hybrid_search('python developer', ['Python'], k=10)) == hits
+    assert reloaded.add_resumes(list(corpus.records(30, start=50))) == 30
+    reloaded.save()
+    again = make_store()
+    again.load()
+    assert len(again.search('java', k=100)) == 79
+
+def test_reload_after_crash_mid_compaction_finishes_it(make_store, corpus):
+    store = make_store(compact_threshold=0.1)
+    store.add_resumes(list(corpus.records(50)))
+    store.save()
+    for resume_id in range(10):
+        store.delete(resume_id)
+    store._replay_renames = _crash  # the manifest has committed, no file was moved yet
+    with pytest.raises(OSError):
+        store.save()
+
+    reloaded = make_store()
+    reloaded.load()
+    assert _ids(reloaded.iter_resumes()) == list(range(10, 50))
+    assert not reloaded.tombstones
+    assert len(reloaded.search('python developer', k=100)) == 40
+
+@pytest.mark.parametrize('index_type', ['flat', 'hnsw', 'ivf_flat'])
+def test_loaded_index_is_mapped_until_resumes_are_added(make_store, corpus, index_type):
+    options = dict(index_type=index_type, index_options={'nlist': 4} if index_type == 'ivf_flat' else {})
+    store = make_store(**options)
+    store.add_resumes(list(corpus.records(200)))
+    store.save()
+    hits = _ids(store.search('python developer', k=10))
+
+    reloaded = make_store(**options)
+    reloaded.load()
+    assert _ids(reloaded.search('python developer', k=10)) == hits
+    assert reloaded._index_mapped
+    reloaded.delete(hits[0])
+    reloaded.save()  # still mapped, now to the new generation's file
+    assert reloaded._index_mapped and not store.index_path.exists()
+    assert reloaded.add_resumes(list(corpus.records(20, start=200))) == 20
+    assert not reloaded._index_mapped
+    reloaded.save()
+
+    again = make_store(**options)
+    again.load()
+    from tools import ann_index
+    assert ann_index.index_type_of(again.vectorstore.index) == index_type
+    assert len(again.search('java', k=300)) == 219
\ No newline at end of file
@@ -0,0 +1,77 @@
+from agents.search_agent import SearchAgent
+import json
+
+class _LLM:
+    """Answers the structured query prompt with fixed skills"""
+
+    def __init__(self, required, related):
+        self.reply = json.dumps({'required_skills': required, 'related_skills': related})
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        return self.reply
+
+def _agent(make_store, corpus, llm, **options):
+    store = make_store()
+    store.add_resumes(list(corpus.records(300)))
+    options.setdefault('related_threshold', 0.0)  # the fake encoder's neighbors are far apart
+    return SearchAgent(store, llm=llm, embedding_model=store.skill_encoder, **options)
+
+def test_unseen_required_skills_are_kept(make_store, corpus):
+    llm = _LLM(["python", "terraform"], ["ansible"])
+    agent = _agent(make_store, corpus, llm)
+
+    required, expanded = agent._understand_query("python and terraform")
+    assert llm.calls == 1
+    assert required == ["python", "terraform"]
+    neighbors = agent.resume_store.skill_neighbors(["python"])["python"]
+    assert set(neighbors) & set(expanded)
+    assert "ansible" in expanded  # the graph cannot expand terraform, so the LLM's related skills stay
+    assert "terraform" not in agent.resume_store.skill_neighbors(["terraform"])
+
+def test_known_skills_are_expanded_from_the_graph(make_store, corpus):
+    llm = _LLM(["python"], ["made up skill"])
+    agent = _agent(make_store, corpus, llm)
+
+    required, expanded = agent._understand_query("python developer")
+    assert required == ["python"]
+    assert expanded[0] == "python" and len(expanded) > 1
+    assert "made up skill" not in expanded
+    assert set(expanded[1:]) <= set(agent.resume_store.skill_neighbors(["python"])["python"])
+
+def test_llm_mode_keeps_the_llm_expansion(make_store, corpus):
+    llm = _LLM(["python"], ["made up skill"])
+    agent = _agent(make_store, corpus, llm, query_skills="llm")
+    assert agent._understand_query("python developer") == (["python"], ["python", "made up skill"])
+
+def test_offline_mode_makes_no_llm_call(make_store, corpus):
+    llm = _LLM(["python"], [])
+    agent = _agent(make_store, corpus, llm, query_skills="offline")
+    required, _ = agent._understand_query("Senior Python engineer")
+    assert required == ["python"]
+    assert llm.calls == 0
+
+def test_similarity_matrix_matches_per_pair_cosine_percentages():
+    import numpy as np
+    from agents.search_agent import SkillSimilarityMatrix
+
+    rng = np.random.default_rng(0)
+    shared = rng.standard_normal(384)
+    vectors = {}
+
+    class Encoder:
+        def encode(self, texts):
+            for text in texts:
+                vectors.setdefault(text, (shared + rng.standard_normal(384)).astype(np.float32))
+            return np.array([vectors[text] for text in texts])
+
+    required = [f"req{i}" for i in range(300)]
+    candidates = [f"cand{i}" for i in range(1000)]
+    similarity = SkillSimilarityMatrix.encode(Encoder(), required, candidates)
+    a = np.array([vectors[skill] for skill in required], dtype=np.float64)
+    b = np.array([vectors[skill] for skill in candidates], dtype=np.float64)
+    cosine = (a @ b.T) / np.outer(np.linalg.norm(a, axis=1), np.linalg.norm(b, axis=1))
+    for row, skill in enumerate(required):
+        expected = [round(float(value) * 100, 1) for value in cosine[row]]
+        assert [round(float(value) * 100, 1) for value in similarity.scores(skill, candidates)] == expected
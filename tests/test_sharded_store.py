@@ -0,0 +1,45 @@
+from agents.sharded_store import ShardedResumeStore
+from tools.embedding_cache import SkillEmbeddingCache
+
+def test_revision_never_repeats_across_rebalance(workdir, corpus):
+    store = ShardedResumeStore(shards=4, skill_encoder=SkillEmbeddingCache())
+    seen = [store.revision]
+
+    def changed():
+        revision = store.revision
+        assert revision > seen[-1]
+        seen.append(revision)
+
+    store.add_resumes(list(corpus.records(200)))
+    changed()
+    for shards in (2, 5, 1, 3):
+        store.rebalance(shards)
+        changed()
+        store.delete(next(store.iter_resumes())['resume_id'])
+        changed()
+    assert store.revision == seen[-1]  # unchanged store, same revision
+    assert store.get_stats()['total_resumes'] == 196
+
+def test_cached_results_are_not_served_after_rebalance(workdir, corpus):
+    from agents.search_agent import SearchAgent
+    store = ShardedResumeStore(shards=4, skill_encoder=SkillEmbeddingCache())
+    store.add_resumes(list(corpus.records(100)))
+    agent = SearchAgent(store, embedding_model=store.shards[0].skill_encoder, query_skills="offline")
+    query = "python developer"
+    assert agent.search(query)
+    store.rebalance(1)
+    for resume in list(store.iter_resumes()):
+        if "python" in [skill.lower() for skill in resume.get('technical_skills', [])]:
+            store.delete(resume['resume_id'])
+    results = agent.search(query)
+    assert all("python" not in [s.lower() for s in r['resume'].get('technical_skills', [])] for r in results)
+
+def test_batched_search_embeds_queries_like_single_search(workdir, corpus, query_backend):
+    store = ShardedResumeStore(shards=3, skill_encoder=SkillEmbeddingCache())
+    store.add_resumes(list(corpus.records(100)))
+    store.embeddings = query_backend(store.embeddings)
+    queries = ['python developer', 'java backend engineer']
+    skills = [['Python'], ['Java']]
+    batched = store.hybrid_search_batch(queries, skills, k=5)
+    single = [store.hybrid_search(query, s, k=5) for query, s in zip(queries, skills)]
+    assert [[r['resume_id'] for r in rs] for rs in batched] == [[r['resume_id'] for r in rs] for rs in single]
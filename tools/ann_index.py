@@ -0,0 +1,204 @@
+import numpy as np
+import math
+import time
+
+# faiss is imported inside the functions to keep startup fast
+
+INDEX_TYPES = ('flat', 'ivf_flat', 'hnsw', 'ivf_pq', 'sq_fp16')
+METRICS = ('l2', 'ip')  # L2 distance, or inner product (cosine similarity on normalized vectors)
+
+def default_nlist(count):
+    """Number of IVF lists for a collection size (about 4 * sqrt(n), at least 1)"""
+    return max(1, min(65536, int(4 * math.sqrt(max(count, 1)))))
+
+def default_pq_m(dimension):
+    """Largest usual number of PQ sub-quantizers that divides the dimension"""
+    for m in (64, 48, 32, 24, 16, 12, 8, 4, 2):
+        if dimension % m == 0:
+            return m
+    return 1
+
+def _faiss_metric(metric):
+    import faiss
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {', '.join(METRICS)}")
+    return faiss.METRIC_INNER_PRODUCT if metric == 'ip' else faiss.METRIC_L2
+
+def build_index(index_type, dimension, count=0, nlist=None, pq_m=None, pq_bits=8, hnsw_m=32,
+                ef_construction=40, metric='l2'):
+    """Create an empty (possibly untrained) index of the given type and metric"""
+    import faiss
+    faiss_metric = _faiss_metric(metric)
+    if index_type == 'flat':
+        return faiss.IndexFlat(dimension, faiss_metric)
+    if index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m, faiss_metric)
+        index.hnsw.efConstruction = ef_construction
+        return index
+    if index_type == 'sq_fp16':
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss_metric)
+
+    nlist = nlist or default_nlist(count)
+    quantizer = faiss.IndexFlat(dimension, faiss_metric)
+    if index_type == 'ivf_flat':
+        return faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss_metric)
+    if index_type == 'ivf_pq':
+        return faiss.IndexIVFPQ(
+            quantizer, dimension, nlist, pq_m or default_pq_m(dimension), pq_bits, faiss_metric
+        )
+    raise ValueError(f"Unknown index type '{index_type}', expected one of {', '.join(INDEX_TYPES)}")
+
+def index_type_of(index):
+    """Name of the INDEX_TYPES entry an index was built as"""
+    import faiss
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return 'hnsw'
+    if isinstance(index, faiss.IndexIVFPQ):
+        return 'ivf_pq'
+    if isinstance(index, faiss.IndexIVFFlat):
+        return 'ivf_flat'
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return 'sq_fp16'
+    return 'flat'
+
+def metric_of(index):
+    """'ip' for inner-product indexes, else 'l2'"""
+    import faiss
+    return 'ip' if index.metric_type == faiss.METRIC_INNER_PRODUCT else 'l2'
+
+def build_options_of(index):
+    """build_index() options that recreate an index's structure (lists, codes, graph degree)"""
+    import faiss
+    index = faiss.downcast_index(index)
+    options = {}
+    if isinstance(index, faiss.IndexIVF):
+        options['nlist'] = index.nlist
+    if isinstance(index, faiss.IndexIVFPQ):
+        options['pq_m'] = index.pq.M
+        options['pq_bits'] = index.pq.nbits
+    if isinstance(index, faiss.IndexHNSW):
+        options['hnsw_m'] = index.hnsw.nb_neighbors(1)
+        options['ef_construction'] = index.hnsw.efConstruction
+    return options
+
+def min_training_size(index):
+    """Vectors needed before an index trains well (0 if it needs no training)
+
+    k-means wants about 39 points per centroid: nlist coarse centroids for IVF
+    and 2 ** nbits codewords per PQ sub-quantizer.
+    """
+    import faiss
+    if index.is_trained:
+        return 0
+    index = faiss.downcast_index(index)
+    clusters = getattr(index, 'nlist', 1)
+    if isinstance(index, faiss.IndexIVFPQ):
+        clusters = max(clusters, 1 << index.pq.nbits)
+    return 39 * clusters
+
+def training_size(index_type, count, nlist=None, pq_bits=8, **options):
+    """min_training_size() of the index build_index() would create for count vectors, without building it"""
+    if index_type not in ('ivf_flat', 'ivf_pq'):
+        return 0
+    clusters = nlist or default_nlist(count)
+    if index_type == 'ivf_pq':
+        clusters = max(clusters, 1 << pq_bits)
+    return 39 * clusters
+
+def train_index(index, vectors, sample_size=20000, seed=0):
+    """Train an index on a random sample of the vectors (no-op if already trained)
+
+    The sample is never smaller than min_training_size(), whatever sample_size says.
+    """
+    if index.is_trained:
+        return
+    sample_size = max(sample_size, min_training_size(index))
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) > sample_size:
+        rows = np.random.default_rng(seed).choice(len(vectors), sample_size, replace=False)
+        vectors = vectors[np.sort(rows)]
+    index.train(vectors)
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """Apply query-time parameters (nprobe for IVF, efSearch for HNSW) where they apply"""
+    import faiss
+    index = faiss.downcast_index(index)
+    if nprobe is not None and isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(nprobe, index.nlist)
+    if ef_search is not None and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+
+def exclusion_params(index, excluded):
+    """Search parameters that make FAISS skip the given row ids, keeping nprobe/efSearch
+
+    Returns (params, selectors); keep the selectors alive as long as the params are used.
+    """
+    import faiss
+    batch = faiss.IDSelectorBatch(np.asarray(sorted(excluded), dtype=np.int64))
+    selector = faiss.IDSelectorNot(batch)
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    elif isinstance(index, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    return params, (batch, selector)
+
+def reconstruct_vectors(index, start=0, count=None):
+    """Stored vectors of rows [start, start + count); approximate for quantized indexes"""
+    import faiss
+    count = index.ntotal - start if count is None else count
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(start, count)
+
+def evaluate_index(index, vectors, queries, k=10, nprobe_values=(1, 4, 16, 64),
+                   ef_values=(16, 32, 64, 128)):
+    """Recall@k against exact search and mean query latency for each search setting
+
+    `vectors` are the exact vectors stored in `index` (row i <-> vector i).
+    Returns a list of {'index_type', 'params', 'recall', 'latency_ms'} rows.
+    """
+    import faiss
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    k = min(k, len(vectors))
+
+    exact = faiss.IndexFlat(vectors.shape[1], _faiss_metric(metric_of(index)))
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    index_type = index_type_of(index)
+    if index_type in ('ivf_flat', 'ivf_pq'):
+        settings = [{'nprobe': n} for n in nprobe_values]
+    elif index_type == 'hnsw':
+        settings = [{'ef_search': ef} for ef in ef_values]
+    else:
+        settings = [{}]
+
+    report = []
+    for params in settings:
+        set_search_params(index, **params)
+        start = time.perf_counter()
+        # One query at a time, like the application issues them
+        found = np.vstack([index.search(query[None, :], k)[1] for query in queries])
+        latency = (time.perf_counter() - start) / len(queries)
+        hits = sum(len(set(row) & set(expected)) for row, expected in zip(found, truth))
+        report.append({
+            'index_type': index_type,
+            'params': params,
+            'recall': round(hits / (k * len(queries)), 4),
+            'latency_ms': round(latency * 1000, 3)
+        })
+    return report
+
+def format_report(report):
+    """Render evaluate_index rows as a text table"""
+    lines = [f"{'index':<10} {'params':<18} {'recall':>8} {'latency ms':>11}"]
+    for row in report:
+        params = ", ".join(f"{name}={value}" for name, value in row['params'].items()) or "-"
+        lines.append(f"{row['index_type']:<10} {params:<18} {row['recall']:>8.4f} {row['latency_ms']:>11.3f}")
+    return "\n".join(lines)
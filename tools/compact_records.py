@@ -0,0 +1,245 @@
+from tools.jsonl_records import atomic_save_npy, atomic_write_text
+from array import array
+from pathlib import Path
+import numpy as np
+import threading
+import json
+
+SCALAR_FIELDS = ('name', 'email', 'phone', 'experience_years', 'file_path')
+SKILL_FIELDS = ('technical_skills', 'soft_skills', 'tools')
+
+class SkillVocabulary:
+    """Interned skill strings: each distinct skill gets an integer id and at most one embedding row
+
+    Ids are append-only, so an id never changes meaning. Rows are float16 and
+    L2-normalized; the first `encoded` ids have one (a store built without a
+    skill encoder has none). A resume's skill matrix is a gather of its ids' rows.
+    """
+
+    def __init__(self):
+        self.skills = []  # id -> skill
+        self.ids = {}  # skill -> id
+        self.model = None  # skill model the rows were encoded with
+        self._vectors = None  # rows of the first `encoded` ids (memory-mapped after load)
+        self._pending = []  # rows appended since, in id order
+        self._saved = (0, 0)  # (ids, rows) written by the last save()
+        self._lock = threading.Lock()  # rows are appended by inserts while searches read them
+
+    def __len__(self):
+        return len(self.skills)
+
+    @property
+    def encoded(self):
+        """Number of ids (a prefix) that have an embedding row"""
+        return (len(self._vectors) if self._vectors is not None else 0) + sum(len(rows) for rows in self._pending)
+
+    def intern(self, skill):
+        skill_id = self.ids.get(skill)
+        if skill_id is None:
+            skill_id = self.ids[skill] = len(self.skills)
+            self.skills.append(skill)
+        return skill_id
+
+    def lookup(self, skills):
+        """Ids of known skills; None if any is unknown"""
+        ids = []
+        for skill in skills:
+            skill_id = self.ids.get(skill)
+            if skill_id is None:
+                return None
+            ids.append(skill_id)
+        return ids
+
+    def unencoded(self):
+        """Skills that still need an embedding row, in id order"""
+        return self.skills[self.encoded:]
+
+    def add_vectors(self, rows):
+        """Append rows for the next ids without one"""
+        if len(rows):
+            with self._lock:
+                self._pending.append(np.asarray(rows, dtype=np.float16))
+
+    def vectors(self, ids):
+        """Row matrix of some ids; None if any has no row"""
+        if not ids:
+            return np.zeros((0, self._dimension()), dtype=np.float16)
+        with self._lock:
+            if max(ids) >= self.encoded:
+                return None
+            if self._pending:
+                self._vectors = np.concatenate(([self._vectors] if self._vectors is not None else []) + self._pending)
+                self._pending = []
+            return self._vectors[ids]
+
+    def _dimension(self):
+        if self._vectors is not None:
+            return self._vectors.shape[1]
+        return self._pending[0].shape[1] if self._pending else 0
+
+    def drop_vectors(self):
+        """Forget every row, e.g. when the skill model changes"""
+        with self._lock:
+            self._vectors = None
+            self._pending = []
+
+    def save(self, skills_path, vectors_path):
+        """Write the skills and rows (temp files + rename); nothing is written if unchanged"""
+        if self._saved == (len(self.skills), self.encoded):
+            return
+        if self.encoded != self._saved[1]:
+            with self._lock:
+                vectors = np.concatenate(([self._vectors] if self._vectors is not None else []) + self._pending)
+                self._vectors = None  # release the memory map before replacing its file
+                self._pending = []
+                atomic_save_npy(vectors_path, vectors)
+                self._vectors = np.load(vectors_path, mmap_mode='r')
+        atomic_write_text(skills_path, json.dumps({
+            'model': self.model,
+            'encoded': self.encoded,
+            'skills': self.skills
+        }, ensure_ascii=False))
+        self._saved = (len(self.skills), self.encoded)
+
+    @classmethod
+    def load(cls, skills_path, vectors_path):
+        vocabulary = cls()
+        data = json.loads(Path(skills_path).read_text(encoding='utf-8'))
+        vocabulary.skills = data['skills']
+        vocabulary.ids = {skill: skill_id for skill_id, skill in enumerate(vocabulary.skills)}
+        vocabulary.model = data.get('model')
+        if data.get('encoded') and Path(vectors_path).exists():
+            vocabulary._vectors = np.load(vectors_path, mmap_mode='r')[:data['encoded']]
+        vocabulary._saved = (len(vocabulary.skills), vocabulary.encoded)
+        return vocabulary
+
+class ResumeRecord:
+    """A resume held in memory without per-record dicts, lists or repeated skill strings
+
+    Skills are vocabulary ids in one uint32 array: three list lengths, then the ids.
+    `layout` is the record's key order, a tuple shared by every record with the same keys.
+    """
+
+    __slots__ = ('layout', 'name', 'email', 'phone', 'experience_years', 'file_path', 'skill_ids', 'extra')
+
+    def __init__(self, layout, skill_ids, extra=None):
+        self.layout = layout
+        self.skill_ids = skill_ids
+        self.extra = extra  # other fields, and skill fields that are not lists of strings
+
+class ResumeCodec:
+    """Packs resume dicts into ResumeRecords and back, interning skills in a shared vocabulary"""
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self._layouts = {}
+        self._values = {}  # repeated short values, e.g. "5 years"
+
+    def pack(self, resume_data):
+        layout = tuple(resume_data)
+        layout = self._layouts.setdefault(layout, layout)
+        lists = []
+        extra = None
+        for field in SKILL_FIELDS:
+            skills = resume_data.get(field, [])
+            if isinstance(skills, list) and all(isinstance(skill, str) for skill in skills):
+                lists.append(skills)
+            else:
+                lists.append([])
+                extra = extra or {}
+                extra[field] = skills
+        skill_ids = array('I', [len(skills) for skills in lists])
+        skill_ids.extend(self.vocabulary.intern(skill) for skills in lists for skill in skills)
+
+        for key, value in resume_data.items():
+            if key not in SCALAR_FIELDS and key not in SKILL_FIELDS:
+                extra = extra or {}
+                extra[key] = value
+        record = ResumeRecord(layout, skill_ids, extra)
+        for field in SCALAR_FIELDS:
+            if field in resume_data:
+                value = resume_data[field]
+                if field == 'experience_years' and isinstance(value, str):
+                    value = self._values.setdefault(value, value)
+                setattr(record, field, value)
+        return record
+
+    def unpack(self, record):
+        skills = self.vocabulary.skills
+        lengths = record.skill_ids[:3]
+        ids = record.skill_ids[3:]
+        lists = {}
+        offset = 0
+        for field, length in zip(SKILL_FIELDS, lengths):
+            lists[field] = [skills[skill_id] for skill_id in ids[offset:offset + length]]
+            offset += length
+        extra = record.extra or {}
+
+        resume_data = {}
+        for key in record.layout:
+            if key in extra:
+                resume_data[key] = extra[key]
+            elif key in lists:
+                resume_data[key] = lists[key]
+            else:
+                resume_data[key] = getattr(record, key)
+        return resume_data
+
+class ResumeHashes:
+    """Set of resume hashes (32-char hex strings) as a sorted fixed-width array plus small change sets
+
+    About 32 bytes per hash instead of a str object and a set slot; membership is a binary search.
+    """
+
+    def __init__(self, hashes=()):
+        self._sorted = np.unique(np.asarray(list(hashes) if not isinstance(hashes, np.ndarray) else hashes,
+                                            dtype='S32'))
+        self._added = set()
+        self._removed = set()
+
+    def _in_sorted(self, key):
+        i = int(np.searchsorted(self._sorted, key))
+        return i < len(self._sorted) and self._sorted[i] == key
+
+    def __contains__(self, resume_hash):
+        key = resume_hash.encode()
+        if key in self._added:
+            return True
+        return key not in self._removed and self._in_sorted(key)
+
+    def __len__(self):
+        return len(self._sorted) - len(self._removed) + len(self._added)
+
+    def __iter__(self):
+        for key in self._sorted:
+            if key not in self._removed:
+                yield key.decode()
+        for key in self._added:
+            yield key.decode()
+
+    def add(self, resume_hash):
+        key = resume_hash.encode()
+        if key in self._removed:
+            self._removed.discard(key)
+        elif not self._in_sorted(key):
+            self._added.add(key)
+            if len(self._added) > max(4096, len(self._sorted) // 8):
+                self._merge()
+
+    def discard(self, resume_hash):
+        key = resume_hash.encode()
+        if key in self._added:
+            self._added.discard(key)
+        elif self._in_sorted(key):
+            self._removed.add(key)
+
+    def _merge(self):
+        """Fold the change sets into the sorted array"""
+        keys = self._sorted
+        if self._removed:
+            keys = keys[~np.isin(keys, np.array(list(self._removed), dtype='S32'))]
+        if self._added:
+            keys = np.union1d(keys, np.array(list(self._added), dtype='S32'))
+        self._sorted = keys
+        self._added = set()
+        self._removed = set()
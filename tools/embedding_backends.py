@@ -0,0 +1,146 @@
+import numpy as np
+import threading
+import asyncio
+
+# langchain_ollama and sentence_transformers are imported on first use to keep startup fast
+
+class OllamaBackend:
+    """Ollama embeddings over HTTP (llama2: 4096 dimensions), searched by L2 distance"""
+
+    name = "ollama"
+    metric = "l2"
+
+    def __init__(self, model="llama2"):
+        self.model = model
+        self._client = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """OllamaEmbeddings client, created on first use"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from langchain_ollama import OllamaEmbeddings
+                    self._client = OllamaEmbeddings(model=self.model)
+        return self._client
+
+    def embed_documents(self, texts):
+        return self.load().embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.load().embed_query(text)
+
+    def embed_queries(self, texts):
+        # OllamaEmbeddings.embed_query(text) is embed_documents([text])[0], so one call embeds the batch
+        return self.load().embed_documents(list(texts))
+
+    async def aembed_query(self, text):
+        return await self.load().aembed_query(text)
+
+    def as_langchain(self):
+        """LangChain Embeddings object for the FAISS wrapper"""
+        return self.load()
+
+    def spec(self):
+        """What built the vectors; stored in the index manifest"""
+        return {'backend': self.name, 'model': self.model, 'metric': self.metric}
+
+class SentenceTransformerBackend:
+    """Local SentenceTransformer embeddings in batches, L2-normalized and searched by inner product
+
+    all-MiniLM-L6-v2 gives 384-dimensional vectors, about a tenth of llama2's index
+    size, without an HTTP round-trip per text. `model` may be a loaded model or a
+    zero-argument callable returning one, e.g. to share the skill encoder's model.
+    """
+
+    name = "sentence_transformers"
+    metric = "ip"
+
+    def __init__(self, model_name="all-MiniLM-L6-v2", batch_size=64, model=None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = model
+        self._lock = threading.Lock()
+
+    def load(self):
+        """SentenceTransformer, loaded on first use"""
+        if self._model is None or not hasattr(self._model, 'encode'):
+            with self._lock:
+                if self._model is None:
+                    # Deferred: importing sentence-transformers pulls in torch
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+                elif not hasattr(self._model, 'encode'):
+                    self._model = self._model()
+        return self._model
+
+    def _encode(self, texts):
+        vectors = self.load().encode(
+            list(texts), batch_size=self.batch_size, normalize_embeddings=True,
+            convert_to_numpy=True, show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+    def embed_documents(self, texts):
+        return self._encode(texts)
+
+    def embed_query(self, text):
+        return self._encode([text])[0]
+
+    def embed_queries(self, texts):
+        return self._encode(texts)
+
+    async def aembed_query(self, text):
+        # Local encoding is CPU-bound; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.embed_query, text)
+
+    def as_langchain(self):
+        """LangChain Embeddings object for the FAISS wrapper"""
+        from langchain_core.embeddings import Embeddings
+        backend = self
+
+        class SentenceTransformerEmbeddings(Embeddings):
+            def embed_documents(self, texts):
+                return backend.embed_documents(texts).tolist()
+
+            def embed_query(self, text):
+                return backend.embed_query(text).tolist()
+
+        return SentenceTransformerEmbeddings()
+
+    def spec(self):
+        """What built the vectors; stored in the index manifest"""
+        return {'backend': self.name, 'model': self.model_name, 'metric': self.metric}
+
+class MicroBatchedBackend:
+    """Wraps a backend so concurrent query embeddings share one embed_queries call (see MicroBatcher)"""
+
+    def __init__(self, backend, batcher):
+        self.backend = backend
+        self.batcher = batcher  # MicroBatcher over backend.embed_queries
+
+    def embed_query(self, text):
+        return self.batcher.submit([text])[0]
+
+    def embed_queries(self, texts):
+        return self.batcher.submit(texts)
+
+    async def aembed_query(self, text):
+        # The caller blocks until its batch runs; keep that off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.embed_query, text)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+BACKENDS = {
+    OllamaBackend.name: OllamaBackend,
+    SentenceTransformerBackend.name: SentenceTransformerBackend
+}
+
+def make_backend(name, model_name=None, **kwargs):
+    """Backend by name, with its default model unless one is given"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}', expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](model_name, **kwargs) if model_name else BACKENDS[name](**kwargs)
@@ -0,0 +1,223 @@
+from tools.file_lock import FileLock
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+import threading
+import json
+import re
+
+class SkillEmbeddingCache:
+    """Two-tier (LRU memory + memory-mapped disk) cache of skill embeddings"""
+
+    def __init__(self, model_name="all-MiniLM-L6-v2", cache_dir="db/skill_embeddings",
+                 max_memory_items=10000, model=None):
+        self.model_name = model_name
+        self.max_memory_items = max_memory_items
+        self._model = model
+        self._lock = threading.RLock()
+        self.batcher = None  # optional MicroBatcher merging concurrent misses into one forward pass
+
+        # One directory per model so vectors from different models never mix
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', model_name)
+        self.cache_dir = Path(cache_dir) / safe_name
+        self.meta_path = self.cache_dir / "meta.json"
+        self.keys_path = self.cache_dir / "keys.txt"
+        self.vectors_path = self.cache_dir / "vectors.f32"
+        # Several processes (ingest job workers) append to the same files
+        self._file_lock = FileLock(self.cache_dir / "append.lock")
+
+        self._memory = OrderedDict()
+        self._rows = {}
+        self._vectors = None
+        self._dim = None
+        self._capacity = 0
+        self._keys_read = 0  # bytes of keys.txt already reflected in _rows
+        self._row_count = 0  # rows on disk with a complete key line
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._load_disk_index()
+
+    @staticmethod
+    def normalize(skill):
+        """Normalize a skill string into its cache key"""
+        return " ".join(str(skill).lower().split())
+
+    @property
+    def model(self):
+        """SentenceTransformer, loaded on the first cache miss (or by a warm-up)"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    # Deferred: importing sentence-transformers pulls in torch
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode(self, skills, **kwargs):
+        """Return a float32 matrix of embeddings, only encoding unseen skills"""
+        keys = [self.normalize(skill) for skill in skills]
+
+        with self._lock:
+            found = {}
+            missing = []
+            for key in dict.fromkeys(keys):
+                vector = self._lookup(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    found[key] = vector
+
+        # Encode outside the lock so concurrent callers can share a batch
+        if missing:
+            if self.batcher is not None:
+                vectors = np.asarray(self.batcher.submit(missing), dtype=np.float32)
+            else:
+                vectors = np.asarray(self.model.encode(missing, **kwargs), dtype=np.float32)
+            with self._lock:
+                self.misses += len(missing)
+                # Another caller may have stored some of them meanwhile
+                new = [i for i, key in enumerate(missing) if key not in self._rows]
+                if new:
+                    self._append_disk([missing[i] for i in new], vectors[new])
+                for key, vector in zip(missing, vectors):
+                    self._remember(key, vector)
+                    found[key] = vector
+
+        if not keys:
+            return np.zeros((0, self._dim or 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def _lookup(self, key):
+        """Check the memory tier, then the disk tier"""
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+
+        row = self._rows.get(key)
+        if row is not None:
+            vector = np.array(self._vectors[row], dtype=np.float32)
+            self._remember(key, vector)
+            self.disk_hits += 1
+            return vector
+
+        return None
+
+    def _remember(self, key, vector):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _load_disk_index(self):
+        """Open the memory-mapped vector file and its string->row index"""
+        if not self.meta_path.exists() or not self.keys_path.exists():
+            return
+
+        meta = json.loads(self.meta_path.read_text())
+        if meta.get('model') != self.model_name:
+            return
+
+        self._dim = meta['dim']
+        self._read_new_keys()
+
+    def _read_new_keys(self):
+        """Index the keys appended to keys.txt since the last read (by this or another process)
+
+        Returns the number of rows on disk, i.e. complete key lines. Rows written
+        without a key line (interrupted write) are ignored and later overwritten.
+        """
+        row_bytes = self._dim * 4
+        size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        if size // row_bytes != self._capacity:
+            self._vectors = None
+            self._capacity = size // row_bytes
+            if self._capacity:
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r+',
+                                          shape=(self._capacity, self._dim))
+
+        rows = self._row_count
+        if self.keys_path.exists():
+            with open(self.keys_path, 'rb') as f:
+                f.seek(self._keys_read)
+                data = f.read()
+            # Anything after the last newline is a partially written key
+            complete = data[:data.rfind(b'\n') + 1]
+            self._keys_read += len(complete)
+            for key in complete.decode('utf-8').split('\n')[:-1]:
+                if rows < self._capacity:
+                    self._rows.setdefault(key, rows)
+                rows += 1
+        self._row_count = min(rows, self._capacity)
+        return self._row_count
+
+    def _append_disk(self, keys, vectors):
+        """Append new vectors to the memory-mapped file, then their keys
+
+        Runs under a file lock and starts at the row count on disk, so caches
+        in other processes sharing the directory never overwrite each other's rows.
+        """
+        with self._file_lock:
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                if not self.meta_path.exists():
+                    self.meta_path.write_text(json.dumps({'model': self.model_name, 'dim': self._dim}))
+            start = self._read_new_keys()
+
+            # Another process may have stored some of them meanwhile
+            new = [i for i, key in enumerate(keys) if key not in self._rows]
+            keys, vectors = [keys[i] for i in new], vectors[new]
+            if not keys:
+                return
+
+            # Drop a partial key line left by an interrupted write
+            if self.keys_path.exists() and self.keys_path.stat().st_size > self._keys_read:
+                with open(self.keys_path, 'r+b') as f:
+                    f.truncate(self._keys_read)
+
+            needed = start + len(keys)
+            if needed > self._capacity:
+                self._grow(max(needed, self._capacity * 2, 1024))
+
+            self._vectors[start:needed] = vectors
+            self._vectors.flush()
+
+            data = "".join(f"{key}\n" for key in keys).encode('utf-8')
+            with open(self.keys_path, 'ab') as f:
+                f.write(data)
+            self._keys_read += len(data)
+
+            for offset, key in enumerate(keys):
+                self._rows[key] = start + offset
+            self._row_count = needed
+
+    def _grow(self, capacity):
+        """Extend the backing file and re-open the memory map"""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+
+        with open(self.vectors_path, 'ab') as f:
+            if f.tell() < capacity * self._dim * 4:  # another process may have grown it further
+                f.truncate(capacity * self._dim * 4)
+
+        self._capacity = capacity
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r+',
+                                  shape=(self._capacity, self._dim))
+
+    def get_stats(self):
+        """Get cache hit/miss counters"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            'memory_items': len(self._memory),
+            'disk_items': len(self._rows)
+        }
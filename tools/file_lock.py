@@ -0,0 +1,61 @@
+from pathlib import Path
+import threading
+
+try:
+    import fcntl
+
+    def _lock(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock(file):
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue  # LK_LOCK gives up after ~10 seconds; keep waiting
+
+    def _unlock(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+class FileLock:
+    """Exclusive lock on a file, held across processes (and threads of this process)
+
+    Blocks until the lock is free. The operating system releases it if the
+    holder dies, so a crashed worker never leaves a stale lock behind.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._thread_lock = threading.Lock()  # the OS lock does not exclude threads sharing a process
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a+')
+            _lock(self._file)
+        except BaseException:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            _unlock(self._file)
+            self._file.close()
+        finally:
+            self._file = None
+            self._thread_lock.release()
+        return False
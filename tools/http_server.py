@@ -0,0 +1,176 @@
+from tools.tracing import Tracer, tracer, log
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+from pathlib import Path
+import threading
+import json
+import time
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 resets bursts of concurrent clients
+
+class ResumeServer:
+    """Local HTTP/JSON API over a ResumeAgentSystem whose models and index stay loaded
+
+    POST /search {"query": "..."}
+    POST /ingest {"path": "file or folder", "full": false}
+    GET  /stats    store, cache, micro-batcher and per-endpoint latency stats
+    GET  /metrics  the same latencies in Prometheus text format
+    GET  /health
+
+    Each request runs on its own thread, so concurrent searches overlap and
+    their encodes can share micro-batches.
+    """
+
+    def __init__(self, system, host="127.0.0.1", port=8000):
+        self.system = system
+        self.latency = Tracer(enabled=True)  # per-endpoint request latency and error counts
+        self._ingest_lock = threading.Lock()  # one ingest at a time; searches go on meanwhile
+        self.started = time.time()
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/stats'): self.stats,
+            ('GET', '/metrics'): self.metrics,
+            ('POST', '/search'): self.search,
+            ('POST', '/ingest'): self.ingest
+        }
+        self.httpd = _ThreadingServer((host, port), self._handler_class())
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._dispatch(self, 'GET')
+
+            def do_POST(self):
+                server._dispatch(self, 'POST')
+
+            def log_message(self, format, *args):
+                log(f"🌐 {self.address_string()} {format % args}", 'debug')
+
+        return Handler
+
+    def _dispatch(self, request, method):
+        path = urlparse(request.path).path.rstrip('/') or '/'
+        route = self.routes.get((method, path))
+        if route is None:
+            self._read_body(request)  # keep the connection usable
+            self._send(request, 404, {'error': f"No endpoint {method} {path}"})
+            return
+
+        endpoint = path.strip('/')
+        with self.latency.span(endpoint):
+            try:
+                body = self._read_json(request) if method == 'POST' else {}
+                status, payload = 200, route(body)
+            except KeyError as e:
+                status, payload = 400, {'error': f"Missing field {e}"}
+            except (ValueError, TypeError) as e:
+                status, payload = 400, {'error': str(e)}
+            except Exception as e:
+                print(f"❌ {method} {path} failed: {e}")
+                status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+            self._send(request, status, payload)
+        if status != 200:
+            self.latency.increment(f"{endpoint}.errors")
+
+    @staticmethod
+    def _read_body(request):
+        length = int(request.headers.get('Content-Length') or 0)
+        return request.rfile.read(length) if length else b''
+
+    def _read_json(self, request):
+        body = self._read_body(request)
+        try:
+            data = json.loads(body or b'{}')
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON body: {e}")
+        if not isinstance(data, dict):
+            raise ValueError("JSON body must be an object")
+        return data
+
+    @staticmethod
+    def _send(request, status, payload):
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, default=str).encode('utf-8'), "application/json"
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def health(self, body):
+        return {'status': 'ok'}
+
+    def search(self, body):
+        query = body['query']
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError("'query' must be a non-empty string")
+        started = time.perf_counter()
+        results = self.system.search_agent.search(query.strip())
+        return {'query': query, 'results': results, 'took_ms': round((time.perf_counter() - started) * 1000, 1)}
+
+    def ingest(self, body):
+        path = Path(body['path'])
+        full = bool(body.get('full', False))
+        with self._ingest_lock:
+            if path.is_dir():
+                errors = self.system.ingest_folder(str(path), full=full) or {}
+                result = {'errors': {str(file): str(error) for file, error in errors.items()}}
+            elif path.is_file():
+                resume_data = self.system.ingest_resume(path, full=full)
+                if resume_data is not None:
+                    self.system.save()
+                result = {'ingested': resume_data is not None}
+            else:
+                raise ValueError(f"No such file or folder: {path}")
+        result['total_resumes'] = self.system.resume_store.get_stats()['total_resumes']
+        return result
+
+    def stats(self, body):
+        system = self.system
+        latency = self.latency.snapshot()
+        endpoints = {}
+        for name, stats in latency['spans'].items():
+            stats.pop('buckets')
+            stats['errors'] = latency['counters'].get(f"{name}.errors", 0)
+            endpoints[name] = stats
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'endpoints': endpoints,
+            'store': system.resume_store.get_stats(),
+            'search_cache': system.search_cache.get_stats(),
+            'llm_cache': system.llm_cache.get_stats(),
+            'skill_embeddings': system.skill_embeddings.get_stats(),
+            'micro_batchers': {name: batcher.get_stats() for name, batcher in system.batchers.items()},
+            'stages': tracer.snapshot()['spans'] if tracer.enabled else None
+        }
+
+    def metrics(self, body):
+        text = self.latency.to_prometheus(prefix="resume_agent_http")
+        return text + tracer.to_prometheus() if tracer.enabled else text
+
+    def serve_forever(self):
+        """Serve until Ctrl-C"""
+        print(f"🌐 Serving on {self.address} (Ctrl-C to stop)")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+
+    def shutdown(self):
+        """Stop serve_forever() from another thread"""
+        self.httpd.shutdown()
@@ -0,0 +1,187 @@
+from tools.jsonl_records import atomic_write_text
+from tools.file_lock import FileLock
+from collections import Counter
+from pathlib import Path
+import hashlib
+import socket
+import json
+import time
+import os
+
+PENDING = 'pending'
+CLAIMED = 'claimed'  # a worker is parsing/extracting the file
+EXTRACTED = 'extracted'  # LLM output is journaled, not yet in the store
+DONE = 'done'  # committed to the store by a checkpoint
+FAILED = 'failed'
+
+class IngestJob:
+    """On-disk work queue for ingesting one folder, shared by any number of worker processes
+
+    files.json lists the files; events.jsonl is an append-only journal of state
+    changes (claimed, extracted with the LLM output, done, failed). Every read and
+    append happens under an exclusive file lock, and each process replays only
+    the journal lines it has not seen yet.
+    """
+
+    def __init__(self, folder, jobs_dir="db/jobs", lease_seconds=900):
+        self.folder = Path(folder).resolve()
+        self.path = Path(jobs_dir) / hashlib.sha1(str(self.folder).encode('utf-8')).hexdigest()[:12]
+        self.files_path = self.path / "files.json"
+        self.events_path = self.path / "events.jsonl"
+        self.lock = FileLock(self.path / "queue.lock")
+        self.lease_seconds = lease_seconds  # claims older than this are handed out again
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.files = []
+        self.index = {}  # file path -> position in files
+        self.states = []
+        self.claims = {}  # position -> (worker, time) of the current claim
+        self.extracted = {}  # position -> resume data awaiting a checkpoint
+        self.errors = {}  # position -> error message
+        self._offset = 0  # bytes of the journal already replayed
+
+    def open(self, files):
+        """Create the job for these files, or resume the unfinished job for this folder
+
+        Returns True if a new job was created.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            if self.files_path.exists():
+                self._read_files()
+                self._replay()
+                if not self.finished():
+                    return False
+
+            # No job yet, or the previous one finished: start over with the given files
+            atomic_write_text(self.files_path, json.dumps([str(Path(f)) for f in files]))
+            open(self.events_path, 'w').close()
+            self._read_files()
+            return True
+
+    def _read_files(self):
+        self.files = json.loads(self.files_path.read_text())
+        self.index = {path: position for position, path in enumerate(self.files)}
+        self.states = [PENDING] * len(self.files)
+        self.claims = {}
+        self.extracted = {}
+        self.errors = {}
+        self._offset = 0
+
+    def _replay(self):
+        """Apply journal lines appended since the last replay (call with the lock held)"""
+        if not self.events_path.exists():
+            return
+        with open(self.events_path, 'rb+') as f:
+            f.seek(self._offset)
+            data = f.read()
+            complete = data.rfind(b'\n') + 1
+            if complete < len(data):
+                # Torn write of a crashed worker; nobody else can be writing while we hold the lock
+                f.truncate(self._offset + complete)
+        for line in data[:complete].splitlines():
+            self._apply(json.loads(line))
+        self._offset += complete
+
+    def _apply(self, event):
+        position, state = event['file'], event['state']
+        self.states[position] = state
+        self.claims.pop(position, None)
+        if state == CLAIMED:
+            self.claims[position] = (event['worker'], event['time'])
+        elif state == EXTRACTED:
+            self.extracted[position] = event['data']
+        elif state == DONE:
+            self.extracted.pop(position, None)
+        elif state == FAILED:
+            self.errors[position] = event.get('error')
+
+    def _append(self, events):
+        """Journal events durably and apply them (call with the lock held)"""
+        if not events:
+            return
+        now = time.time()
+        lines = []
+        for event in events:
+            event.update(worker=self.worker, time=now)
+            lines.append(json.dumps(event) + "\n")
+        with open(self.events_path, 'a') as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        for event in events:
+            self._apply(event)
+        self._offset = self.events_path.stat().st_size
+
+    def _is_abandoned(self, position, now):
+        """A claim whose lease ran out, or whose worker process on this host is gone"""
+        worker, claimed_at = self.claims[position]
+        if now - claimed_at > self.lease_seconds:
+            return True
+        host, _, pid = worker.rpartition(':')
+        if host != socket.gethostname() or worker == self.worker:
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except (PermissionError, ValueError):
+            return False
+        return False
+
+    def claim(self, count):
+        """Take up to count pending (or abandoned) files for this worker"""
+        with self.lock:
+            self._replay()
+            now = time.time()
+            positions = []
+            for position, state in enumerate(self.states):
+                if state == PENDING or (state == CLAIMED and self._is_abandoned(position, now)):
+                    positions.append(position)
+                    if len(positions) >= count:
+                        break
+            self._append([{'file': position, 'state': CLAIMED} for position in positions])
+        return [Path(self.files[position]) for position in positions]
+
+    def release(self):
+        """Hand this worker's unfinished claims back to the queue (e.g. after Ctrl-C)"""
+        with self.lock:
+            self._replay()
+            mine = [position for position, (worker, _) in self.claims.items() if worker == self.worker]
+            self._append([{'file': position, 'state': PENDING} for position in mine])
+
+    def mark_extracted(self, resumes):
+        """Journal LLM output so it survives a crash before the next checkpoint"""
+        with self.lock:
+            self._replay()
+            self._append([
+                {'file': self.index[resume['file_path']], 'state': EXTRACTED, 'data': resume}
+                for resume in resumes
+            ])
+
+    def mark_failed(self, errors):
+        """Record files that could not be parsed or extracted ({path: error})"""
+        with self.lock:
+            self._replay()
+            self._append([
+                {'file': self.index[str(path)], 'state': FAILED, 'error': str(error)}
+                for path, error in errors.items()
+            ])
+
+    def take_extracted(self):
+        """Resume data of every worker's extracted, uncommitted files ({position: data})"""
+        with self.lock:
+            self._replay()
+            return dict(self.extracted)
+
+    def mark_done(self, positions):
+        """Record files committed to the store by a checkpoint"""
+        with self.lock:
+            self._replay()
+            self._append([{'file': position, 'state': DONE} for position in positions])
+
+    def finished(self):
+        return all(state in (DONE, FAILED) for state in self.states)
+
+    def counts(self):
+        """Number of files in each state (as of the last replay)"""
+        return dict(Counter(self.states))
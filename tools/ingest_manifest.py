@@ -0,0 +1,76 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+
+class IngestManifest:
+    """Persistent record of ingested files keyed by path, size, mtime and content hash"""
+
+    def __init__(self, path="db/ingest_manifest.json"):
+        self.path = Path(path)
+        self.entries = {}
+        self.load()
+
+    @staticmethod
+    def _key(file_path):
+        return str(Path(file_path).resolve())
+
+    @staticmethod
+    def content_hash(file_path, chunk_size=1 << 20):
+        """SHA-256 of the file contents, read in chunks"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def is_unchanged(self, file_path):
+        """True if the file was ingested before and its contents have not changed"""
+        entry = self.entries.get(self._key(file_path))
+        if entry is None:
+            return False
+
+        stat = os.stat(file_path)
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+
+        # Touched but maybe not modified: fall back to the content hash
+        if self.content_hash(file_path) != entry['sha256']:
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+
+    def record(self, file_path, resume_id=None):
+        """Remember the current state of an ingested file and the id of the resume stored for it"""
+        stat = os.stat(file_path)
+        self.entries[self._key(file_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': self.content_hash(file_path),
+            'resume_id': resume_id
+        }
+
+    def resume_id(self, file_path):
+        """Id of the resume stored when the file was last ingested (None if unknown)"""
+        entry = self.entries.get(self._key(file_path))
+        return entry.get('resume_id') if entry is not None else None
+
+    def load(self):
+        """Load the manifest from disk"""
+        if self.path.exists():
+            self.entries = json.loads(self.path.read_text())
+
+    def save(self):
+        """Atomically write the manifest to disk"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.entries))
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget every ingested file"""
+        self.entries = {}
+        if self.path.exists():
+            self.path.unlink()
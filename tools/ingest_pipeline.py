@@ -0,0 +1,147 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import queue
+
+_DONE = object()  # end-of-stream marker passed between stages
+
+class IngestPipeline:
+    """Staged ingestion: parser pool -> LLM extraction workers -> batching writer"""
+
+    def __init__(self, parse, extract, write_batch, parse_workers=2, llm_workers=2,
+                 queue_size=8, batch_size=16):
+        self.parse = parse  # file -> text
+        self.extract = extract  # (file, text) -> resume data
+        self.write_batch = write_batch  # [resume data] -> None, only ever called from one thread
+        self.parse_workers = max(1, parse_workers)
+        self.llm_workers = max(1, llm_workers)
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+
+    def run(self, files):
+        """Ingest files and return per-file errors; writes happen in input order"""
+        files = list(files)
+        # Bounded queues: a full queue blocks the upstream stage (backpressure)
+        parsed = queue.Queue(maxsize=self.queue_size)
+        extracted = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()  # set when the writer exits; upstream stages then wind down
+
+        feeder = threading.Thread(target=self._parse_stage, args=(files, parsed, stop), daemon=True)
+        workers = [
+            threading.Thread(target=self._extract_stage, args=(parsed, extracted, stop), daemon=True)
+            for _ in range(self.llm_workers)
+        ]
+        feeder.start()
+        for worker in workers:
+            worker.start()
+
+        try:
+            return self._write_stage(files, extracted)
+        finally:
+            # After an error or Ctrl-C in the writer, nothing reads the queues any more
+            stop.set()
+            self._shutdown([feeder] + workers, [parsed, extracted])
+
+    @staticmethod
+    def _shutdown(threads, queues):
+        """Empty the queues until every stage thread has exited, so none stays blocked on a put"""
+        for thread in threads:
+            while thread.is_alive():
+                for stage_queue in queues:
+                    try:
+                        while True:
+                            stage_queue.get_nowait()
+                    except queue.Empty:
+                        pass
+                thread.join(timeout=0.05)
+
+    def _parse_stage(self, files, parsed, stop):
+        """Parse files on a thread pool and feed the bounded parsed queue"""
+        def parse_one(position, file):
+            if stop.is_set():
+                return
+            try:
+                item = (position, file, self.parse(file), None)
+            except Exception as e:
+                item = (position, file, None, e)
+            parsed.put(item)
+
+        with ThreadPoolExecutor(max_workers=self.parse_workers) as pool:
+            # Submit lazily so no more than a bounded number of files are in flight
+            slots = threading.BoundedSemaphore(self.parse_workers + self.queue_size)
+            for position, file in enumerate(files):
+                slots.acquire()
+                if stop.is_set():
+                    break
+                future = pool.submit(parse_one, position, file)
+                future.add_done_callback(lambda _: slots.release())
+
+        for _ in range(self.llm_workers):
+            parsed.put(_DONE)
+
+    def _extract_stage(self, parsed, extracted, stop):
+        """Run LLM extraction on parsed text"""
+        while True:
+            try:
+                item = parsed.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set():
+                    return
+                continue
+            if item is _DONE:
+                extracted.put(_DONE)
+                return
+            if stop.is_set():
+                continue
+
+            position, file, text, error = item
+            resume_data = None
+            if error is None:
+                try:
+                    resume_data = self.extract(file, text)
+                except Exception as e:
+                    error = e
+            extracted.put((position, file, resume_data, error))
+
+    def _write_stage(self, files, extracted):
+        """Reorder results to input order and write them in batches"""
+        pending = {}
+        next_position = 0
+        batch = []
+        batch_files = []
+        errors = {}
+        finished_workers = 0
+
+        while finished_workers < self.llm_workers:
+            item = extracted.get()
+            if item is _DONE:
+                finished_workers += 1
+                continue
+
+            position, file, resume_data, error = item
+            pending[position] = (file, resume_data, error)
+
+            while next_position in pending:
+                file, resume_data, error = pending.pop(next_position)
+                next_position += 1
+                if error is not None:
+                    print(f"❌ Error processing {file}: {error}")
+                    errors[str(file)] = error
+                    continue
+                batch.append(resume_data)
+                batch_files.append(file)
+                if len(batch) >= self.batch_size:
+                    self._write(batch, batch_files, errors)
+                    batch, batch_files = [], []
+
+        if batch:
+            self._write(batch, batch_files, errors)
+        return errors
+
+    def _write(self, batch, files, errors):
+        """Write one batch; if that fails, every file of the batch is reported as an error"""
+        try:
+            self.write_batch(batch)
+        except Exception as e:
+            print(f"❌ Error writing {len(batch)} resumes: {e}")
+            for file in files:
+                errors[str(file)] = e
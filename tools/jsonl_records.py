@@ -0,0 +1,156 @@
+from pathlib import Path
+import numpy as np
+import mmap
+import json
+import os
+
+class JsonlRecords:
+    """List-like view of JSON records stored one per line, decoded lazily on access
+
+    The data file is only ever appended to; a separate offsets array (n + 1 byte
+    positions, replaced atomically on flush) defines which lines are committed.
+    An optional codec (pack/unpack) keeps unflushed records in a compact form.
+    """
+
+    def __init__(self, data_path, offsets_path, count=None, codec=None):
+        self.data_path = Path(data_path)
+        self.offsets_path = Path(offsets_path)
+        self.codec = codec
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._mmap = None
+        self._tail = []  # records appended since the last flush (packed by the codec)
+        self._open(count)
+
+    def _open(self, count=None):
+        """Memory-map the committed part of the data file (optionally only the first count records)"""
+        self._close()
+        if not self.offsets_path.exists() or not self.data_path.exists():
+            self._offsets = np.zeros(1, dtype=np.int64)
+            return
+
+        self._offsets = np.load(self.offsets_path, mmap_mode='r')
+        if count is not None:
+            self._offsets = self._offsets[:count + 1]
+        if self._offsets[-1] > 0:
+            with open(self.data_path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """Release the memory map of the data file"""
+        self._close()
+
+    def _close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    @property
+    def committed(self):
+        """Number of records already written to disk"""
+        return len(self._offsets) - 1
+
+    def __len__(self):
+        return self.committed + len(self._tail)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("record index out of range")
+
+        if position >= self.committed:
+            record = self._tail[position - self.committed]
+            return self.codec.unpack(record) if self.codec is not None else record
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        return json.loads(self._mmap[start:end])
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def append(self, record):
+        self._tail.append(self.codec.pack(record) if self.codec is not None else record)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def flush(self):
+        """Append pending records to the data file and atomically commit new offsets"""
+        if not self._tail:
+            return
+
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        committed_end = int(self._offsets[-1])
+        new_offsets = [committed_end]
+
+        with open(self.data_path, 'ab') as f:
+            # Drop bytes from an earlier interrupted flush that were never committed
+            f.truncate(committed_end)
+            f.seek(committed_end)
+            for record in self._tail:
+                if self.codec is not None:
+                    record = self.codec.unpack(record)
+                f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+                new_offsets.append(f.tell())
+            f.flush()
+            os.fsync(f.fileno())
+
+        offsets = np.concatenate([np.asarray(self._offsets), np.asarray(new_offsets[1:], dtype=np.int64)])
+        self._close()
+        atomic_save_npy(self.offsets_path, offsets)
+
+        self._tail = []
+        self._open()
+
+    def rewrite(self, records):
+        """Replace the whole file with the given records (temp files + rename)"""
+        self._close()
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.data_path.with_name(self.data_path.name + '.tmp')
+        offsets = [0]
+        with open(tmp_path, 'wb') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+                offsets.append(f.tell())
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.data_path)
+        atomic_save_npy(self.offsets_path, np.asarray(offsets, dtype=np.int64))
+        self._tail = []
+        self._open()
+
+    def remove_files(self):
+        """Delete the backing files and forget every record"""
+        self._close()
+        self._tail = []
+        self._offsets = np.zeros(1, dtype=np.int64)
+        for path in (self.data_path, self.offsets_path):
+            if path.exists():
+                path.unlink()
+
+def atomic_save_npy(path, array):
+    """np.save through a temp file and rename"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def atomic_write_text(path, text):
+    """Write a text file through a temp file and rename"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,201 @@
+from pathlib import Path
+import threading
+import asyncio
+import hashlib
+import sqlite3
+import json
+import time
+
+# OllamaLLM fields that change what a prompt generates
+GENERATION_OPTIONS = (
+    "temperature", "top_k", "top_p", "num_predict", "num_ctx", "repeat_penalty",
+    "repeat_last_n", "seed", "stop", "format", "mirostat", "mirostat_eta",
+    "mirostat_tau", "tfs_z", "reasoning"
+)
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache with TTL and LRU size eviction"""
+
+    def __init__(self, path="db/llm_cache.sqlite", ttl_seconds=7 * 24 * 3600, max_entries=10000):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                options_hash TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (model, prompt_hash, options_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def _key(model, prompt, options):
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        options_hash = hashlib.sha256(
+            json.dumps(options or {}, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        return model, prompt_hash, options_hash
+
+    def get(self, model, prompt, options=None):
+        """Return the cached response, or None on a miss or expired entry"""
+        key = self._key(model, prompt, options)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache "
+                "WHERE model = ? AND prompt_hash = ? AND options_hash = ?", key
+            ).fetchone()
+
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE model = ? AND prompt_hash = ? AND options_hash = ?", key
+                )
+                self._conn.commit()
+                self.evictions += 1
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? "
+                "WHERE model = ? AND prompt_hash = ? AND options_hash = ?", (now, *key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, model, prompt, response, options=None):
+        """Store a response, evicting least recently used entries past max_entries"""
+        key = self._key(model, prompt, options)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(model, prompt_hash, options_hash, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (*key, response, now, now)
+            )
+
+            if self.max_entries:
+                count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM llm_cache WHERE rowid IN "
+                        "(SELECT rowid FROM llm_cache ORDER BY accessed_at LIMIT ?)", (excess,)
+                    )
+                    self.evictions += excess
+
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def get_stats(self):
+        """Get hit/miss/eviction counters"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'entries': entries
+        }
+
+class CachedLLM:
+    """Wrap an LLM so invoke() is served from an LLMResponseCache when possible"""
+
+    def __init__(self, llm, cache):
+        self.llm = llm
+        self.cache = cache
+        self.model = llm.model
+
+    def _options(self):
+        """Generation options that are part of the cache key"""
+        options = {}
+        for name in GENERATION_OPTIONS:
+            value = getattr(self.llm, name, None)
+            if value is not None:
+                options[name] = value
+        return options
+
+    def invoke(self, prompt, **kwargs):
+        """Cached equivalent of llm.invoke(prompt)"""
+        options = {**self._options(), **kwargs}
+        response = self.cache.get(self.model, prompt, options)
+        if response is None:
+            response = self.llm.invoke(prompt, **kwargs)
+            self.cache.put(self.model, prompt, response, options)
+        return response
+
+    async def ainvoke(self, prompt, **kwargs):
+        """Cached equivalent of llm.ainvoke(prompt); SQLite access runs off the event loop"""
+        loop = asyncio.get_running_loop()
+        options = {**self._options(), **kwargs}
+        response = await loop.run_in_executor(None, self.cache.get, self.model, prompt, options)
+        if response is None:
+            response = await self.llm.ainvoke(prompt, **kwargs)
+            await loop.run_in_executor(None, self.cache.put, self.model, prompt, response, options)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+class LazyLLM:
+    """OllamaLLM (optionally behind an LLMResponseCache) constructed on first use
+
+    One instance can be shared by several agents so they use a single client.
+    """
+
+    def __init__(self, model="llama2", llm_cache=None):
+        self.model = model
+        self.llm_cache = llm_cache
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # Deferred: langchain_ollama is slow to import
+                    from langchain_ollama import OllamaLLM
+                    client = OllamaLLM(model=self.model)
+                    if self.llm_cache is not None:
+                        client = CachedLLM(client, self.llm_cache)
+                    self._client = client
+        return self._client
+
+    def invoke(self, prompt, **kwargs):
+        return self.client.invoke(prompt, **kwargs)
+
+    async def ainvoke(self, prompt, **kwargs):
+        return await self.client.ainvoke(prompt, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.client, name)
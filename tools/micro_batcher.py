@@ -0,0 +1,90 @@
+from concurrent.futures import Future
+import threading
+import queue
+import time
+
+class MicroBatcher:
+    """Merges concurrent encode calls into one batched call of `encode`
+
+    Each caller submits a list of items and blocks until its results are ready.
+    A background thread takes the first waiting request, then keeps collecting
+    requests until max_batch_size items are queued or max_wait_ms has passed,
+    and runs them through one encode(items) call (one model forward pass).
+    """
+
+    def __init__(self, encode, max_batch_size=64, max_wait_ms=2.0, name="micro-batcher"):
+        self.encode = encode  # list of items -> sequence of results, one per item
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def submit(self, items):
+        """Results for these items, computed together with other callers' items"""
+        items = list(items)
+        if not items:
+            return []
+        self._start()
+        future = Future()
+        self._queue.put((items, future))
+        return future.result()
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request[0])
+            self._execute(batch, size)
+
+    def _execute(self, batch, size):
+        items = [item for request_items, _ in batch for item in request_items]
+        try:
+            results = self.encode(items)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.requests += len(batch)
+        self.batches += 1
+        self.items += size
+        self.largest_batch = max(self.largest_batch, size)
+        offset = 0
+        for request_items, future in batch:
+            future.set_result(results[offset:offset + len(request_items)])
+            offset += len(request_items)
+
+    def get_stats(self):
+        """Requests merged per batch and items per batch"""
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'items': self.items,
+            'requests_per_batch': round(self.requests / self.batches, 2) if self.batches else 0.0,
+            'items_per_batch': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'largest_batch': self.largest_batch
+        }
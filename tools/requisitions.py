@@ -0,0 +1,104 @@
+from pathlib import Path
+import csv
+import json
+
+ID_FIELDS = ('requisition_id', 'id')
+TEXT_FIELDS = ('description', 'text', 'query', 'job_description')
+
+def _pick(row, fields, default=None):
+    for field in fields:
+        if row.get(field) not in (None, ''):
+            return row[field]
+    return default
+
+def read_requisitions(path):
+    """Yield (requisition id, job description) pairs from a .jsonl, .csv or text file, one at a time
+
+    JSONL lines are objects with an id and a description field (or bare
+    strings); CSV files have a header with the same fields; text files hold
+    one description per blank-line separated block. Missing ids are numbered
+    from 1.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with open(path, encoding='utf-8', newline='') as f:
+        if suffix in ('.jsonl', '.ndjson'):
+            number = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                number += 1
+                row = json.loads(line)
+                if isinstance(row, str):
+                    yield str(number), row
+                else:
+                    yield str(_pick(row, ID_FIELDS, number)), _pick(row, TEXT_FIELDS, '')
+        elif suffix == '.csv':
+            for number, row in enumerate(csv.DictReader(f), 1):
+                yield str(_pick(row, ID_FIELDS, number)), _pick(row, TEXT_FIELDS, '')
+        else:
+            number = 0
+            block = []
+            for line in f:
+                if line.strip():
+                    block.append(line.strip())
+                elif block:
+                    number += 1
+                    yield str(number), " ".join(block)
+                    block = []
+            if block:
+                yield str(number + 1), " ".join(block)
+
+class MatchWriter:
+    """Streams ranked matches per requisition to CSV (one row per candidate) or JSONL (one line per requisition)"""
+
+    CSV_FIELDS = ['requisition_id', 'rank', 'resume_id', 'name', 'score', 'matched_skills', 'match_reason']
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.jsonl = self.path.suffix.lower() in ('.jsonl', '.ndjson', '.json')
+        self._file = None
+        self._csv = None
+        self.requisitions = 0
+        self.rows = 0
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8', newline='')
+        if not self.jsonl:
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.CSV_FIELDS)
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+        return False
+
+    @staticmethod
+    def _match(rank, result):
+        resume = result['resume']
+        return {
+            'rank': rank,
+            'resume_id': resume.get('resume_id'),
+            'name': resume.get('name', 'Unknown'),
+            'score': result['score'],
+            'matched_skills': result['matched_skills'],
+            'match_reason': result['match_reason']
+        }
+
+    def write(self, requisition_id, description, results):
+        """Write the ranked results of one requisition"""
+        matches = [self._match(rank, result) for rank, result in enumerate(results, 1)]
+        if self.jsonl:
+            self._file.write(json.dumps({
+                'requisition_id': requisition_id,
+                'description': description,
+                'required_skills': results[0]['required_skills'] if results else [],
+                'matches': matches
+            }) + "\n")
+        else:
+            for match in matches:
+                match['matched_skills'] = "; ".join(match['matched_skills'])
+                self._csv.writerow([requisition_id] + [match[field] for field in self.CSV_FIELDS[1:]])
+        self.requisitions += 1
+        self.rows += len(matches)
@@ -1,38 +1,167 @@
-import PyPDF2
-import docx
 import json
+import multiprocessing
+import threading
 from pathlib import Path
 
 class ResumeParser:
     """Extract text from PDF and DOCX resumes"""
     
-    def __init__(self):
+    def __init__(self, txt_chunk_size=65536):
         self.name = "resume_parser"
+        self.txt_chunk_size = txt_chunk_size  # characters read per step from .txt files
     
-    def parse_pdf(self, file_path):
-        """Extract text from PDF"""
-        text = ""
+    def iter_pdf(self, file_path):
+        """Yield the text of each PDF page; later pages are never extracted if the caller stops"""
+        import PyPDF2
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
+                yield page.extract_text() or ""
     
-    def parse_docx(self, file_path):
-        """Extract text from DOCX"""
+    def iter_docx(self, file_path):
+        """Yield DOCX paragraphs, newline-separated"""
+        import docx
         doc = docx.Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text
+        for i, para in enumerate(doc.paragraphs):
+            yield "\n" + para.text if i else para.text
+    
+    def iter_txt(self, file_path):
+        """Yield a text file in fixed-size chunks"""
+        with open(file_path) as file:
+            while True:
+                chunk = file.read(self.txt_chunk_size)
+                if not chunk:
+                    return
+                yield chunk
     
-    def parse(self, file_path):
-        """Parse resume based on file type"""
+    def iter_text(self, file_path):
+        """Stream the text of a resume as pieces that concatenate to the full text"""
         file_path = Path(file_path)
         
         if file_path.suffix.lower() == '.pdf':
-            return self.parse_pdf(file_path)
+            return self.iter_pdf(file_path)
         elif file_path.suffix.lower() in ['.docx', '.doc']:
-            return self.parse_docx(file_path)
+            return self.iter_docx(file_path)
         elif file_path.suffix.lower() == '.txt':
-            return file_path.read_text()
+            return self.iter_txt(file_path)
         else:
-            raise ValueError(f"Unsupported file type: {file_path.suffix}")
\ No newline at end of file
+            raise ValueError(f"Unsupported file type: {file_path.suffix}")
+    
+    def parse_pdf(self, file_path, max_chars=None):
+        """Extract text from PDF"""
+        return self._join(self.iter_pdf(file_path), max_chars)
+    
+    def parse_docx(self, file_path, max_chars=None):
+        """Extract text from DOCX"""
+        return self._join(self.iter_docx(file_path), max_chars)
+    
+    def parse(self, file_path, max_chars=None):
+        """Parse resume based on file type, stopping once max_chars characters are read"""
+        return self._join(self.iter_text(file_path), max_chars)
+    
+    @staticmethod
+    def _join(pieces, max_chars=None):
+        """Collect pieces up to the budget and join them once (no repeated string copies)"""
+        collected = []
+        total = 0
+        for piece in pieces:
+            collected.append(piece)
+            total += len(piece)
+            if max_chars is not None and total >= max_chars:
+                pieces.close()  # stop reading the file now
+                break
+        text = "".join(collected)
+        return text if max_chars is None else text[:max_chars]
+
+def _parse_worker(connection):
+    """Worker process loop: receive (path, max_chars), send back ('ok', text) or ('error', message)"""
+    parser = ResumeParser()
+    while True:
+        request = connection.recv()
+        if request is None:
+            return
+        file_path, max_chars = request
+        try:
+            connection.send(('ok', parser.parse(file_path, max_chars)))
+        except Exception as e:
+            connection.send(('error', f"{type(e).__name__}: {e}"))
+
+class ParserPool:
+    """Parse large PDF/DOCX files in worker processes with a per-file timeout
+    
+    A worker that exceeds the timeout is killed and replaced, so one pathological
+    file cannot stall ingestion. Small files and .txt files are parsed in-process.
+    """
+    
+    def __init__(self, workers=2, timeout=30.0, min_bytes=256 * 1024, parser=None):
+        self.parser = parser or ResumeParser()
+        self.timeout = timeout
+        self.min_bytes = min_bytes  # smaller files are not worth the round-trip to a worker
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+        self._idle = []  # (process, connection) pairs ready for work
+        self._lock = threading.Lock()
+        # Spawned (not forked) workers: the parent runs threads and native thread pools
+        self._context = multiprocessing.get_context('spawn')
+    
+    def parse(self, file_path, max_chars=None):
+        """Parse one file; raises TimeoutError if it takes longer than the timeout"""
+        file_path = Path(file_path)
+        if file_path.suffix.lower() == '.txt' or file_path.stat().st_size < self.min_bytes:
+            return self.parser.parse(file_path, max_chars)
+        
+        with self._slots:
+            worker = self._checkout()
+            process, connection = worker
+            try:
+                connection.send((str(file_path), max_chars))
+                if not connection.poll(self.timeout):
+                    raise TimeoutError(f"Parsing {file_path.name} took longer than {self.timeout}s")
+                status, result = connection.recv()
+            except BaseException:
+                # Timed out, crashed or interrupted: the worker's state is unknown
+                self._kill(worker)
+                raise
+            
+            with self._lock:
+                self._idle.append(worker)
+        
+        if status == 'error':
+            raise RuntimeError(result)
+        return result
+    
+    def _checkout(self):
+        """An idle worker, or a newly started one"""
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker[0].is_alive():
+                    return worker
+                self._kill(worker)
+        
+        parent, child = self._context.Pipe()
+        process = self._context.Process(target=_parse_worker, args=(child,), daemon=True)
+        process.start()
+        child.close()
+        return process, parent
+    
+    @staticmethod
+    def _kill(worker):
+        process, connection = worker
+        process.kill()
+        process.join()
+        connection.close()
+    
+    def close(self):
+        """Stop the idle workers"""
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for process, connection in workers:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            connection.close()
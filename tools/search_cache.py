@@ -0,0 +1,92 @@
+from collections import OrderedDict
+import threading
+import json
+import re
+
+def normalize_query(query):
+    """Case, punctuation and whitespace-insensitive form of a search query"""
+    # Keep characters that are part of skill names (c++, c#, node.js)
+    words = re.sub(r"[^\w+#.]+", " ", query.lower()).split()
+    return " ".join(word.strip(".") for word in words if word.strip("."))
+
+class SearchResultCache:
+    """In-memory LRU cache of search results and interpreted query skills, bounded by size in bytes
+
+    Results are keyed by the normalized query and the store revision, so any
+    add, delete or clear makes them unreachable (they age out of the LRU).
+    The skills the LLM extracted from a query do not depend on the store and
+    are kept per normalized query. Values are held as JSON, which both sizes
+    them and hands every caller its own copy.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> JSON text
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, key):
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(text)
+
+    def _put(self, key, value):
+        try:
+            text = json.dumps(value)
+        except (TypeError, ValueError):
+            return  # not JSON-serializable; leave it uncached
+        size = len(text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = text
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def get_results(self, query, revision):
+        """Cached results of this query against this store revision, or None"""
+        return self._get(('results', normalize_query(query), revision))
+
+    def put_results(self, query, revision, results):
+        self._put(('results', normalize_query(query), revision), results)
+
+    def get_skills(self, query):
+        """Cached (required skills, expanded skills) of this query, or None"""
+        skills = self._get(('skills', normalize_query(query)))
+        return tuple(skills) if skills is not None else None
+
+    def put_skills(self, query, required_skills, expanded_skills):
+        self._put(('skills', normalize_query(query)), [required_skills, expanded_skills])
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """Get hit/miss/eviction counters and memory use"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self._bytes
+        }
@@ -0,0 +1,174 @@
+from tools.skill_index import normalize_skill
+from pathlib import Path
+import numpy as np
+import json
+import os
+import re
+
+TOKEN = re.compile(r"[\w+#./-]+")
+
+def phrase_key(text):
+    """Word tokens of a skill or query, so "Node.js," in a query matches the skill "node.js\""""
+    return " ".join(filter(None, (token.rstrip('.,-') for token in TOKEN.findall(text.lower()))))
+
+class SkillGraph:
+    """Top-k nearest-neighbor graph over the embeddings of every skill term in a store
+
+    Nodes are normalized skill terms (as in the inverted skill index) with their
+    float16 unit vectors. add() links new terms to their k most similar terms and
+    updates the neighbor lists of existing terms they now belong to, so the graph
+    grows incrementally at ingest and lookups need no encoding or LLM call.
+    """
+
+    def __init__(self, k=32, model=None):
+        self.k = k
+        self.model = model  # skill model the vectors come from
+        self.terms = []  # node -> term
+        self.ids = {}  # term -> node
+        self.phrases = {}  # phrase_key(term) -> term, for finding terms in free text
+        self.max_words = 1
+        self.vectors = np.zeros((0, 0), dtype=np.float16)  # rows beyond len(terms) are spare capacity
+        self.neighbors = np.zeros((0, k), dtype=np.int32)  # -1 pads lists of small graphs
+        self.scores = np.zeros((0, k), dtype=np.float32)
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term):
+        return term in self.ids
+
+    def add(self, terms, vectors, chunk_size=4096):
+        """Insert terms (with unit vectors, one row each) that are not in the graph yet"""
+        rows = {}
+        for term, vector in zip(terms, vectors):
+            if term and term not in self.ids and term not in rows:
+                rows[term] = vector
+        if not rows:
+            return 0
+
+        new = np.asarray(list(rows.values()), dtype=np.float32)
+        start, end = len(self.terms), len(self.terms) + len(rows)
+        self._reserve(end, new.shape[1])
+        self.vectors[start:end] = new
+        everything = self.vectors[:end].astype(np.float32)
+
+        # Neighbor lists of the new terms, against every term
+        for offset in range(0, len(new), chunk_size):
+            similarities = new[offset:offset + chunk_size] @ everything.T
+            own = np.arange(start + offset, start + offset + len(similarities))
+            similarities[np.arange(len(similarities)), own] = -np.inf
+            self.neighbors[own], self.scores[own] = self._top(similarities, np.arange(end))
+
+        # Existing terms whose k nearest now include a new term
+        new_ids = np.arange(start, end)
+        for offset in range(0, start, chunk_size):
+            stop = min(start, offset + chunk_size)
+            candidates = np.concatenate([self.scores[offset:stop], everything[offset:stop] @ new.T], axis=1)
+            ids = np.concatenate([self.neighbors[offset:stop], np.broadcast_to(new_ids, (stop - offset, len(new)))],
+                                 axis=1)
+            self.neighbors[offset:stop], self.scores[offset:stop] = self._top(candidates, ids)
+
+        # Publish the terms last, so concurrent lookups only see complete rows
+        for term in rows:
+            self.ids[term] = len(self.terms)
+            self.terms.append(term)
+            self.phrases.setdefault(phrase_key(term), term)
+            self.max_words = max(self.max_words, len(phrase_key(term).split()))
+        self.dirty = True
+        return len(rows)
+
+    def _top(self, similarities, ids):
+        """Best k (id, score) per row, best first, padded with -1"""
+        k = min(self.k, similarities.shape[1])
+        best = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(similarities, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_ids = ids[best] if ids.ndim == 1 else np.take_along_axis(ids, best, axis=1)
+
+        neighbors = np.full((len(similarities), self.k), -1, dtype=np.int32)
+        scores = np.full((len(similarities), self.k), -1.0, dtype=np.float32)
+        neighbors[:, :k] = np.where(np.isfinite(best_scores), best_ids, -1)
+        scores[:, :k] = np.where(np.isfinite(best_scores), best_scores, -1.0)
+        return neighbors, scores
+
+    def _reserve(self, size, dimension):
+        """Grow the arrays (doubling) to hold at least size nodes"""
+        if size <= len(self.neighbors) and self.vectors.shape[1] == dimension:
+            return
+        capacity = max(size, 2 * len(self.neighbors), 1024)
+        vectors = np.zeros((capacity, dimension), dtype=np.float16)
+        neighbors = np.full((capacity, self.k), -1, dtype=np.int32)
+        scores = np.full((capacity, self.k), -1.0, dtype=np.float32)
+        count = len(self.terms)
+        if count:
+            vectors[:count] = self.vectors[:count]
+            neighbors[:count] = self.neighbors[:count]
+            scores[:count] = self.scores[:count]
+        self.vectors, self.neighbors, self.scores = vectors, neighbors, scores
+
+    def neighbors_of(self, skill):
+        """{neighbor term: cosine similarity} of a skill, or None if the graph does not know it"""
+        node = self.ids.get(normalize_skill(skill))
+        if node is None:
+            return None
+        terms = self.terms
+        return {terms[j]: float(score) for j, score in zip(self.neighbors[node], self.scores[node]) if j >= 0}
+
+    def find_skills(self, text):
+        """Known terms mentioned in free text, longest phrase first, in order of appearance
+
+        A slashed word that is not a term itself ("c++/c#") is tried part by part.
+        """
+        words = phrase_key(text).split()
+        found = []
+        i = 0
+        while i < len(words):
+            for n in range(min(self.max_words, len(words) - i), 0, -1):
+                term = self.phrases.get(" ".join(words[i:i + n]))
+                if term is not None and len(term) > 1:
+                    found.append(term)
+                    i += n
+                    break
+            else:
+                if '/' in words[i]:
+                    found.extend(self.find_skills(words[i].replace('/', ' ')))
+                i += 1
+        return list(dict.fromkeys(found))
+
+    def save(self, path):
+        """Write the graph through a temp file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        count = len(self.terms)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                terms=np.array(json.dumps(self.terms)),
+                model=np.array(self.model or ""),
+                vectors=self.vectors[:count],
+                neighbors=self.neighbors[:count],
+                scores=self.scores[:count]
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            terms = json.loads(str(data['terms']))
+            graph = cls(k=data['neighbors'].shape[1], model=str(data['model']) or None)
+            graph.vectors = data['vectors']
+            graph.neighbors = data['neighbors']
+            graph.scores = data['scores']
+        for node, term in enumerate(terms):
+            graph.ids[term] = node
+            graph.phrases.setdefault(phrase_key(term), term)
+            graph.max_words = max(graph.max_words, len(phrase_key(term).split()))
+        graph.terms = terms
+        return graph
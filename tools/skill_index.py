@@ -0,0 +1,148 @@
+from array import array
+from pathlib import Path
+import numpy as np
+import math
+import json
+import os
+
+def normalize_skill(skill):
+    """Normalize a skill string into an index term"""
+    return " ".join(str(skill).lower().split())
+
+class InvertedSkillIndex:
+    """Inverted index from normalized skill to a postings list of resume ids, with BM25 scoring
+
+    Resume ids are the store's record positions. Postings are append-only uint32
+    arrays, so adding a resume costs O(number of its skills).
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> array('I') of resume ids
+        self.doc_lengths = array('H')  # number of distinct terms per resume id
+        self._cache = {}  # term -> numpy copy of its postings, dropped when the term changes
+        self._lengths_cache = None
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, resume_id, skills):
+        """Index one resume; ids must be added in increasing order"""
+        if resume_id < len(self.doc_lengths):
+            raise ValueError(f"Resume {resume_id} is already indexed")
+        while len(self.doc_lengths) < resume_id:
+            self.doc_lengths.append(0)  # records without indexed skills
+
+        terms = {normalize_skill(skill) for skill in skills}
+        terms.discard("")
+        for term in terms:
+            self.postings.setdefault(term, array('I')).append(resume_id)
+            self._cache.pop(term, None)
+        self.doc_lengths.append(min(len(terms), 65535))
+        self._lengths_cache = None
+
+    def _postings(self, term):
+        # Copies rather than buffer views: a view would stop the array from growing
+        ids = self._cache.get(term)
+        if ids is None:
+            ids = np.array(self.postings.get(term, ()), dtype=np.uint32)
+            self._cache[term] = ids
+        return ids
+
+    def _doc_lengths(self):
+        if self._lengths_cache is None:
+            self._lengths_cache = np.array(self.doc_lengths, dtype=np.uint16)
+        return self._lengths_cache
+
+    def prefilter(self, skills, require_all=False):
+        """Sorted ids of resumes having any (or all) of the skills, straight from the postings"""
+        lists = [self._postings(normalize_skill(skill)) for skill in skills]
+        if not lists:
+            return np.zeros(0, dtype=np.uint32)
+        if require_all:
+            result = lists[0].copy()
+            for ids in lists[1:]:
+                result = np.intersect1d(result, ids, assume_unique=True)
+            return result
+        return np.unique(np.concatenate(lists))
+
+    def search(self, skills, k=10):
+        """BM25 over skill terms; returns [(resume id, score)] best first"""
+        n_docs = len(self.doc_lengths)
+        terms = list(dict.fromkeys(normalize_skill(skill) for skill in skills))
+        terms = [term for term in terms if term in self.postings]
+        if not n_docs or not terms:
+            return []
+
+        doc_lengths = self._doc_lengths()
+        avg_length = max(float(doc_lengths.mean()), 1.0)
+
+        # Sparse accumulation over the postings of the query terms only
+        candidates = np.unique(np.concatenate([self._postings(term) for term in terms]))
+        scores = np.zeros(len(candidates), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths[candidates] / avg_length)
+        for term in terms:
+            ids = self._postings(term)
+            idf = math.log(1 + (n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            # Skills are a set, so term frequency is always 1
+            has_term = np.isin(candidates, ids, assume_unique=True)
+            scores += has_term * (idf * (self.k1 + 1) / (1 + norm))
+
+        top = min(k, len(candidates))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(int(candidates[i]), float(scores[i])) for i in best]
+
+    def save(self, path):
+        """Write the index as CSR arrays (terms, offsets, ids) through a temp file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        terms = sorted(self.postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(self.postings[term])
+        ids = np.concatenate([self._postings(term) for term in terms]) if terms else \
+            np.zeros(0, dtype=np.uint32)
+
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                terms=np.array(json.dumps(terms)),
+                offsets=offsets,
+                ids=ids.astype(np.uint32),
+                doc_lengths=self._doc_lengths()
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, count=None):
+        """Read an index written by save(); ids at or beyond count are dropped"""
+        index = cls()
+        with np.load(path) as data:
+            terms = json.loads(str(data['terms']))
+            offsets = data['offsets']
+            ids = data['ids']
+            doc_lengths = data['doc_lengths']
+
+        if count is not None:
+            doc_lengths = doc_lengths[:count]
+        index.doc_lengths = array('H', doc_lengths.astype(np.uint16).tobytes())
+        for i, term in enumerate(terms):
+            postings = ids[offsets[i]:offsets[i + 1]]
+            if count is not None:
+                postings = postings[postings < count]
+            if len(postings):
+                index.postings[term] = array('I', postings.astype(np.uint32).tobytes())
+        return index
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse several ranked id lists: score(d) = sum 1 / (k + rank)"""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)
@@ -0,0 +1,187 @@
+from pathlib import Path
+import threading
+import bisect
+import time
+import json
+import os
+
+# Histogram bucket upper bounds in seconds (Prometheus style, +Inf is implicit)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Console verbosity: warnings only, progress messages, or per-resume/per-candidate detail
+LOG_LEVELS = {'warning': 0, 'info': 1, 'debug': 2}
+_log_level = LOG_LEVELS['debug']
+
+def set_log_level(level):
+    """Choose how much the agents print: 'warning', 'info' or 'debug' (default)"""
+    global _log_level
+    if level not in LOG_LEVELS:
+        raise ValueError(f"Unknown log level '{level}', expected one of {', '.join(LOG_LEVELS)}")
+    _log_level = LOG_LEVELS[level]
+
+def log_enabled(level):
+    """True if messages of this level are printed; check it before formatting hot-loop messages"""
+    return _log_level >= LOG_LEVELS[level]
+
+def log(message, level='info'):
+    """Print a message if its level is enabled"""
+    if _log_level >= LOG_LEVELS[level]:
+        print(message)
+
+class Histogram:
+    """Count, sum, min, max and bucket counts of observed durations"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if seen + bucket_count >= rank and bucket_count:
+                # The observed min/max narrow the first and last occupied buckets
+                low, high = max(lower, self.min), min(upper, self.max)
+                return low + (high - low) * (rank - seen) / bucket_count
+            seen += bucket_count
+            lower = upper
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum_seconds': round(self.total, 6),
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else None,
+            'min_ms': round(self.min * 1000, 3) if self.count else None,
+            'max_ms': round(self.max * 1000, 3) if self.count else None,
+            'p50_ms': round(self.quantile(0.50) * 1000, 3) if self.count else None,
+            'p95_ms': round(self.quantile(0.95) * 1000, 3) if self.count else None,
+            'p99_ms': round(self.quantile(0.99) * 1000, 3) if self.count else None,
+            'buckets': {str(bound): count for bound, count in zip(self.buckets + ('+Inf',), self.counts)}
+        }
+
+class _NullSpan:
+    """Shared no-op span handed out while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+class Tracer:
+    """Aggregates span latencies and event counters; near-free while disabled"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        """Context manager timing a named stage"""
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, value=1):
+        """Add to an event counter (no-op while disabled)"""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def snapshot(self):
+        """All spans and counters as a JSON-serializable dict"""
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'spans': {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+                'counters': dict(sorted(self.counters.items()))
+            }
+
+    def summary(self):
+        """Plain-text table of span latencies for the console"""
+        lines = [f"{'span':<28} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for name, stats in self.snapshot()['spans'].items():
+            lines.append(f"{name:<28} {stats['count']:>7} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['max_ms']:>9}")
+        return "\n".join(lines)
+
+    def to_prometheus(self, prefix="resume_agent"):
+        """Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_span_seconds Latency of instrumented stages",
+            f"# TYPE {prefix}_span_seconds histogram"
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {histogram.total:.6f}')
+                lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {histogram.count}')
+
+            lines.append(f"# HELP {prefix}_events_total Counted events")
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.snapshot(), indent=2))
+
+    def write_prometheus(self, path):
+        """Write a file for the node_exporter textfile collector (or any scraper)"""
+        _write_atomic(path, self.to_prometheus())
+
+def _write_atomic(path, text):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
+
+# Process-wide tracer used by the agents; enable with tracer.enabled = True
+tracer = Tracer()
+span = tracer.span